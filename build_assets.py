@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Reconstrução incremental dos artefatos de um diretório de imagens
+Para cada imagem executa as etapas de contornos (máscaras, debug e análise JSON),
+traços e recorte de olhos/boca, pulando as que o manifesto indica estarem atualizadas
+"""
+
+import os
+import time
+import argparse
+from typing import Dict, List, Optional, Sequence
+
+from python.asset_manifest import AssetManifest, module_dependencies
+from python.output_writer import OutputWriter
+from python.extract_traces import extract_traces
+from python.still_image import DEFAULT_DETECTION_SIZE
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Sufixos dos arquivos gerados pelas próprias etapas (não são imagens de entrada)
+GENERATED_SUFFIXES = ("_mask_hull", "_mask_outline", "_mask_artistic", "_debug",
+                      "_traces", "_analyzed", "_eyes", "_mouth")
+
+STEPS = ("contours", "traces", "features")
+
+# Importado só na etapa de features (carrega o MediaPipe)
+FEATURES_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extract_features_mediapipe.py")
+
+
+def find_source_images(directory: str) -> List[str]:
+    """Imagens de entrada do diretório (ignora os artefatos gerados)"""
+    images = []
+    for name in sorted(os.listdir(directory)):
+        base, ext = os.path.splitext(name)
+        if ext.lower() not in IMAGE_EXTENSIONS or base.endswith(GENERATED_SUFFIXES):
+            continue
+        if base in ("eyes", "mouth"):  # saídas de extract_features_mediapipe.py
+            continue
+        images.append(os.path.join(directory, name))
+    return images
+
+
+class AssetBuilder:
+    def __init__(self, output_dir: str, force: bool = False):
+        """Prepara o manifesto do diretório de saída; o MediaPipe só é carregado se algo for refeito"""
+        self.output_dir = output_dir
+        self.force = force
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest = AssetManifest.for_directory(output_dir)
+        self.writer = OutputWriter()
+        self._analyzer = None
+        self.stats = {"images": 0, "built": 0, "skipped": 0}
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            from python.face_contour_analyzer import FaceContourAnalyzer
+            self._analyzer = FaceContourAnalyzer(DEFAULT_DETECTION_SIZE)
+        return self._analyzer
+
+    def build_contours(self, image_path: str) -> Optional[List[str]]:
+        result = self.analyzer.process_image(image_path, self.output_dir, self.writer)
+        self.writer.flush()
+        if "error" in result:
+            print(f"❌ {image_path}: {result['error']}")
+            return None
+        base_name = os.path.splitext(os.path.basename(image_path))[0]
+        return ([os.path.join(self.output_dir, f) for f in result["files_generated"]]
+                + [os.path.join(self.output_dir, f"{base_name}_analysis.json")])
+
+    def build_traces(self, image_path: str) -> List[str]:
+        base_name = os.path.splitext(os.path.basename(image_path))[0]
+        traces_path = os.path.join(self.output_dir, f"{base_name}_traces.png")
+        extract_traces(image_path, traces_path)
+        return [traces_path]
+
+    def build_features(self, image_path: str) -> Optional[List[str]]:
+        base_name = os.path.splitext(os.path.basename(image_path))[0]
+        outputs = [os.path.join(self.output_dir, f"{base_name}_eyes.png"),
+                   os.path.join(self.output_dir, f"{base_name}_mouth.png"),
+                   os.path.join(self.output_dir, f"{base_name}_features.json")]
+        import extract_features_mediapipe
+        if not extract_features_mediapipe.extract_eyes_mouth(image_path, *outputs):
+            return None
+        return outputs
+
+    def step_spec(self, step: str, image_path: str):
+        """Entradas (imagem + código), configurações e função de build de uma etapa"""
+        if step == "contours":
+            code = module_dependencies("face_contour_analyzer.py")
+            settings = {"formats": self.writer.formats, "detection_size": DEFAULT_DETECTION_SIZE}
+            return code, settings, lambda: self.build_contours(image_path)
+        if step == "traces":
+            return module_dependencies("extract_traces.py"), {"canny": [100, 200]}, lambda: self.build_traces(image_path)
+        code = module_dependencies(FEATURES_SCRIPT)
+        settings = {"margins": [20, 15, 15, 10], "detection_size": DEFAULT_DETECTION_SIZE}
+        return code, settings, lambda: self.build_features(image_path)
+
+    def build_image(self, image_path: str, steps: Sequence[str] = STEPS):
+        self.stats["images"] += 1
+        for step in steps:
+            code, settings, build = self.step_spec(step, image_path)
+            key = f"{step}:{os.path.basename(image_path)}"
+            if self.manifest.run(key, [image_path] + code, settings, build, self.force):
+                self.stats["built"] += 1
+            else:
+                self.stats["skipped"] += 1
+            # Manifesto gravado a cada etapa: uma interrupção não perde o que já foi feito
+            self.manifest.save()
+
+    def close(self):
+        self.writer.close()
+        self.manifest.save()
+
+
+def build_directory(input_dir: str, output_dir: Optional[str] = None, force: bool = False,
+                    steps: Sequence[str] = STEPS) -> Dict[str, int]:
+    """Reconstrói incrementalmente os artefatos de todas as imagens do diretório"""
+    builder = AssetBuilder(output_dir or input_dir, force)
+    try:
+        for image_path in find_source_images(input_dir):
+            print(f"\n🖼️ {image_path}")
+            builder.build_image(image_path, steps)
+    finally:
+        builder.close()
+    return builder.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstrução incremental dos artefatos de um diretório de imagens")
+    parser.add_argument("directory", nargs="?", default="assets", help="Diretório com as imagens de entrada")
+    parser.add_argument("--output", "-o", help="Diretório de saída (padrão: o próprio diretório)")
+    parser.add_argument("--force", action="store_true", help="Refazer todas as etapas, ignorando o manifesto")
+    parser.add_argument("--steps", nargs="+", choices=STEPS, default=list(STEPS), help="Etapas a executar")
+
+    args = parser.parse_args()
+
+    start_time = time.time()
+    stats = build_directory(args.directory, args.output, args.force, args.steps)
+    print(f"\n📦 {stats['images']} imagem(ns): {stats['built']} etapa(s) refeita(s), "
+          f"{stats['skipped']} atualizada(s) em {time.time() - start_time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,12 @@ Mostra como usar o sistema completo de reconhecimento facial e geração de cont
 """
 
 import os
+import json
 import time
+import argparse
 from python.face_contour_analyzer import FaceContourAnalyzer
+from python.asset_manifest import AssetManifest, module_dependencies
+from python.output_writer import DEFAULT_ARTIFACT_FORMATS
 
 def print_banner():
     """Imprime banner do sistema"""
@@ -15,14 +19,14 @@ def print_banner():
     print("🔬 Reconhecimento Facial + Geração de Contornos com MediaPipe + OpenCV")
     print("=" * 80)
 
-def demo_complete_analysis():
-    """Demonstração completa do sistema"""
+def demo_complete_analysis(incremental=False):
+    """Demonstração completa do sistema
+
+    Com incremental=True, a análise é reaproveitada de assets/rosto3d_analysis.json
+    quando a imagem, o código do analisador e os arquivos gerados não mudaram.
+    """
     print("\n🚀 INICIANDO DEMONSTRAÇÃO COMPLETA...")
     
-    # Inicializar analisador
-    print("\n📦 Inicializando componentes...")
-    analyzer = FaceContourAnalyzer()
-    
     # Definir caminhos
     image_path = "assets/rosto3d.png"
     output_dir = "assets"
@@ -35,11 +39,32 @@ def demo_complete_analysis():
         print(f"❌ Erro: Imagem não encontrada em {image_path}")
         return False
     
-    # Executar análise completa
-    print("\n🔍 Executando análise facial completa...")
-    start_time = time.time()
+    base_name = os.path.splitext(os.path.basename(image_path))[0]
+    json_path = os.path.join(output_dir, f"{base_name}_analysis.json")
+    # Chave própria: build_assets.py grava "contours:" com outras configurações no mesmo manifesto
+    step = "demo_contours:" + os.path.basename(image_path)
+    inputs = [image_path] + module_dependencies("face_contour_analyzer.py")
+    settings = {"formats": DEFAULT_ARTIFACT_FORMATS}
+    manifest = AssetManifest.for_directory(output_dir) if incremental else None
     
-    result = analyzer.process_image(image_path, output_dir)
+    start_time = time.time()
+    if manifest is not None and manifest.is_current(step, inputs, settings):
+        print("\n⏭️ Análise atualizada; reaproveitando resultado salvo")
+        with open(json_path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    else:
+        # Inicializar analisador
+        print("\n📦 Inicializando componentes...")
+        analyzer = FaceContourAnalyzer()
+        
+        # Executar análise completa
+        print("\n🔍 Executando análise facial completa...")
+        result = analyzer.process_image(image_path, output_dir)
+        
+        if manifest is not None and "error" not in result:
+            outputs = [os.path.join(output_dir, f) for f in result["files_generated"]] + [json_path]
+            manifest.record(step, inputs, settings, outputs)
+            manifest.save()
     
     end_time = time.time()
     processing_time = end_time - start_time
@@ -122,10 +147,15 @@ def demo_integration_info():
 
 def main():
     """Função principal da demonstração"""
+    parser = argparse.ArgumentParser(description="Demonstração do sistema integrado de análise facial")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reaproveitar a análise se imagem, código e arquivos gerados não mudaram")
+    args = parser.parse_args()
+    
     print_banner()
     
     # Demonstração da análise completa
-    success = demo_complete_analysis()
+    success = demo_complete_analysis(args.incremental)
     
     if success:
         # Informações sobre integração
@@ -3,6 +3,7 @@ import dlib
 import os
 import json
 from face_analyzer import FaceAnalyzer
+from frame_context import FrameContext
 
 # Caminhos
 IMAGE_PATH = 'assets/rosto3d.png'
@@ -12,25 +13,24 @@ MOUTH_OUTPUT = 'assets/mouth.png'
 # Inicializar analisador de face
 analyzer = FaceAnalyzer()
 
-# Carregar imagem
-def load_image(image_path: str):
+# Carregar imagem (cinza para o dlib calculado uma vez; recortes direto do BGR)
+def load_image(image_path: str) -> FrameContext:
     image = cv2.imread(image_path)
     if image is None:
         raise FileNotFoundError(f"Imagem não encontrada: {image_path}")
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    return image_rgb
+    return FrameContext(bgr=image)
 
 # Salvar características faciais
 
 def save_facial_features():
-    image = load_image(IMAGE_PATH)
-    faces = analyzer.detect_faces(image)
+    frame = load_image(IMAGE_PATH)
+    faces = analyzer.detect_faces(frame)
     if not faces:
         print("Nenhuma face detectada.")
         return
 
     face_rect = faces[0]
-    landmarks = analyzer.get_landmarks(image, face_rect)
+    landmarks = analyzer.get_landmarks(frame, face_rect)
     
     # Analisar olhos
     eyes = analyzer.analyze_eyes(landmarks)
@@ -40,8 +40,8 @@ def save_facial_features():
     right_eye = landmarks[analyzer.RIGHT_EYE_POINTS]
     (x_min, y_min) = left_eye.min(axis=0)
     (x_max, y_max) = right_eye.max(axis=0)
-    eyes_img = image[y_min:y_max, x_min:x_max]
-    cv2.imwrite(EYES_OUTPUT, cv2.cvtColor(eyes_img, cv2.COLOR_RGB2BGR))
+    eyes_img = frame.bgr[y_min:y_max, x_min:x_max]
+    cv2.imwrite(EYES_OUTPUT, eyes_img)
 
     # Analisar boca
     mouth = analyzer.analyze_mouth(landmarks)
@@ -50,8 +50,8 @@ def save_facial_features():
     mouth_outer = landmarks[analyzer.MOUTH_OUTLINE_POINTS]
     (x_min, y_min) = mouth_outer.min(axis=0)
     (x_max, y_max) = mouth_outer.max(axis=0)
-    mouth_img = image[y_min:y_max, x_min:x_max]
-    cv2.imwrite(MOUTH_OUTPUT, cv2.cvtColor(mouth_img, cv2.COLOR_RGB2BGR))
+    mouth_img = frame.bgr[y_min:y_max, x_min:x_max]
+    cv2.imwrite(MOUTH_OUTPUT, mouth_img)
 
     print(f"Olhos e boca salvos como {EYES_OUTPUT} e {MOUTH_OUTPUT}.")
 
@@ -8,43 +8,52 @@ import cv2
 import numpy as np
 import mediapipe as mp
 import os
+import argparse
+from python.face_regions import LEFT_EYE, RIGHT_EYE, MOUTH, LIPS_INNER, RegionTable
+from python.still_image import StillImage, detect_face, DEFAULT_DETECTION_SIZE
 
-def extract_eyes_mouth():
-    """Extrai olhos e boca da imagem rosto3d.png"""
-    
-    # Caminhos
-    IMAGE_PATH = 'assets/rosto3d.png'
-    EYES_OUTPUT = 'assets/eyes.png'
-    MOUTH_OUTPUT = 'assets/mouth.png'
-    DATA_OUTPUT = 'assets/face_features.json'
+# Olhos e boca (contorno + lábios internos, sem pontos repetidos) extraídos com uma única indexação
+CROP_REGIONS = RegionTable({
+    "left_eye": LEFT_EYE,
+    "right_eye": RIGHT_EYE,
+    "mouth": MOUTH + tuple(i for i in LIPS_INNER if i not in MOUTH)
+})
+
+IMAGE_PATH = 'assets/rosto3d.png'
+EYES_OUTPUT = 'assets/eyes.png'
+MOUTH_OUTPUT = 'assets/mouth.png'
+DATA_OUTPUT = 'assets/face_features.json'
+
+def extract_eyes_mouth(image_path=IMAGE_PATH, eyes_output=EYES_OUTPUT,
+                       mouth_output=MOUTH_OUTPUT, data_output=DATA_OUTPUT,
+                       detection_size=DEFAULT_DETECTION_SIZE):
+    """Extrai olhos e boca da imagem (por padrão assets/rosto3d.png)
+
+    A face é localizada em uma versão reduzida (lado maior ~detection_size); os recortes
+    saem da imagem em resolução total.
+    """
     
-    print(f"🔍 Processando imagem: {IMAGE_PATH}")
+    print(f"🔍 Processando imagem: {image_path}")
     
     # Verificar se a imagem existe
-    if not os.path.exists(IMAGE_PATH):
-        print(f"❌ Imagem não encontrada: {IMAGE_PATH}")
+    if not os.path.exists(image_path):
+        print(f"❌ Imagem não encontrada: {image_path}")
         return False
     
-    # Carregar imagem
-    image = cv2.imread(IMAGE_PATH)
-    if image is None:
-        print(f"❌ Erro ao carregar imagem: {IMAGE_PATH}")
+    # Carregar imagem (só a versão de detecção; a resolução total vem com o primeiro recorte)
+    try:
+        still = StillImage(image_path, detection_size)
+    except FileNotFoundError:
+        print(f"❌ Erro ao carregar imagem: {image_path}")
         return False
     
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    h, w, _ = image.shape
+    w, h = still.full_size
     
     # Inicializar MediaPipe Face Mesh
     mp_face_mesh = mp.solutions.face_mesh
     mp_drawing = mp.solutions.drawing_utils
     mp_drawing_styles = mp.solutions.drawing_styles
     
-    # Índices dos landmarks para olhos e boca (MediaPipe Face Mesh)
-    LEFT_EYE_INDICES = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
-    RIGHT_EYE_INDICES = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
-    MOUTH_INDICES = [61, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318, 
-                     78, 191, 80, 81, 82, 13, 312, 311, 310, 415, 95, 88, 178, 87, 14, 317, 402, 318, 324]
-    
     try:
         with mp_face_mesh.FaceMesh(
             static_image_mode=True,
@@ -53,27 +62,19 @@ def extract_eyes_mouth():
             min_detection_confidence=0.5
         ) as face_mesh:
             
-            # Processar imagem
-            results = face_mesh.process(image_rgb)
+            # Processar imagem reduzida; landmarks em pixels da resolução total
+            face_landmarks, landmarks = detect_face(face_mesh, still)
             
-            if not results.multi_face_landmarks:
+            if face_landmarks is None:
                 print("❌ Nenhuma face detectada")
                 return False
             
-            face_landmarks = results.multi_face_landmarks[0]
-            
-            # Converter landmarks para coordenadas de pixel
-            landmarks = []
-            for landmark in face_landmarks.landmark:
-                x = int(landmark.x * w)
-                y = int(landmark.y * h)
-                landmarks.append([x, y])
-            
-            landmarks = np.array(landmarks)
+            # Extrair olhos e boca
+            regions = CROP_REGIONS.split(CROP_REGIONS.gather(landmarks))
             
             # Extrair região dos olhos
-            left_eye_points = landmarks[LEFT_EYE_INDICES]
-            right_eye_points = landmarks[RIGHT_EYE_INDICES]
+            left_eye_points = regions["left_eye"]
+            right_eye_points = regions["right_eye"]
             
             # Combinar ambos os olhos
             all_eye_points = np.vstack([left_eye_points, right_eye_points])
@@ -85,14 +86,14 @@ def extract_eyes_mouth():
             eye_y_max = min(h, np.max(all_eye_points[:, 1]) + 15)
             
             # Recortar região dos olhos
-            eyes_region = image[eye_y_min:eye_y_max, eye_x_min:eye_x_max]
+            eyes_region = still.crop(eye_x_min, eye_y_min, eye_x_max, eye_y_max)
             
             # Salvar imagem dos olhos
-            cv2.imwrite(EYES_OUTPUT, eyes_region)
-            print(f"✅ Olhos salvos em: {EYES_OUTPUT}")
+            cv2.imwrite(eyes_output, eyes_region)
+            print(f"✅ Olhos salvos em: {eyes_output}")
             
             # Extrair região da boca
-            mouth_points = landmarks[MOUTH_INDICES]
+            mouth_points = regions["mouth"]
             
             # Calcular bounding box da boca com margem
             mouth_x_min = max(0, np.min(mouth_points[:, 0]) - 15)
@@ -101,11 +102,11 @@ def extract_eyes_mouth():
             mouth_y_max = min(h, np.max(mouth_points[:, 1]) + 10)
             
             # Recortar região da boca
-            mouth_region = image[mouth_y_min:mouth_y_max, mouth_x_min:mouth_x_max]
+            mouth_region = still.crop(mouth_x_min, mouth_y_min, mouth_x_max, mouth_y_max)
             
             # Salvar imagem da boca
-            cv2.imwrite(MOUTH_OUTPUT, mouth_region)
-            print(f"✅ Boca salva em: {MOUTH_OUTPUT}")
+            cv2.imwrite(mouth_output, mouth_region)
+            print(f"✅ Boca salva em: {mouth_output}")
             
             # Salvar dados das características
             features_data = {
@@ -136,9 +137,9 @@ def extract_eyes_mouth():
             
             # Salvar dados em JSON
             import json
-            with open(DATA_OUTPUT, 'w') as f:
+            with open(data_output, 'w') as f:
                 json.dump(features_data, f, indent=2)
-            print(f"✅ Dados das características salvos em: {DATA_OUTPUT}")
+            print(f"✅ Dados das características salvos em: {data_output}")
             
             return True
             
@@ -147,10 +148,27 @@ def extract_eyes_mouth():
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrator de olhos e boca com MediaPipe")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Pular a extração se imagem, código e saídas não mudaram (manifesto em assets/)")
+    args = parser.parse_args()
+    
     print("🎭 Extrator de Características Faciais")
     print("=" * 50)
     
-    success = extract_eyes_mouth()
+    if args.incremental:
+        from python.asset_manifest import AssetManifest, module_dependencies
+        manifest = AssetManifest.for_directory(os.path.dirname(EYES_OUTPUT))
+        step = "eyes_mouth:" + os.path.basename(IMAGE_PATH)
+        inputs = [IMAGE_PATH] + module_dependencies(os.path.abspath(__file__))
+        settings = {"margins": [20, 15, 15, 10], "detection_size": DEFAULT_DETECTION_SIZE}
+        outputs = [EYES_OUTPUT, MOUTH_OUTPUT, DATA_OUTPUT]
+        
+        manifest.run(step, inputs, settings, lambda: outputs if extract_eyes_mouth() else None)
+        manifest.save()
+        success = manifest.is_current(step, inputs, settings)
+    else:
+        success = extract_eyes_mouth()
     
     if success:
         print("\n🎉 Extração concluída com sucesso!")
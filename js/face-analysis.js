@@ -10,6 +10,13 @@ class FaceAnalysisManager {
         this.maskCanvas = null;
         this.debugMode = false;
         
+        // Serviço Python local (python/analysis_service.py) com modelos aquecidos
+        this.analysisServiceUrl = 'http://localhost:8765';
+        this.sourceImagePath = 'assets/rosto3d.png';
+        
+        // Sessão gravada em blocos (python/result_chunks.py), lida por HTTP Range
+        this.session = null;
+        
         this.init();
     }
     
@@ -25,6 +32,12 @@ class FaceAnalysisManager {
         
         // Carregar análise existente se disponível
         this.loadExistingAnalysis();
+        
+        // ?session=gravacao.lmkc reproduz uma sessão gravada no canvas da máscara
+        const sessionUrl = new URLSearchParams(window.location.search).get('session');
+        if (sessionUrl) {
+            this.playSession(sessionUrl);
+        }
     }
     
     bindEvents() {
@@ -82,9 +95,9 @@ class FaceAnalysisManager {
         this.updateStatus('Analisando imagem...');
         
         try {
-            // Simular análise usando Python backend
-            // Em uma implementação real, isso faria uma chamada para um servidor Python
-            const result = await this.simulateAnalysis();
+            // Usar o serviço Python quando disponível; caso contrário, simular
+            const result = await this.requestServiceAnalysis(this.sourceImagePath)
+                || await this.simulateAnalysis();
             
             this.currentAnalysis = result;
             this.updateUI();
@@ -178,6 +191,28 @@ class FaceAnalysisManager {
         this.updateStatus('Análise resetada');
     }
     
+    async requestServiceAnalysis(imagePath) {
+        try {
+            const image = await fetch(imagePath);
+            if (!image.ok) return null;
+            
+            const name = imagePath.split('/').pop();
+            const response = await fetch(`${this.analysisServiceUrl}/analyze?name=${encodeURIComponent(name)}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: await image.blob()
+            });
+            if (!response.ok) return null;
+            
+            const result = await response.json();
+            console.log(`✅ Análise do serviço em ${result.processing_ms} ms`);
+            return result;
+        } catch (error) {
+            console.log('ℹ️ Serviço de análise indisponível, usando simulação');
+            return null;
+        }
+    }
+    
     async simulateAnalysis() {
         // Simula uma análise baseada nos dados reais que obtivemos
         return new Promise((resolve) => {
@@ -437,6 +472,118 @@ const facialAnimation = {
         }
     }
     
+    async fetchRange(url, start, length) {
+        const response = await fetch(url, { headers: { Range: `bytes=${start}-${start + length - 1}` } });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status} ao ler ${url}`);
+        }
+        const buffer = await response.arrayBuffer();
+        // Servidor sem suporte a Range devolve o arquivo inteiro (200)
+        return response.status === 206 ? buffer : buffer.slice(start, start + length);
+    }
+    
+    async openSession(url) {
+        // Prefixo de 12 bytes (magic, versão, tamanho do índice) e depois só o índice JSON
+        const prefix = new DataView(await this.fetchRange(url, 0, 12));
+        const magic = String.fromCharCode(...new Uint8Array(prefix.buffer, 0, 4));
+        if (magic !== 'LMKC' || prefix.getUint16(4, true) !== 1) {
+            throw new Error(`Formato de sessão não suportado: ${url}`);
+        }
+        const indexBytes = await this.fetchRange(url, 12, prefix.getUint32(8, true));
+        const index = JSON.parse(new TextDecoder().decode(indexBytes));
+        
+        this.session = {
+            url,
+            index,
+            chunks: new Map(),
+            points: new Float32Array(index.max_faces * index.points * index.dims)
+        };
+        console.log(`📼 Sessão aberta: ${index.frames} frames em ${index.chunks.length} blocos`);
+        return index;
+    }
+    
+    loadSessionChunk(chunk) {
+        const session = this.session;
+        if (!session.chunks.has(chunk)) {
+            const [, , offset, length] = session.index.chunks[chunk];
+            const promise = this.fetchRange(session.url, offset, length).then((buffer) => {
+                const view = new DataView(buffer);
+                const { layout, chunk_frames: capacity } = session.index;
+                return {
+                    firstFrame: view.getUint32(0, true),
+                    count: view.getUint32(4, true),
+                    origin: [view.getFloat32(8, true), view.getFloat32(12, true), view.getFloat32(16, true)],
+                    scale: [view.getFloat32(20, true), view.getFloat32(24, true), view.getFloat32(28, true)],
+                    timestamps: new Float64Array(buffer, layout.timestamps, capacity),
+                    faces: new Uint8Array(buffer, layout.faces, capacity),
+                    landmarks: new Uint16Array(buffer, layout.landmarks,
+                        (buffer.byteLength - layout.landmarks) >> 1)
+                };
+            });
+            session.chunks.set(chunk, promise);
+            
+            // Mantém só os blocos mais recentes em memória
+            if (session.chunks.size > 4) {
+                session.chunks.delete(session.chunks.keys().next().value);
+            }
+        }
+        return session.chunks.get(chunk);
+    }
+    
+    async getSessionFrame(frame) {
+        const session = this.session;
+        const { chunk_frames: capacity, max_faces: maxFaces, points, dims, frames } = session.index;
+        const chunkIndex = Math.floor(frame / capacity);
+        const chunk = await this.loadSessionChunk(chunkIndex);
+        
+        // Pré-busca do próximo bloco enquanto este é exibido
+        if (chunkIndex + 1 < session.index.chunks.length) {
+            this.loadSessionChunk(chunkIndex + 1);
+        }
+        
+        const local = frame - chunk.firstFrame;
+        const faces = chunk.faces[local];
+        const stride = maxFaces * points * dims;
+        const q = chunk.landmarks.subarray(local * stride, local * stride + faces * points * dims);
+        for (let i = 0; i < q.length; i++) {
+            const axis = i % dims;
+            session.points[i] = chunk.origin[axis] + q[i] * chunk.scale[axis];
+        }
+        return { frame, timestamp: chunk.timestamps[local], faces, points: session.points, total: frames };
+    }
+    
+    drawSessionFrame(data) {
+        if (!this.maskContext) return;
+        const ctx = this.maskContext;
+        const { width, height } = this.maskCanvas;
+        const { points, dims } = this.session.index;
+        
+        ctx.clearRect(0, 0, width, height);
+        ctx.fillStyle = '#00ffff';
+        for (let i = 0; i < data.faces * points; i++) {
+            ctx.fillRect(data.points[i * dims] * width - 1, data.points[i * dims + 1] * height - 1, 2, 2);
+        }
+    }
+    
+    async playSession(url, fps = 30) {
+        try {
+            const index = await this.openSession(url);
+            const frameTime = 1000 / (index.metadata?.fps || fps);
+            const started = performance.now();
+            let frame = 0;
+            
+            const step = async () => {
+                if (!this.session || this.session.url !== url || frame >= index.frames) return;
+                this.drawSessionFrame(await this.getSessionFrame(frame));
+                frame = Math.max(frame + 1, Math.floor((performance.now() - started) / frameTime));
+                requestAnimationFrame(step);
+            };
+            requestAnimationFrame(step);
+        } catch (error) {
+            console.log('⚠️ Sessão indisponível:', error.message);
+        }
+    }
+    
     clearMaskCanvas() {
         if (this.maskContext) {
             this.maskContext.clearRect(0, 0, this.maskCanvas.width, this.maskCanvas.height);
@@ -174,6 +174,102 @@ class FaceRenderer3D {
         }
     }
     
+    connectLiveStream(url = 'http://localhost:8766/stream') {
+        // Parâmetros ao vivo publicados por python/animation_stream.py (SSE)
+        if (this.liveStream) {
+            this.liveStream.close();
+        }
+        
+        this.liveStream = new EventSource(url);
+        this.liveStream.onmessage = (event) => {
+            const anim = JSON.parse(event.data);
+            const weights = anim.expression_weights || {};
+            
+            // Piscada com histerese (python/facial_events.py) em vez do EAR cru do frame
+            this.updateParameters({
+                eyeOpenness: anim.events?.blinking ? 0 : anim.eye_openness,
+                mouthOpenness: anim.mouth_openness,
+                eyebrowPosition: 0.5 + ((weights.eyebrowUp || 0) - (weights.eyebrowDown || 0)) * 0.5,
+                mouthCurvature: 0.5 + ((weights.smile || 0) - (weights.frown || 0)) * 0.5
+            });
+        };
+        this.liveStream.onerror = () => {
+            console.log('⚠️ Stream de animação indisponível, tentando reconectar...');
+        };
+        
+        console.log('📡 Conectado ao stream de animação:', url);
+    }
+
+    async connectFrameStream(url = 'http://localhost:8766/frames') {
+        // Versão binária do stream (python/animation_frame.py): só os canais alterados,
+        // quantizados em 8/16 bits; buffers pré-alocados, nenhuma alocação por frame
+        const LAYOUT_VERSION = 1;
+        const MIN = [0, 0, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0];
+        const MAX = [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 255];
+        const BITS = [8, 8, 16, 16, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8];
+        const SMILE = 4, FROWN = 5, EYEBROW_UP = 7, EYEBROW_DOWN = 8;
+
+        const values = new Float32Array(BITS.length);
+        const pending = new Uint8Array(64);
+        let pendingLength = 0;
+        let ready = false;
+
+        const applyMessage = (msg, start, end) => {
+            const header = msg[start];
+            if ((header >> 4) !== LAYOUT_VERSION) return;
+            if ((header & 0x0f) === 1) ready = true;
+            if (!ready) return;
+
+            const mask = msg[start + 1] | (msg[start + 2] << 8);
+            let offset = start + 3;
+            for (let i = 0; i < BITS.length && offset < end; i++) {
+                if (!(mask & (1 << i))) continue;
+                let q = msg[offset++];
+                if (BITS[i] > 8) q |= msg[offset++] << 8;
+                values[i] = MIN[i] + (q / ((1 << BITS[i]) - 1)) * (MAX[i] - MIN[i]);
+            }
+
+            const params = this.animationParams;
+            params.eyeOpenness = values[0];
+            params.mouthOpenness = values[1];
+            params.eyebrowPosition = 0.5 + (values[EYEBROW_UP] - values[EYEBROW_DOWN]) * 0.5;
+            params.mouthCurvature = 0.5 + (values[SMILE] - values[FROWN]) * 0.5;
+            if (this.faceMesh) {
+                this.applyFacialAnimation();
+            }
+        };
+
+        if (this.frameStream) {
+            this.frameStream.abort();
+        }
+        this.frameStream = new AbortController();
+
+        try {
+            const response = await fetch(url, { signal: this.frameStream.signal });
+            const reader = response.body.getReader();
+            console.log('📡 Conectado ao stream binário de animação:', url);
+
+            for (;;) {
+                const { value, done } = await reader.read();
+                if (done) break;
+
+                // Cada mensagem é precedida por 1 byte com seu tamanho; pedaços podem vir partidos
+                let i = 0;
+                while (i < value.length) {
+                    pending[pendingLength++] = value[i++];
+                    if (pendingLength > 1 && pendingLength === pending[0] + 1) {
+                        applyMessage(pending, 1, pendingLength);
+                        pendingLength = 0;
+                    }
+                }
+            }
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.log('⚠️ Stream binário de animação indisponível:', error.message);
+            }
+        }
+    }
+
     applyFacialAnimation() {
         const params = this.animationParams;
         
@@ -246,6 +342,14 @@ class FaceRenderer3D {
 window.addEventListener('load', () => {
     window.faceAnimation = new FaceRenderer3D();
     console.log('🎭 Renderizador 3D do rosto inicializado');
+    
+    // ?live=1 conecta o rosto à webcam via python/animation_stream.py (?live=binary usa /frames)
+    const live = new URLSearchParams(window.location.search).get('live');
+    if (live === 'binary') {
+        window.faceAnimation.connectFrameStream();
+    } else if (live !== null) {
+        window.faceAnimation.connectLiveStream();
+    }
 });
 
 // Ajustar tamanho da janela
@@ -12,6 +12,15 @@ class SpeechDrivenAnimation {
         this.maskCanvas = document.getElementById('clonedMaskCanvas');
         this.maskContext = this.maskCanvas?.getContext('2d');
 
+        // Estado de piscada/fala com histerese (python/facial_events.py via animation_stream)
+        this.facialEvents = { blinking: false, speaking: false, blink_rate: 0 };
+        this.eventStream = null;
+        this.blinkUntil = 0;
+
+        // Trilha pré-calculada (python/audio_mouth.py, ?mouth=); sem ela, análise do áudio por frame
+        this.mouthTrack = null;
+        this.audioElement = null;
+
         this.initAudio();
     }
 
@@ -40,9 +49,81 @@ class SpeechDrivenAnimation {
         this.animateMask();
     }
 
+    async loadMouthTrack(url) {
+        // Trilha .mouth de python/audio_mouth.py: cabeçalho "<4sBBfI" (magic, versão do layout,
+        // reservado, fps, frames) e, por frame, 1 byte de tamanho + mensagem de animation_frame.
+        // Só o canal mouth_openness (índice 1, 8 bits) é decodificado; .json lê a versão --json
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(`Trilha da boca indisponível: ${url} (${response.status})`);
+
+        if (url.endsWith('.json')) {
+            const track = await response.json();
+            this.mouthTrack = { fps: track.fps, mouth_openness: Float32Array.from(track.mouth_openness) };
+        } else {
+            this.mouthTrack = this.decodeMouthTrack(new Uint8Array(await response.arrayBuffer()));
+        }
+        console.log(`👄 Trilha da boca carregada: ${this.mouthTrack.mouth_openness.length} frames`);
+    }
+
+    decodeMouthTrack(data) {
+        const LAYOUT_VERSION = 1;
+        const BITS = [8, 8, 16, 16, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8];
+        const MOUTH = 1;
+        const HEADER_SIZE = 14;
+
+        const view = new DataView(data.buffer, data.byteOffset, data.byteLength);
+        const magic = String.fromCharCode(...data.subarray(0, 4));
+        if (magic !== 'MTH1' || data[4] !== LAYOUT_VERSION) {
+            throw new Error('Trilha .mouth inválida ou de outro layout');
+        }
+        const fps = view.getFloat32(6, true);
+        const frames = view.getUint32(10, true);
+
+        const openness = new Float32Array(frames);
+        let value = 0;
+        let ready = false;
+        let offset = HEADER_SIZE;
+        for (let f = 0; f < frames && offset < data.length; f++) {
+            const length = data[offset++];
+            if (length) {
+                const header = data[offset];
+                if ((header & 0x0f) === 1) ready = true;
+                const mask = data[offset + 1] | (data[offset + 2] << 8);
+                if (ready && (mask & (1 << MOUTH))) {
+                    // Bytes dos canais presentes antes do canal da boca
+                    let position = offset + 3;
+                    for (let i = 0; i < MOUTH; i++) {
+                        if (mask & (1 << i)) position += BITS[i] > 8 ? 2 : 1;
+                    }
+                    value = data[position] / 255;
+                }
+            }
+            openness[f] = value;
+            offset += length;
+        }
+        return { fps, mouth_openness: openness };
+    }
+
+    bakedOpenness() {
+        // Só enquanto o áudio toca; pausado ou no fim, volta à análise ao vivo
+        const track = this.mouthTrack;
+        const audio = this.audioElement;
+        if (!track || !audio || audio.paused || audio.ended) return null;
+        const values = track.mouth_openness;
+        const index = Math.floor(audio.currentTime * track.fps);
+        return values[Math.min(values.length - 1, Math.max(0, index))];
+    }
+
     animateMask() {
         requestAnimationFrame(() => this.animateMask());
 
+        // Trilha pré-calculada: só uma leitura por frame, sem análise do áudio
+        const baked = this.bakedOpenness();
+        if (baked !== null) {
+            this.updateExpression(null, baked);
+            return;
+        }
+
         this.analyser.getByteTimeDomainData(this.dataArray);
 
         const canvas = this.maskCanvas;
@@ -87,21 +168,81 @@ class SpeechDrivenAnimation {
         return sum / array.length;
     }
 
-    updateExpression(volume) {
+    updateExpression(volume, openness = null) {
         const faceModel = window.faceAnalysisManager?.currentAnalysis;
 
         if (!faceModel) return;
 
-        faceModel.features.mouth.aspect_ratio = (volume / 255 * 1.5).toFixed(2);
+        // mouth_openness = aspect_ratio * 6 em create_animation_data (Python)
+        faceModel.features.mouth.aspect_ratio = openness !== null
+            ? (openness / 6).toFixed(2)
+            : (volume / 255 * 1.5).toFixed(2);
         faceModel.features.eyes.average_openness = 1 - faceModel.features.mouth.aspect_ratio;
+        this.applyFacialEvents(faceModel);
 
         // Update facial parameters UI (for demonstration purpose)
         window.faceAnalysisManager.updateFacialParameters();
     }
 
+    connectEventStream(url = 'http://localhost:8766/stream') {
+        // Eventos de piscada/fala do stream ao vivo; substituem os booleanos por frame
+        if (this.eventStream) {
+            this.eventStream.close();
+        }
+
+        this.eventStream = new EventSource(url);
+        this.eventStream.onmessage = (event) => {
+            const anim = JSON.parse(event.data);
+            if (!anim.events) return;
+
+            const changed = anim.events.blinking !== this.facialEvents.blinking ||
+                anim.events.speaking !== this.facialEvents.speaking;
+            this.facialEvents = anim.events;
+
+            // Sem áudio tocando, só as transições atualizam a interface
+            const faceModel = window.faceAnalysisManager?.currentAnalysis;
+            if (changed && faceModel) {
+                this.applyFacialEvents(faceModel);
+                window.faceAnalysisManager.updateFacialParameters();
+            }
+        };
+        // Eventos discretos chegam à parte ("event: facial"), mesmo quando frames são descartados
+        this.eventStream.addEventListener('facial', (event) => {
+            const facial = JSON.parse(event.data);
+            window.dispatchEvent(new CustomEvent('facialevent', { detail: facial }));
+
+            // Piscada inteira entre dois frames enviados: mostrar mesmo assim, pela duração medida
+            if (facial.type === 'blink_end' && !this.facialEvents.blinking) {
+                this.blinkUntil = performance.now() + (facial.duration || 0.15) * 1000;
+                const faceModel = window.faceAnalysisManager?.currentAnalysis;
+                if (faceModel) {
+                    this.applyFacialEvents(faceModel);
+                    window.faceAnalysisManager.updateFacialParameters();
+                }
+            }
+        });
+        this.eventStream.onerror = () => {
+            console.log('⚠️ Stream de eventos indisponível, tentando reconectar...');
+        };
+    }
+
+    applyFacialEvents(faceModel) {
+        const events = this.facialEvents;
+        const { eyes, mouth } = faceModel.features;
+
+        const blinking = events.blinking || performance.now() < this.blinkUntil;
+        eyes.is_blinking = blinking;
+        eyes.blink_rate = events.blink_rate;
+        if (blinking) {
+            eyes.average_openness = 0;
+        }
+        mouth.is_speaking = events.speaking;
+    }
+
     startUsingBotAudio() {
         const audioElement = document.getElementById('botAudio');
         if (audioElement) {
+            this.audioElement = audioElement;
             const sourceNode = this.audioContext.createMediaElementSource(audioElement);
             this.connectAudioSource(sourceNode);
         }
@@ -118,6 +259,18 @@ document.addEventListener('DOMContentLoaded', () => {
         window.speechDrivenAnimation.startUsingBotAudio();
     });
 
+    // ?live conecta os eventos de piscada/fala do python/animation_stream.py
+    if (new URLSearchParams(window.location.search).get('live') !== null) {
+        window.speechDrivenAnimation.connectEventStream();
+    }
+
+    // ?mouth=<trilha.mouth> usa a curva pré-calculada do áudio do bot
+    const mouthTrack = new URLSearchParams(window.location.search).get('mouth');
+    if (mouthTrack) {
+        window.speechDrivenAnimation.loadMouthTrack(mouthTrack)
+            .catch(error => console.error('Erro ao carregar trilha da boca:', error));
+    }
+
     // Placeholder para áudio
     const audioPlaceholder = document.createElement('audio');
     audioPlaceholder.id = 'botAudio';
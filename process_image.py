@@ -1,21 +1,46 @@
 import os
+import argparse
 from python.face_analyzer import FaceAnalyzer
 from python.extract_traces import extract_traces
+from python.asset_manifest import AssetManifest, module_dependencies
 
 IMAGE_PATH = 'assets/rosto3d.png'
 ANALYZED_IMAGE_PATH = 'assets/rosto3d_analyzed.png'
 TRACED_IMAGE_PATH = 'assets/rosto3d_traces.png'
+ANALYSIS_PATH = 'face_analysis.json'
 
-# Instancia o FaceAnalyzer
-face_analyzer = FaceAnalyzer()
+parser = argparse.ArgumentParser(description="Análise facial e extração de traços de rosto3d.png")
+parser.add_argument("--incremental", action="store_true",
+                    help="Pular etapas cujas entradas, código e saídas não mudaram (manifesto em assets/)")
+parser.add_argument("--force", action="store_true", help="Com --incremental, refazer tudo e atualizar o manifesto")
+args = parser.parse_args()
 
-# Análise facial
-result = face_analyzer.analyze_face(IMAGE_PATH)
-if result:
-    face_analyzer.save_analysis(result)
+manifest = AssetManifest.for_directory(os.path.dirname(IMAGE_PATH)) if args.incremental else None
+
+# Instancia o FaceAnalyzer apenas se a análise for executada
+def build_analysis():
+    face_analyzer = FaceAnalyzer()
+    result = face_analyzer.analyze_face(IMAGE_PATH)
+    if not result:
+        return None
+    face_analyzer.save_analysis(result, ANALYSIS_PATH)
     face_analyzer.create_debug_image(IMAGE_PATH, result, ANALYZED_IMAGE_PATH)
+    return [ANALYSIS_PATH, ANALYZED_IMAGE_PATH]
+
+def build_traces():
+    extract_traces(IMAGE_PATH, TRACED_IMAGE_PATH)
+    return [TRACED_IMAGE_PATH]
 
-# Gerar máscara de traços
-extract_traces(IMAGE_PATH, TRACED_IMAGE_PATH)
+if manifest is None:
+    # Análise facial
+    build_analysis()
+    # Gerar máscara de traços
+    build_traces()
+else:
+    manifest.run("analysis:" + os.path.basename(IMAGE_PATH),
+                 [IMAGE_PATH] + module_dependencies("face_analyzer.py"), {}, build_analysis, args.force)
+    manifest.run("traces:" + os.path.basename(IMAGE_PATH),
+                 [IMAGE_PATH] + module_dependencies("extract_traces.py"), {"canny": [100, 200]}, build_traces, args.force)
+    manifest.save()
 
 print("Processamento completo: Imagem analisada e traços extraídos.")
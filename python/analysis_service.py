@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Analysis Service - Serviço HTTP local de análise facial com modelos pré-aquecidos
+Mantém instâncias de FaceContourAnalyzer carregadas, recebe imagens via POST,
+entrega cada requisição ao próximo analisador livre e devolve o mesmo esquema de
+FaceContourAnalyzer.process_image (sem gravar arquivos, salvo quando pedido)
+"""
+
+import asyncio
+import cv2
+import numpy as np
+import json
+import os
+import queue
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from email.parser import BytesHeaderParser
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    from face_contour_analyzer import FaceContourAnalyzer
+    from output_writer import OutputWriter
+    from thread_budget import ThreadBudget, add_budget_arguments
+    from frame_context import FrameContext
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.face_contour_analyzer import FaceContourAnalyzer
+    from python.output_writer import OutputWriter
+    from python.thread_budget import ThreadBudget, add_budget_arguments
+    from python.frame_context import FrameContext
+
+MAX_UPLOAD_BYTES = 32 * 1024 * 1024
+
+HTTP_STATUS = {
+    200: "OK",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error"
+}
+
+
+class AnalysisJob:
+    """Uma requisição de análise aguardando um analisador livre"""
+
+    def __init__(self, data: bytes, name: str, save: bool, future: asyncio.Future):
+        self.data = data
+        self.name = name
+        self.save = save
+        self.future = future
+
+
+class AnalysisService:
+    def __init__(self, workers: int = 2, output_dir: str = "output",
+                 contour_tolerance: Optional[float] = None):
+        """Inicializa o pool de analisadores aquecidos
+
+        Cada worker tem seu próprio FaceContourAnalyzer (FaceMesh não é thread-safe).
+        O FaceMesh não tem inferência em lote: cada requisição vai para o próximo
+        analisador livre e é respondida assim que termina.
+        """
+        self.workers = workers
+        self.output_dir = output_dir
+        self.contour_tolerance = contour_tolerance
+
+        self._analyzers: "queue.Queue[FaceContourAnalyzer]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-worker")
+        self._writer: Optional[OutputWriter] = None
+        self._jobs: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats = {"requests": 0, "errors": 0}
+
+    def warm_up(self):
+        """Constrói os analisadores e executa uma inferência em cada um para carregar o grafo"""
+        blank = np.zeros((192, 192, 3), dtype=np.uint8)
+        for _ in range(self.workers):
+            analyzer = FaceContourAnalyzer(contour_tolerance=self.contour_tolerance)
+            analyzer.face_mesh.process(blank)
+            self._analyzers.put(analyzer)
+        print(f"✅ {self.workers} analisador(es) aquecido(s)")
+
+    def _run_job(self, job: AnalysisJob) -> Tuple[int, Dict]:
+        """Executa uma requisição em um analisador livre (roda em thread do pool)"""
+        analyzer = self._analyzers.get()
+        try:
+            return self._analyze_job(analyzer, job)
+        finally:
+            self._analyzers.put(analyzer)
+
+    def _analyze_job(self, analyzer: FaceContourAnalyzer, job: AnalysisJob) -> Tuple[int, Dict]:
+        image = cv2.imdecode(np.frombuffer(job.data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return 400, {"error": "Imagem inválida ou formato não suportado"}
+        # RGB da detecção e cinza das máscaras compartilhados entre analyze_image e save_artifacts
+        image = FrameContext(bgr=image)
+
+        started = time.perf_counter()
+        analysis = analyzer.analyze_image(image, job.name)
+        if "error" in analysis:
+            return 422, analysis
+
+        result = {
+            "image_path": job.name,
+            "timestamp": analysis["timestamp"],
+            "face_detected": True,
+            "landmarks_count": analysis["landmarks_count"],
+            "features": analysis["features"],
+            "contours": analysis["contours"]
+        }
+        if "contour_tolerance" in analysis:
+            result["contour_tolerance"] = analysis["contour_tolerance"]
+
+        if job.save:
+            base_name = os.path.splitext(os.path.basename(job.name))[0] or "upload"
+            os.makedirs(self.output_dir, exist_ok=True)
+            result["output_directory"] = self.output_dir
+            result["files_generated"] = analyzer.save_artifacts(image, analysis, base_name,
+                                                                self.output_dir, self._writer)
+            self._writer.submit_json(os.path.join(self.output_dir, f"{base_name}_analysis.json"), dict(result))
+
+        result["processing_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+        return 200, result
+
+    async def _dispatcher(self):
+        """Entrega cada requisição ao próximo analisador livre, na ordem de chegada"""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._jobs.get()
+            # Sem analisador livre, as requisições seguintes esperam na fila
+            await self._slots.acquire()
+            task = loop.run_in_executor(self._executor, self._run_job, job)
+            task.add_done_callback(lambda t, job=job: self._complete_job(t, job))
+
+    def _complete_job(self, task: asyncio.Future, job: AnalysisJob):
+        self._slots.release()
+        if task.exception() is not None:
+            outcome = (500, {"error": f"Erro na análise: {task.exception()}"})
+        else:
+            outcome = task.result()
+        if not job.future.done():
+            job.future.set_result(outcome)
+
+    async def analyze(self, data: bytes, name: str = "upload", save: bool = False) -> Tuple[int, Dict]:
+        """Enfileira uma imagem codificada e aguarda o resultado"""
+        self.stats["requests"] += 1
+        future = asyncio.get_running_loop().create_future()
+        await self._jobs.put(AnalysisJob(data, name, save, future))
+        status, result = await future
+        if status != 200:
+            self.stats["errors"] += 1
+        return status, result
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_http_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self._route(method, target, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await send_json(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            await send_json(writer, e.status, {"error": e.message}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Optional[Dict]]:
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+
+        if method == "OPTIONS":
+            return 204, None
+
+        if url.path == "/health":
+            return 200, {
+                "status": "ok",
+                "workers": self.workers,
+                "queued": self._jobs.qsize(),
+                "stats": dict(self.stats)
+            }
+
+        if url.path == "/analyze":
+            if method != "POST":
+                return 405, {"error": "Use POST com a imagem no corpo"}
+            data, filename = extract_upload(body, headers.get("content-type", ""))
+            if not data:
+                return 400, {"error": "Nenhuma imagem enviada"}
+            name = params.get("name", [filename or "upload"])[0]
+            save = params.get("save", ["0"])[0].lower() in ("1", "true", "yes")
+            return await self.analyze(data, name, save)
+
+        return 404, {"error": f"Rota não encontrada: {url.path}"}
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        """Inicia o servidor e processa requisições até ser interrompido"""
+        self._jobs = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._writer = OutputWriter()
+        dispatcher = asyncio.create_task(self._dispatcher())
+
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"🌐 Serviço de análise em http://{host}:{port} (POST /analyze, GET /health)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            dispatcher.cancel()
+            self._writer.close()
+            self._executor.shutdown(wait=True)
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def read_http_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Lê uma requisição HTTP/1.1 (somente corpos com Content-Length)"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").strip().split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Linha de requisição inválida")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    body = b""
+    if "transfer-encoding" in headers:
+        raise HttpError(411, "Envie o corpo com Content-Length")
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise HttpError(400, "Content-Length inválido")
+    if length < 0:
+        raise HttpError(400, "Content-Length inválido")
+    if length > MAX_UPLOAD_BYTES:
+        raise HttpError(413, "Imagem muito grande")
+    if length:
+        body = await reader.readexactly(length)
+    return method.upper(), target, headers, body
+
+
+def extract_upload(body: bytes, content_type: str) -> Tuple[bytes, Optional[str]]:
+    """Extrai os bytes da imagem de um corpo bruto ou multipart/form-data
+
+    Cabeçalhos são lidos com o parser de email (parâmetros entre aspas com ';' ou
+    aspas escapadas, filename* em RFC 2231).
+    """
+    header = Message()
+    header["content-type"] = content_type
+    if header.get_content_type() != "multipart/form-data":
+        return body, None
+
+    boundary = header.get_param("boundary")
+    if not boundary:
+        return b"", None
+
+    for part in body.split(b"--" + boundary.encode("latin-1")):
+        head, sep, content = part.partition(b"\r\n\r\n")
+        if not sep:
+            continue
+        headers = BytesHeaderParser().parsebytes(head.lstrip(b"\r\n") + b"\r\n\r\n")
+        filename = headers.get_filename()
+        if filename is None:
+            continue
+        return content.rsplit(b"\r\n", 1)[0], filename
+    return b"", None
+
+
+async def send_json(writer: asyncio.StreamWriter, status: int, payload: Optional[Dict], keep_alive: bool = True):
+    """Envia uma resposta JSON com cabeçalhos CORS (a interface roda em outra porta)"""
+    body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = [
+        f"HTTP/1.1 {status} {HTTP_STATUS.get(status, 'OK')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        "Access-Control-Allow-Origin: *",
+        "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+        "Access-Control-Allow-Headers: Content-Type",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}"
+    ]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de análise facial")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    parser.add_argument("--port", "-p", type=int, default=8765, help="Porta HTTP")
+    parser.add_argument("--workers", "-w", type=int, default=2, help="Analisadores aquecidos em paralelo")
+    parser.add_argument("--output", "-o", default="output", help="Diretório para ?save=1")
+    parser.add_argument("--simplify", type=float, metavar="PX",
+                        help="Simplificar os contornos enviados com esta tolerância em pixels")
+    add_budget_arguments(parser)
+
+    args = parser.parse_args()
+
+    # Analisadores são threads do mesmo processo: dividem os núcleos reservados ao serviço
+    budget = ThreadBudget(args.workers, args.cores, args.pin)
+    budget.apply()
+    budget.print_report()
+
+    service = AnalysisService(args.workers, args.output, args.simplify)
+    service.warm_up()
+
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Serviço encerrado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Animation Frame - Layout fixo dos parâmetros de animação e codificação delta
+Cada frame de facial_animation vira um vetor float32 com canais em ordem
+declarada e versionada; o encoder envia apenas os canais que mudaram,
+quantizados em 8 ou 16 bits (poucos bytes por frame em vez de um JSON)
+
+Formato de uma mensagem:
+    byte 0      versão do layout (4 bits altos) | tipo (0 = delta, 1 = keyframe)
+    bytes 1-2   máscara (uint16 little-endian) dos canais presentes
+    restante    valores quantizados dos canais presentes, na ordem do layout
+                (1 byte para canais de 8 bits, 2 bytes little-endian para 16 bits)
+"""
+
+import numpy as np
+import struct
+from typing import Dict, Optional
+
+ANIMATION_LAYOUT_VERSION = 1
+
+EMOTIONS = ("neutral", "happy", "sad", "angry", "surprised", "fear", "disgust")
+
+# (nome, mínimo, máximo, bits de quantização)
+CHANNELS = (
+    ("eye_openness", 0.0, 1.0, 8),
+    ("mouth_openness", 0.0, 1.0, 8),
+    ("eye_x", -1.0, 1.0, 16),
+    ("eye_y", -1.0, 1.0, 16),
+    ("smile", 0.0, 1.0, 8),
+    ("frown", 0.0, 1.0, 8),
+    ("eyeSquint", 0.0, 1.0, 8),
+    ("eyebrowUp", 0.0, 1.0, 8),
+    ("eyebrowDown", 0.0, 1.0, 8),
+    ("eyeWide", 0.0, 1.0, 8),
+    ("mouthOpen", 0.0, 1.0, 8),
+    ("noseWrinkle", 0.0, 1.0, 8),
+    ("emotion_intensity", 0.0, 1.0, 8),
+    ("emotion", 0.0, 255.0, 8),  # índice em EMOTIONS (quantização 1:1)
+)
+
+CHANNEL_NAMES = tuple(c[0] for c in CHANNELS)
+CHANNEL_INDEX = {name: i for i, name in enumerate(CHANNEL_NAMES)}
+EXPRESSION_CHANNELS = CHANNEL_NAMES[4:12]
+
+_LOW = np.array([c[1] for c in CHANNELS], dtype=np.float32)
+_HIGH = np.array([c[2] for c in CHANNELS], dtype=np.float32)
+_BITS = np.array([c[3] for c in CHANNELS], dtype=np.int32)
+_LEVELS = (2 ** _BITS - 1).astype(np.float32)
+
+KIND_DELTA = 0
+KIND_KEYFRAME = 1
+FULL_MASK = (1 << len(CHANNELS)) - 1
+
+
+def layout_description() -> Dict:
+    """Layout em JSON (servido para o navegador conferir a versão)"""
+    return {
+        "version": ANIMATION_LAYOUT_VERSION,
+        "channels": [{"name": n, "min": lo, "max": hi, "bits": bits} for n, lo, hi, bits in CHANNELS],
+        "emotions": list(EMOTIONS)
+    }
+
+
+def pack_animation(facial_animation: Dict, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Converte o bloco facial_animation de create_animation_data no vetor float32 do layout"""
+    vector = out if out is not None else np.zeros(len(CHANNELS), dtype=np.float32)
+    vector[:] = 0.0
+
+    vector[0] = facial_animation.get("eye_openness", 0.0)
+    vector[1] = facial_animation.get("mouth_openness", 0.0)
+    position = facial_animation.get("eye_position", {})
+    vector[2] = position.get("x", 0.0)
+    vector[3] = position.get("y", 0.0)
+    for name, weight in facial_animation.get("expression_weights", {}).items():
+        if name in CHANNEL_INDEX:
+            vector[CHANNEL_INDEX[name]] = weight
+
+    emotion = facial_animation.get("emotion", {})
+    vector[12] = emotion.get("intensity", 0.0)
+    current = emotion.get("current", "neutral")
+    vector[13] = EMOTIONS.index(current) if current in EMOTIONS else 0
+    return vector
+
+
+def unpack_animation(vector: np.ndarray, precision: int = 3) -> Dict:
+    """Reconstrói o formato compacto de facial_animation a partir do vetor"""
+    values = [round(float(v), precision) for v in vector]
+    emotion_index = int(values[13])
+    return {
+        "eye_openness": values[0],
+        "mouth_openness": values[1],
+        "eye_position": {"x": values[2], "y": values[3]},
+        "expression_weights": {name: values[CHANNEL_INDEX[name]] for name in EXPRESSION_CHANNELS
+                               if values[CHANNEL_INDEX[name]] != 0.0},
+        "emotion": {
+            "current": EMOTIONS[emotion_index] if emotion_index < len(EMOTIONS) else "neutral",
+            "intensity": values[12]
+        }
+    }
+
+
+def quantize(vector: np.ndarray) -> np.ndarray:
+    """Valores inteiros de cada canal na resolução do layout"""
+    unit = (np.clip(vector, _LOW, _HIGH) - _LOW) / (_HIGH - _LOW)
+    return np.rint(unit * _LEVELS).astype(np.int32)
+
+
+def dequantize(q: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    values = _LOW + q.astype(np.float32) / _LEVELS * (_HIGH - _LOW)
+    if out is None:
+        return values.astype(np.float32)
+    out[:] = values
+    return out
+
+
+class AnimationDeltaEncoder:
+    def __init__(self, keyframe_interval: int = 300, threshold: int = 1):
+        """Codifica frames em relação ao último valor enviado de cada canal
+
+        threshold é a variação mínima (em passos de quantização) para reenviar um canal;
+        a cada keyframe_interval mensagens todos os canais são reenviados.
+        """
+        self.keyframe_interval = keyframe_interval
+        self.threshold = threshold
+        self._last: Optional[np.ndarray] = None
+        self._since_keyframe = 0
+
+    def reset(self):
+        """Força um keyframe na próxima mensagem (ex: novo cliente)"""
+        self._last = None
+
+    def encode(self, vector: np.ndarray) -> Optional[bytes]:
+        """Mensagem para o frame, ou None se nenhum canal mudou o suficiente"""
+        q = quantize(vector)
+        keyframe = (self._last is None or
+                    (self.keyframe_interval and self._since_keyframe >= self.keyframe_interval))
+
+        if keyframe:
+            changed = np.ones(len(q), dtype=bool)
+            self._last = q.copy()
+            self._since_keyframe = 0
+        else:
+            changed = np.abs(q - self._last) >= self.threshold
+            if not changed.any():
+                return None
+            # Só os canais enviados avançam: deriva lenta acaba ultrapassando o limiar
+            self._last[changed] = q[changed]
+        self._since_keyframe += 1
+
+        mask = int(np.dot(changed, 1 << np.arange(len(q), dtype=np.int64)))
+        parts = [struct.pack("<BH", (ANIMATION_LAYOUT_VERSION << 4) | (KIND_KEYFRAME if keyframe else KIND_DELTA),
+                             mask)]
+        for i in np.flatnonzero(changed):
+            parts.append(struct.pack("<H" if _BITS[i] > 8 else "<B", int(q[i])))
+        return b"".join(parts)
+
+
+class AnimationDeltaDecoder:
+    def __init__(self):
+        """Mantém o estado quantizado e o vetor float32 atualizado no lugar"""
+        self._q = np.zeros(len(CHANNELS), dtype=np.int32)
+        self.vector = np.zeros(len(CHANNELS), dtype=np.float32)
+        self.ready = False
+
+    def decode(self, message: bytes) -> Optional[np.ndarray]:
+        """Aplica uma mensagem; retorna o vetor atual (None até o primeiro keyframe)"""
+        header, mask = struct.unpack_from("<BH", message, 0)
+        version, kind = header >> 4, header & 0x0F
+        if version != ANIMATION_LAYOUT_VERSION:
+            raise ValueError(f"Versão de layout não suportada: {version}")
+        if kind == KIND_KEYFRAME:
+            self.ready = True
+        elif not self.ready:
+            return None
+
+        offset = 3
+        for i in range(len(CHANNELS)):
+            if mask & (1 << i):
+                if _BITS[i] > 8:
+                    self._q[i] = struct.unpack_from("<H", message, offset)[0]
+                    offset += 2
+                else:
+                    self._q[i] = message[offset]
+                    offset += 1
+        return dequantize(self._q, self.vector)
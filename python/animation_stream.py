@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Animation Stream - Transmissão ao vivo dos parâmetros de animação via Server-Sent Events
+Publica por frame o bloco facial_animation de create_animation_data para o navegador,
+com mensagens compactas, taxa de envio configurável e descarte dos frames intermediários
+quando o cliente é lento (cada cliente recebe sempre o frame mais recente).
+Eventos discretos (piscadas, início/fim de fala) não são descartados: ficam em um
+buffer circular com número de sequência e vão como mensagens SSE "event: facial".
+/frames transmite o mesmo conteúdo em binário (animation_frame: só canais alterados)
+"""
+
+import asyncio
+import cv2
+import json
+import threading
+import time
+import argparse
+from collections import deque
+import mediapipe as mp
+import numpy as np
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    from simple_face_analyzer import SimpleFaceAnalyzer
+    from animation_frame import AnimationDeltaEncoder, pack_animation, layout_description
+    from frame_ring import open_capture
+    from landmark_archive import LandmarkArchiveWriter
+    from face_gate import GatedFaceMesh
+    from facial_events import FacialEventDetector
+    from engine_config import EngineFactory, add_config_arguments, factory_from_args
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.simple_face_analyzer import SimpleFaceAnalyzer
+    from python.animation_frame import AnimationDeltaEncoder, pack_animation, layout_description
+    from python.frame_ring import open_capture
+    from python.landmark_archive import LandmarkArchiveWriter
+    from python.face_gate import GatedFaceMesh
+    from python.facial_events import FacialEventDetector
+    from python.engine_config import EngineFactory, add_config_arguments, factory_from_args
+
+
+def compact_animation(facial_animation: Dict, precision: int = 3, include_scores: bool = False) -> Dict:
+    """Arredonda os valores e remove o que o renderizador não usa a cada frame"""
+    def rounded(value):
+        if isinstance(value, float):
+            return round(value, precision)
+        if isinstance(value, dict):
+            return {k: rounded(v) for k, v in value.items()}
+        return value
+
+    emotion = facial_animation.get("emotion", {})
+    message = {
+        "eye_openness": facial_animation.get("eye_openness", 0.0),
+        "mouth_openness": facial_animation.get("mouth_openness", 0.0),
+        "eye_position": facial_animation.get("eye_position", {"x": 0.0, "y": 0.0}),
+        "expression_weights": facial_animation.get("expression_weights", {}),
+        "emotion": {
+            "current": emotion.get("current", "neutral"),
+            "intensity": emotion.get("intensity", 0.0)
+        }
+    }
+    if include_scores:
+        message["emotion"]["all_scores"] = emotion.get("all_scores", {})
+    if "events" in facial_animation:
+        message["events"] = facial_animation["events"]
+    return rounded(message)
+
+
+def sse_message(payload: bytes, event: Optional[str] = None, event_id: Optional[int] = None) -> bytes:
+    """Mensagem SSE (campos event/id opcionais)"""
+    head = b""
+    if event:
+        head += b"event: " + event.encode("ascii") + b"\n"
+    if event_id is not None:
+        head += b"id: %d\n" % event_id
+    return head + b"data: " + payload + b"\n\n"
+
+
+class AnimationBroadcaster:
+    def __init__(self, send_rate: float = 30.0, include_scores: bool = False, event_buffer: int = 256):
+        """Guarda apenas o frame mais recente; clientes lentos pulam os intermediários
+
+        Eventos discretos ficam nos últimos event_buffer itens de um buffer circular, para
+        que cada cliente receba todos os que ocorreram desde o seu último envio.
+        """
+        self.send_interval = 1.0 / send_rate if send_rate > 0 else 0.0
+        self.include_scores = include_scores
+        self._lock = threading.Lock()
+        self._latest: Optional[bytes] = None
+        self._latest_vector: Optional[np.ndarray] = None
+        self._sequence = 0
+        self._events: Deque[Tuple[int, bytes]] = deque(maxlen=event_buffer)
+        self._event_sequence = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+        self.clients = 0
+        self.frames_published = 0
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Associa o broadcaster ao event loop do servidor"""
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def publish(self, facial_animation: Dict, timestamp: Optional[float] = None,
+                events: Optional[List[Dict]] = None):
+        """Publica os parâmetros de um frame e os eventos novos dele (seguro para chamar de qualquer thread)"""
+        message = compact_animation(facial_animation, include_scores=self.include_scores)
+        vector = pack_animation(facial_animation)
+        with self._lock:
+            for event in events or ():
+                self._event_sequence += 1
+                payload = dict(event, seq=self._event_sequence)
+                self._events.append((self._event_sequence,
+                                     json.dumps(payload, separators=(",", ":")).encode("utf-8")))
+            self._sequence += 1
+            message["seq"] = self._sequence
+            message["t"] = round(timestamp if timestamp is not None else time.time(), 3)
+            self._latest = json.dumps(message, separators=(",", ":")).encode("utf-8")
+            self._latest_vector = vector
+            self.frames_published += 1
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._changed.set)
+
+    def latest(self):
+        """Retorna (sequência, mensagem codificada) do frame mais recente"""
+        with self._lock:
+            return self._sequence, self._latest
+
+    def events_since(self, sequence: int) -> Tuple[int, List[Tuple[int, bytes]]]:
+        """(sequência do último evento, eventos posteriores a sequence ainda no buffer)"""
+        with self._lock:
+            return self._event_sequence, [(seq, payload) for seq, payload in self._events if seq > sequence]
+
+    def latest_vector(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Retorna (sequência, vetor float32 do layout de animation_frame) do frame mais recente"""
+        with self._lock:
+            return self._sequence, self._latest_vector
+
+    async def wait_newer(self, sequence: int):
+        """Aguarda até existir um frame com sequência maior que a informada"""
+        while True:
+            current, _ = self.latest()
+            if current > sequence:
+                return
+            self._changed.clear()
+            current, _ = self.latest()
+            if current > sequence:
+                return
+            await self._changed.wait()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão HTTP: /stream (SSE), /frames (binário), /layout ou /latest (JSON)"""
+        try:
+            request_line = await reader.readline()
+            last_event_id = None
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "last-event-id" and value.strip().isdigit():
+                    last_event_id = int(value)  # reconexão do EventSource: reenviar os eventos perdidos
+            parts = request_line.decode("latin-1").split(" ")
+            path = parts[1].split("?")[0] if len(parts) > 1 else "/"
+
+            if path in ("/latest", "/layout"):
+                _, payload = self.latest()
+                if path == "/layout":
+                    payload = json.dumps(layout_description()).encode("utf-8")
+                body = payload or b"{}"
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Access-Control-Allow-Origin: *\r\nConnection: close\r\n"
+                             + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+                return
+
+            if path == "/frames":
+                # Sequência de mensagens de animation_frame, cada uma precedida por 1 byte de tamanho
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/octet-stream\r\nCache-Control: no-cache\r\n"
+                             b"Access-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                await self._stream_to(writer, self._frame_chunks())
+                return
+
+            if path != "/stream":
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Access-Control-Allow-Origin: *\r\nConnection: keep-alive\r\n\r\n"
+                         b"retry: 1000\n\n")
+            await writer.drain()
+            await self._stream_to(writer, self._event_chunks(last_event_id))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _event_chunks(self, last_event_id: Optional[int] = None) -> Callable[[], Tuple[int, Optional[bytes]]]:
+        # Eventos pendentes deste cliente antes do frame mais recente (que pode ter sido coalescido)
+        sent_event = last_event_id if last_event_id is not None else self.events_since(0)[0]
+
+        def next_chunk():
+            nonlocal sent_event
+            sequence, payload = self.latest()
+            sent_event, events = self.events_since(sent_event)
+            chunk = b"".join(sse_message(event, "facial", seq) for seq, event in events)
+            return sequence, chunk + sse_message(payload)
+        return next_chunk
+
+    def _frame_chunks(self) -> Callable[[], Tuple[int, Optional[bytes]]]:
+        # Um encoder por cliente: os deltas são relativos ao que este cliente já recebeu
+        encoder = AnimationDeltaEncoder()
+
+        def next_chunk():
+            sequence, vector = self.latest_vector()
+            message = encoder.encode(vector)
+            return sequence, (bytes([len(message)]) + message) if message else None
+        return next_chunk
+
+    async def _stream_to(self, writer: asyncio.StreamWriter, next_chunk: Callable[[], Tuple[int, Optional[bytes]]]):
+        self.clients += 1
+        sent_sequence = 0
+        last_sent = 0.0
+        try:
+            while True:
+                await self.wait_newer(sent_sequence)
+
+                # Respeitar a taxa de envio; frames que chegarem nesse intervalo são descartados
+                wait = self.send_interval - (time.perf_counter() - last_sent)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                sent_sequence, chunk = next_chunk()
+                if chunk is None:  # nenhum canal mudou
+                    continue
+                writer.write(chunk)
+                # drain() bloqueia enquanto o cliente está lento; ao voltar, só o mais recente é enviado
+                await writer.drain()
+                last_sent = time.perf_counter()
+        finally:
+            self.clients -= 1
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8766):
+        """Inicia o servidor SSE e atende clientes até ser interrompido"""
+        self.attach(asyncio.get_running_loop())
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"📡 Parâmetros de animação em http://{host}:{port}/stream")
+        async with server:
+            await server.serve_forever()
+
+
+class LiveAnimationSource:
+    def __init__(self, broadcaster: AnimationBroadcaster, camera_device=0,
+                 min_detection_confidence: float = 0.5, min_tracking_confidence: float = 0.5,
+                 archive: Optional[LandmarkArchiveWriter] = None, engines: Optional[EngineFactory] = None):
+        """Captura a câmera sem janela e publica os parâmetros de animação de cada frame
+
+        Com engines (engine_config), FaceMesh e portão vêm da configuração (seções
+        live_face_mesh e face_detection) e as confianças passadas aqui são ignoradas.
+        """
+        self.broadcaster = broadcaster
+        self.camera_device = camera_device
+        self.archive = archive
+        self.analyzer = SimpleFaceAnalyzer()
+        self.events = FacialEventDetector()
+        if engines is not None:
+            self.face_mesh = engines.get("live_face_mesh")
+            gate = engines.get("face_gate")
+        else:
+            self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence
+            )
+            gate = None
+        # Sem rosto na cena o mesh não roda (FaceDetection de curto alcance em frame reduzido)
+        self.gated_mesh = GatedFaceMesh(self.face_mesh, gate)
+        self._stop = threading.Event()
+
+    def publish_landmarks(self, face_landmarks, w: int, h: int):
+        """Converte landmarks do MediaPipe em parâmetros de animação e publica"""
+        publish_face(self.analyzer, self.broadcaster, face_landmarks, w, h, self.events)
+
+    def run(self):
+        """Loop de captura (executar em thread separada)"""
+        cap = open_capture(self.camera_device)
+        if not cap.isOpened():
+            print("Erro: Não foi possível abrir a webcam")
+            return
+
+        print("🎥 Captura iniciada (headless)")
+        try:
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame = cv2.flip(frame, 1)
+                h, w = frame.shape[:2]
+                results = self.gated_mesh.process(frame)
+                multi_face_landmarks = results.multi_face_landmarks if results else None
+                if self.archive is not None:
+                    if not self.archive.width:
+                        self.archive.set_frame_size(w, h)
+                    self.archive.append_mediapipe(multi_face_landmarks)
+                if multi_face_landmarks:
+                    self.publish_landmarks(multi_face_landmarks[0], w, h)
+        finally:
+            cap.release()
+            stats = self.gated_mesh.summary()
+            print(f"Captura encerrada (mesh pulado em {stats['skipped']}/{stats['frames']} frames sem rosto)")
+
+    def stop(self):
+        self._stop.set()
+
+
+def publish_face(analyzer: SimpleFaceAnalyzer, broadcaster: AnimationBroadcaster, face_landmarks, w: int, h: int,
+                 events: Optional[FacialEventDetector] = None):
+    """Calcula o bloco facial_animation de uma face do MediaPipe e o publica
+
+    Com um FacialEventDetector, a mensagem leva também "events": estado de piscada/fala
+    com histerese e taxa de piscadas. Os eventos novos do frame seguem à parte
+    (mensagens "event: facial"), para não se perderem quando frames são descartados.
+    """
+    landmarks = [[int(lm.x * w), int(lm.y * h)] for lm in face_landmarks.landmark]
+    result = analyzer.analyze_landmarks(landmarks, w, h)
+    facial_animation = result["animation"]["facial_animation"]
+    new_events = None
+    if events is not None:
+        new_events = events.update_analysis(result, result["timestamp"])
+        facial_animation["events"] = events.state()
+    broadcaster.publish(facial_animation, result["timestamp"], new_events)
+
+
+def make_tracker_publisher(broadcaster: AnimationBroadcaster) -> Callable:
+    """Callback para FaceTracker3D.process_webcam(on_landmarks=...)"""
+    analyzer = SimpleFaceAnalyzer()
+    events = FacialEventDetector()
+    return lambda face_landmarks, w, h: publish_face(analyzer, broadcaster, face_landmarks, w, h, events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transmissão ao vivo dos parâmetros de animação (SSE)")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    parser.add_argument("--port", "-p", type=int, default=8766, help="Porta HTTP")
+    parser.add_argument("--camera", default="0", help="Número da câmera ou frame ring compartilhado (shm:NOME)")
+    parser.add_argument("--rate", type=float, default=30.0, help="Taxa máxima de envio por cliente (fps)")
+    parser.add_argument("--scores", action="store_true", help="Incluir all_scores nas mensagens")
+    parser.add_argument("--tracker", action="store_true", help="Usar a janela do FaceTracker3D em vez do modo headless")
+    parser.add_argument("--record", help="Gravar também os landmarks em um landmark archive (.lmka)")
+    add_config_arguments(parser)
+
+    args = parser.parse_args()
+    engines = factory_from_args(args)
+
+    broadcaster = AnimationBroadcaster(args.rate, args.scores)
+
+    # Servidor em segundo plano; a captura fica na thread principal (janelas do OpenCV)
+    server_thread = threading.Thread(target=asyncio.run, args=(broadcaster.serve(args.host, args.port),),
+                                     daemon=True)
+    server_thread.start()
+
+    archive = LandmarkArchiveWriter(args.record, metadata={"source": args.camera}) if args.record else None
+
+    try:
+        if args.tracker:
+            try:
+                from face_tracker_3d import FaceTracker3D
+            except ImportError:  # importado como pacote a partir da raiz do projeto
+                from python.face_tracker_3d import FaceTracker3D
+            FaceTracker3D(engines).process_webcam(on_landmarks=make_tracker_publisher(broadcaster), source=args.camera,
+                                           archive=archive)
+        else:
+            LiveAnimationSource(broadcaster, args.camera, archive=archive, engines=engines).run()
+    except KeyboardInterrupt:
+        print("\n👋 Transmissão encerrada")
+    finally:
+        if archive is not None:
+            archive.close()
+            print(f"Landmarks gravados em {args.record}")
+        if args.startup_report:
+            engines.print_report()
+
+
+if __name__ == "__main__":
+    main()
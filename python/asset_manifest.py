@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Asset Manifest - Reconstrução incremental dos artefatos de análise
+Guarda, por etapa e imagem, o hash das entradas, as configurações usadas e os
+arquivos produzidos; uma etapa só é executada de novo quando os bytes da imagem,
+o código do analisador ou as configurações mudaram, ou quando uma saída sumiu
+"""
+
+import ast
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+MANIFEST_NAME = ".asset_manifest.json"
+MANIFEST_VERSION = 1
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo do arquivo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def module_dependencies(*names: str) -> List[str]:
+    """Módulos da etapa mais os módulos de python/ que eles importam (transitivamente)
+
+    As dependências saem dos próprios imports (lidos com ast, sem importar nada, e
+    incluindo imports tardios dentro de funções): um módulo novo usado pelo analisador
+    invalida a etapa sem precisar ser listado à mão. `names` são nomes em python/ ou
+    caminhos de scripts fora dele.
+    """
+    pending = [name if os.path.isabs(name) or os.sep in name else os.path.join(PYTHON_DIR, name)
+               for name in names]
+    found: List[str] = []
+    while pending:
+        path = os.path.abspath(pending.pop())
+        if path in found:
+            continue
+        found.append(path)
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                modules = [node.module]
+            else:
+                continue
+            for module in modules:
+                if module.startswith("python."):
+                    module = module[len("python."):]
+                candidate = os.path.join(PYTHON_DIR, module.split(".")[0] + ".py")
+                if "." not in module and os.path.exists(candidate):
+                    pending.append(candidate)
+    return sorted(found)
+
+
+class AssetManifest:
+    def __init__(self, path: str):
+        """Carrega o manifesto (ou começa vazio se não existir ou estiver corrompido)"""
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.entries = data.get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Manifesto ignorado ({e}); todas as etapas serão refeitas")
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "AssetManifest":
+        return cls(os.path.join(directory, MANIFEST_NAME))
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def _fingerprint(self, path: str, previous: Optional[Dict] = None) -> Optional[Dict]:
+        """Hash, tamanho e mtime do arquivo; reaproveita o hash anterior se tamanho e mtime não mudaram"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+            return previous
+        return {"sha256": file_digest(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _files_match(self, recorded: Dict[str, Dict], paths: Sequence[str]) -> bool:
+        if sorted(recorded) != sorted(self._key(p) for p in paths):
+            return False
+        for path in paths:
+            previous = recorded[self._key(path)]
+            current = self._fingerprint(path, previous)
+            if current is None or current["sha256"] != previous["sha256"]:
+                return False
+        return True
+
+    def is_current(self, step: str, inputs: Sequence[str], settings: Dict) -> bool:
+        """True se a etapa já foi feita com as mesmas entradas e configurações e as saídas continuam intactas"""
+        entry = self.entries.get(step)
+        if entry is None:
+            return False
+        if entry.get("settings") != json.loads(json.dumps(settings)):
+            return False
+        if not self._files_match(entry.get("inputs", {}), inputs):
+            return False
+        outputs = [os.path.join(self.root, p) for p in entry.get("outputs", {})]
+        return self._files_match(entry.get("outputs", {}), outputs)
+
+    def outputs(self, step: str) -> List[str]:
+        """Saídas registradas para a etapa (caminhos relativos ao diretório atual)"""
+        entry = self.entries.get(step, {})
+        return [os.path.relpath(os.path.join(self.root, p)) for p in entry.get("outputs", {})]
+
+    def record(self, step: str, inputs: Sequence[str], settings: Dict, outputs: Sequence[str]) -> bool:
+        """Registra uma execução concluída da etapa; retorna False (nada registrado) se faltar uma saída
+
+        Uma saída declarada que não existe significa build incompleto: a etapa continua
+        desatualizada e é refeita na próxima execução.
+        """
+        missing = [p for p in outputs if not os.path.exists(p)]
+        if missing:
+            print(f"❌ {step}: saída(s) não gerada(s): {', '.join(missing)}")
+            if self.entries.pop(step, None) is not None:
+                self.dirty = True
+            return False
+        previous = self.entries.get(step, {})
+        self.entries[step] = {
+            "settings": json.loads(json.dumps(settings)),
+            "inputs": {self._key(p): self._fingerprint(p, previous.get("inputs", {}).get(self._key(p)))
+                       for p in inputs},
+            "outputs": {self._key(p): self._fingerprint(p) for p in outputs},
+            "built_at": time.time()
+        }
+        self.dirty = True
+        return True
+
+    def run(self, step: str, inputs: Sequence[str], settings: Dict,
+            build: Callable[[], Optional[Sequence[str]]], force: bool = False) -> bool:
+        """Executa build() se a etapa estiver desatualizada; retorna True se executou
+
+        build() devolve a lista de arquivos produzidos, ou None em caso de falha. Em caso
+        de falha ou de saída declarada ausente a etapa não é registrada e será tentada de
+        novo na próxima vez.
+        """
+        if not force and self.is_current(step, inputs, settings):
+            print(f"⏭️ {step}: atualizado")
+            return False
+        outputs = build()
+        if outputs is not None:
+            self.record(step, inputs, settings, outputs)
+        return True
+
+    def save(self):
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)"""
+        if not self.dirty:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
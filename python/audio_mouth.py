@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Audio Mouth - Pré-processamento de áudio de fala em curva de abertura da boca
+Lê o WAV em blocos de tamanho fixo (memória constante, horas de narração),
+calcula com NumPy o envelope RMS por frame de vídeo e classes simples de
+visema pela energia em bandas do espectro, e grava a trilha mouth_openness
+alinhada ao fps do vídeo no formato de animation_frame: o navegador só lê
+a trilha em vez de analisar o áudio a cada frame
+
+Formato do arquivo (.mouth):
+    cabeçalho   struct "<4sBBfI": magic b"MTH1", versão do layout de animation_frame,
+                reservado, fps, número de frames
+    por frame   1 byte de tamanho + mensagem de AnimationDeltaEncoder
+                (tamanho 0 = nenhum canal mudou; mantém o alinhamento com o frame)
+"""
+
+import argparse
+import json
+import os
+import struct
+import time
+import wave
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from animation_frame import (ANIMATION_LAYOUT_VERSION, AnimationDeltaDecoder, AnimationDeltaEncoder,
+                                 CHANNEL_INDEX, CHANNELS, unpack_animation)
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.animation_frame import (ANIMATION_LAYOUT_VERSION, AnimationDeltaDecoder, AnimationDeltaEncoder,
+                                        CHANNEL_INDEX, CHANNELS, unpack_animation)
+
+MAGIC = b"MTH1"
+HEADER = struct.Struct("<4sBBfI")
+
+# Classes de visema pela distribuição de energia nas bandas (Hz)
+VISEMES = ("rest", "open", "round", "wide", "fricative")
+BANDS = ((80, 500), (500, 2000), (2000, 4000), (4000, 8000))
+
+# Abertura relativa de cada visema (multiplica o envelope)
+VISEME_OPENNESS = np.array([0.0, 1.0, 0.7, 0.55, 0.3], dtype=np.float32)
+
+
+def read_wav_chunks(path: str, chunk_seconds: float = 1.0) -> Tuple[int, Iterator[np.ndarray]]:
+    """(taxa de amostragem, gerador de blocos mono float32 em [-1, 1])"""
+    wav = wave.open(path, "rb")
+    rate, channels, width = wav.getframerate(), wav.getnchannels(), wav.getsampwidth()
+    if width not in (1, 2, 3, 4):
+        wav.close()
+        raise ValueError(f"Largura de amostra não suportada: {width} bytes")
+    chunk_frames = max(1, int(rate * chunk_seconds))
+
+    def chunks():
+        try:
+            while True:
+                raw = wav.readframes(chunk_frames)
+                if not raw:
+                    return
+                if width == 1:
+                    samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+                elif width == 3:
+                    b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+                    value = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+                    samples = (np.where(value >= 1 << 23, value - (1 << 24), value) / float(1 << 23)).astype(np.float32)
+                else:
+                    dtype, scale = (np.int16, 32768.0) if width == 2 else (np.int32, 2147483648.0)
+                    samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / scale
+                yield samples.reshape(-1, channels).mean(axis=1) if channels > 1 else samples
+        finally:
+            wav.close()
+
+    return rate, chunks()
+
+
+class MouthCurveBaker:
+    def __init__(self, sample_rate: int, fps: float = 30.0, floor_db: float = -45.0, ceil_db: float = -12.0,
+                 attack: float = 0.6, release: float = 0.25):
+        """Converte amostras em valores de abertura por frame de vídeo
+
+        floor_db/ceil_db: RMS (dBFS) mapeado para boca fechada/totalmente aberta.
+        attack/release: suavização (0-1) ao abrir/fechar, por frame.
+        """
+        self.sample_rate = sample_rate
+        self.fps = fps
+        self.floor_db = floor_db
+        self.ceil_db = ceil_db
+        self.attack = attack
+        self.release = release
+        self.frames = 0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._consumed = 0  # amostras já atribuídas a frames
+        self._smoothed = 0.0
+
+        # Janela de FFT fixa (maior potência de 2 dentro de um frame: o resultado não depende
+        # do tamanho dos blocos de leitura) e máscaras das bandas
+        self.fft_size = 1 << int(np.log2(max(2, int(sample_rate / fps))))
+        freqs = np.fft.rfftfreq(self.fft_size, 1.0 / sample_rate)
+        self._bands = np.stack([(freqs >= lo) & (freqs < hi) for lo, hi in BANDS]).astype(np.float32)
+        self._window = np.hanning(self.fft_size).astype(np.float32)
+
+    def _frame_end(self, frame: int) -> int:
+        """Amostra final (exclusiva) do frame; arredondada para não acumular deriva"""
+        return int(round((frame + 1) * self.sample_rate / self.fps))
+
+    def feed(self, samples: np.ndarray, final: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Acrescenta um bloco; retorna (abertura, visema) dos frames completados"""
+        buffer = np.concatenate([self._pending, samples]) if len(self._pending) else samples
+        available = self._consumed + len(buffer)
+
+        ends = []
+        frame = self.frames
+        while self._frame_end(frame) <= available:
+            ends.append(self._frame_end(frame))
+            frame += 1
+        if final and available > (ends[-1] if ends else self._consumed):
+            ends.append(available)  # frame final incompleto
+            frame += 1
+        if not ends:
+            self._pending = buffer
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.uint8)
+
+        bounds = np.array([self._consumed] + ends) - self._consumed
+        self._pending = buffer[bounds[-1]:]
+        self._consumed += int(bounds[-1])
+        self.frames = frame
+        return self._analyze(buffer[:bounds[-1]], bounds)
+
+    def _analyze(self, samples: np.ndarray, bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        starts, lengths = bounds[:-1], np.diff(bounds)
+
+        # RMS por frame (frames de tamanho variável: soma por segmentos)
+        energy = np.add.reduceat(samples.astype(np.float64) ** 2, starts) / np.maximum(lengths, 1)
+        db = 10.0 * np.log10(np.maximum(energy, 1e-12))
+        level = np.clip((db - self.floor_db) / (self.ceil_db - self.floor_db), 0.0, 1.0).astype(np.float32)
+
+        # Espectro de todos os frames de uma vez (janela fixa a partir do início de cada frame)
+        padded = np.concatenate([samples, np.zeros(self.fft_size, dtype=samples.dtype)])
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.fft_size)[starts] * self._window
+        power = np.abs(np.fft.rfft(windows, axis=1)) ** 2
+        bands = power @ self._bands.T
+        share = bands / np.maximum(bands.sum(axis=1, keepdims=True), 1e-12)
+        low, mid, high, very_high = share.T
+
+        viseme = np.full(len(starts), VISEMES.index("open"), dtype=np.uint8)
+        viseme[low > 0.85] = VISEMES.index("round")
+        viseme[(mid + high) > 0.55] = VISEMES.index("wide")
+        viseme[(high + very_high) > 0.5] = VISEMES.index("fricative")
+        viseme[level <= 0.0] = VISEMES.index("rest")
+
+        target = level * VISEME_OPENNESS[viseme]
+        openness = np.empty_like(target)
+        value = self._smoothed
+        for i, t in enumerate(target):  # suavização assimétrica, por frame de vídeo (barato)
+            value += (t - value) * (self.attack if t > value else self.release)
+            openness[i] = value
+        self._smoothed = float(value)
+        return openness, viseme
+
+
+def bake_wav(path: str, output: str, fps: float = 30.0, chunk_seconds: float = 1.0,
+             json_output: Optional[str] = None, **options) -> Dict:
+    """Gera a trilha .mouth (e opcionalmente JSON) de um WAV; retorna estatísticas"""
+    start = time.perf_counter()
+    rate, chunks = read_wav_chunks(path, chunk_seconds)
+    baker = MouthCurveBaker(rate, fps, **options)
+    encoder = AnimationDeltaEncoder(keyframe_interval=int(fps * 10))
+    vector = np.zeros(len(CHANNELS), dtype=np.float32)
+    mouth = CHANNEL_INDEX["mouth_openness"]
+    mouth_open = CHANNEL_INDEX["mouthOpen"]
+    vector[CHANNEL_INDEX["eye_openness"]] = 1.0
+
+    track: List[float] = []
+    viseme_counts = np.zeros(len(VISEMES), dtype=np.int64)
+    visemes: List[int] = []
+    written = 0
+
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, ANIMATION_LAYOUT_VERSION, 0, fps, 0))
+
+        def write_frames(openness, viseme):
+            nonlocal written
+            for value, v in zip(openness, viseme):
+                vector[mouth] = value
+                vector[mouth_open] = value if v == VISEMES.index("open") else 0.0
+                message = encoder.encode(vector) or b""
+                f.write(bytes([len(message)]) + message)
+                written += 1
+            viseme_counts[:] += np.bincount(viseme, minlength=len(VISEMES))
+            if json_output:
+                track.extend(np.round(openness, 3).tolist())
+                visemes.extend(viseme.tolist())
+
+        for samples in chunks:
+            write_frames(*baker.feed(samples))
+        write_frames(*baker.feed(np.zeros(0, dtype=np.float32), final=True))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, ANIMATION_LAYOUT_VERSION, 0, fps, written))
+
+    if json_output:
+        with open(json_output, "w") as f:
+            json.dump({"fps": fps, "visemes": list(VISEMES), "mouth_openness": track, "viseme": visemes},
+                      f, separators=(",", ":"))
+
+    duration = baker._consumed / rate
+    return {
+        "frames": written,
+        "duration": duration,
+        "bytes": os.path.getsize(output),
+        "seconds": time.perf_counter() - start,
+        "visemes": {name: int(n) for name, n in zip(VISEMES, viseme_counts)}
+    }
+
+
+def read_track(path: str) -> Tuple[float, Iterator[Dict]]:
+    """(fps, gerador do facial_animation de cada frame) de um arquivo .mouth"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, _, fps, frames = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != ANIMATION_LAYOUT_VERSION:
+        raise ValueError(f"Trilha inválida ou de outro layout: {path}")
+
+    def frames_iter():
+        decoder = AnimationDeltaDecoder()
+        offset = HEADER.size
+        for _ in range(frames):
+            length = data[offset]
+            if length:
+                decoder.decode(data[offset + 1:offset + 1 + length])
+            offset += 1 + length
+            yield unpack_animation(decoder.vector)
+
+    return fps, frames_iter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Curva de abertura da boca pré-calculada a partir de WAV")
+    parser.add_argument("wav", nargs="+", help="Arquivo(s) WAV de narração")
+    parser.add_argument("--fps", type=float, default=30.0, help="Taxa de frames do vídeo/animação")
+    parser.add_argument("--output-dir", "-o", help="Diretório de saída (padrão: ao lado do WAV)")
+    parser.add_argument("--json", action="store_true", help="Gravar também a trilha em JSON para o navegador")
+    parser.add_argument("--chunk", type=float, default=1.0, help="Tamanho do bloco de leitura (segundos)")
+    parser.add_argument("--floor-db", type=float, default=-45.0, help="RMS (dBFS) considerado silêncio")
+    parser.add_argument("--ceil-db", type=float, default=-12.0, help="RMS (dBFS) de boca totalmente aberta")
+    args = parser.parse_args()
+
+    for path in args.wav:
+        base = os.path.splitext(os.path.basename(path))[0]
+        directory = args.output_dir or os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        output = os.path.join(directory, base + ".mouth")
+        json_output = os.path.join(directory, base + ".mouth.json") if args.json else None
+
+        stats = bake_wav(path, output, args.fps, args.chunk, json_output,
+                         floor_db=args.floor_db, ceil_db=args.ceil_db)
+        speed = stats["duration"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        print(f"🎙️ {path}: {stats['frames']} frames ({stats['duration']:.1f} s de áudio) -> {output}")
+        print(f"   {stats['bytes']} bytes ({stats['bytes'] / max(1, stats['frames']):.2f} bytes/frame), "
+              f"{speed:.0f}x tempo real")
+        print("   Visemas: " + ", ".join(f"{k} {v}" for k, v in stats["visemes"].items()))
+
+
+if __name__ == "__main__":
+    main()
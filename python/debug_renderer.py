@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Debug Renderer - Rasterização vetorizada das imagens de debug
+Carimba os pontos de uma vez via indexação de arrays (sprite de ponto
+pré-calculado) e desenha contornos agrupados por cor em chamadas únicas de
+cv2.polylines. Pontos com índice continuam em um laço de cv2.circle +
+cv2.putText: a ordem de desenho define os pixels e o laço já é barato
+"""
+
+import cv2
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class DebugRenderer:
+    def __init__(self):
+        """Inicializa o cache de sprites de ponto"""
+        self._dot_sprites: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def dot_sprite(self, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Offsets (dy, dx) dos pixels de um cv2.circle preenchido com o raio dado"""
+        if radius not in self._dot_sprites:
+            size = 2 * radius + 1
+            canvas = np.zeros((size, size), dtype=np.uint8)
+            cv2.circle(canvas, (radius, radius), radius, 255, -1)
+            dy, dx = np.nonzero(canvas)
+            self._dot_sprites[radius] = (dy - radius, dx - radius)
+        return self._dot_sprites[radius]
+
+    @staticmethod
+    def _pixel_value(image: np.ndarray, color):
+        # Como no OpenCV, imagens de um canal usam apenas o primeiro componente da cor
+        if image.ndim == 2 and np.ndim(color) > 0:
+            return color[0]
+        return color
+
+    def _scatter(self, image: np.ndarray, ys: np.ndarray, xs: np.ndarray, color):
+        h, w = image.shape[:2]
+        valid = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        image[ys[valid], xs[valid]] = self._pixel_value(image, color)
+
+    def stamp_dots(self, image: np.ndarray, points, color, radius: int = 1) -> np.ndarray:
+        """Desenha todos os pontos de uma vez (equivalente a cv2.circle preenchido em cada ponto)"""
+        pts = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        if len(pts) == 0:
+            return image
+        dy, dx = self.dot_sprite(radius)
+        ys = (pts[:, 1, None] + dy[None, :]).ravel()
+        xs = (pts[:, 0, None] + dx[None, :]).ravel()
+        self._scatter(image, ys, xs, color)
+        return image
+
+    def draw_outlines(self, image: np.ndarray, regions: Sequence, colors: Sequence,
+                      thickness: int = 2, closed: bool = True) -> np.ndarray:
+        """Desenha os contornos com um único cv2.polylines por cor distinta"""
+        batches: "OrderedDict[tuple, List[np.ndarray]]" = OrderedDict()
+        for points, color in zip(regions, colors):
+            if points is None or len(points) == 0:
+                continue
+            batches.setdefault(tuple(color), []).append(np.asarray(points, dtype=np.int32).reshape(-1, 1, 2))
+
+        for color, polylines in batches.items():
+            cv2.polylines(image, polylines, closed, color, thickness)
+        return image
+
+    def draw_landmarks(self, image: np.ndarray, points, dot_color=(0, 255, 0), label_color=(255, 255, 255),
+                       radius: int = 2, font_scale: float = 0.3, thickness: int = 1) -> np.ndarray:
+        """Ponto e índice de cada landmark, na ordem cv2.circle + cv2.putText por ponto
+
+        O ponto seguinte cobre parte do rótulo anterior e o texto é suavizado sobre o que
+        já foi desenhado; só o laço reproduz isso pixel a pixel (~2 ms para 478 pontos).
+        """
+        for i, (x, y) in enumerate(np.asarray(points, dtype=np.int64).reshape(-1, 2).tolist()):
+            cv2.circle(image, (x, y), radius, dot_color, -1)
+            cv2.putText(image, str(i), (x, y), LABEL_FONT, font_scale, label_color, thickness)
+        return image
+
+    def draw_text_lines(self, image: np.ndarray, lines: List[str], origin: Tuple[int, int] = (10, 30),
+                        spacing: int = 30, color=(0, 255, 255), font_scale: float = 0.7,
+                        thickness: int = 2) -> np.ndarray:
+        """Escreve o painel de informações (poucas linhas, desenhadas diretamente)"""
+        x, y = origin
+        for i, text in enumerate(lines):
+            cv2.putText(image, text, (x, y + i * spacing), LABEL_FONT, font_scale, color, thickness)
+        return image
+
+
+_default_renderer: Optional[DebugRenderer] = None
+
+
+def get_debug_renderer() -> DebugRenderer:
+    """Retorna o renderer compartilhado do processo (caches reaproveitados entre imagens)"""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = DebugRenderer()
+    return _default_renderer
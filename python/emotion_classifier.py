@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Emotion Classifier - Classificador de emoções por tabela de regras
+As regras de limiar dos analisadores viram arrays (feature, comparação, limiar,
+emoção, peso) aplicados de uma vez a uma matriz de features (T, F): pontuar
+todos os frames de uma gravação custa algumas operações NumPy
+"""
+
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    from face_regions import SIMPLE_REGIONS
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.face_regions import SIMPLE_REGIONS
+
+# Regra: (emoção, feature, ">" ou "<", limiar, peso somado ao score quando a condição vale)
+Rule = Tuple[str, str, str, float, float]
+
+
+class EmotionClassifier:
+    def __init__(self, base_scores: Dict[str, float], features: Sequence[str], rules: Sequence[Rule]):
+        """Compila as regras em arrays
+
+        base_scores define as emoções (na ordem de desempate do argmax) e o score inicial;
+        features define as colunas da matriz de entrada.
+        """
+        self.emotions: Tuple[str, ...] = tuple(base_scores)
+        self.features: Tuple[str, ...] = tuple(features)
+        self.base = np.array([base_scores[e] for e in self.emotions], dtype=np.float64)
+
+        emotion_index = {e: i for i, e in enumerate(self.emotions)}
+        feature_index = {f: i for i, f in enumerate(self.features)}
+        self.rule_emotion = np.array([emotion_index[r[0]] for r in rules], dtype=np.intp)
+        self.rule_feature = np.array([feature_index[r[1]] for r in rules], dtype=np.intp)
+        self.rule_greater = np.array([r[2] == ">" for r in rules], dtype=bool)
+        self.rule_threshold = np.array([r[3] for r in rules], dtype=np.float64)
+        self.rule_weight = np.array([r[4] for r in rules], dtype=np.float64)
+
+    def feature_vector(self, values: Dict[str, float]) -> np.ndarray:
+        """Linha da matriz de features a partir de um dicionário"""
+        return np.array([values[f] for f in self.features], dtype=np.float64)
+
+    def fired(self, X: np.ndarray) -> np.ndarray:
+        """Matriz booleana (T, R) das regras satisfeitas por frame"""
+        values = np.asarray(X, dtype=np.float64)[:, self.rule_feature]
+        return np.where(self.rule_greater, values > self.rule_threshold, values < self.rule_threshold)
+
+    def scores(self, X: np.ndarray) -> np.ndarray:
+        """Scores normalizados (T, E) para a matriz de features (T, F)"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        fired = self.fired(X)
+        raw = np.repeat(self.base[None, :], len(X), axis=0)
+
+        # Acumula na ordem das regras (mesmos arredondamentos das cadeias de if originais)
+        for r in range(len(self.rule_weight)):
+            raw[:, self.rule_emotion[r]] += fired[:, r] * self.rule_weight[r]
+
+        total = np.zeros(len(X))
+        for e in range(len(self.emotions)):
+            total += raw[:, e]
+        positive = total > 0
+        raw[positive] /= total[positive, None]
+        return raw
+
+    def classify(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (scores (T, E), índice da emoção dominante (T,))"""
+        scores = self.scores(X)
+        return scores, np.argmax(scores, axis=1)
+
+    def labels(self, X: np.ndarray) -> List[str]:
+        """Nome da emoção dominante de cada frame"""
+        _, dominant = self.classify(X)
+        return [self.emotions[i] for i in dominant]
+
+    def classify_one(self, values: Dict[str, float]) -> Dict:
+        """Classifica uma face no formato de resultado usado pelos analisadores"""
+        scores, dominant = self.classify(self.feature_vector(values)[None, :])
+        row = scores[0]
+        best = int(dominant[0])
+        return {
+            "scores": {e: float(row[i]) for i, e in enumerate(self.emotions)},
+            "dominant_emotion": self.emotions[best],
+            "confidence": float(row[best])
+        }
+
+
+# SimpleFaceAnalyzer (MediaPipe): curvatura positiva = sorriso
+SIMPLE_EMOTION_MODEL = EmotionClassifier(
+    {"neutral": 0.4, "happy": 0.0, "sad": 0.0, "surprised": 0.0, "angry": 0.0},
+    ["curvature", "aspect_ratio", "average_openness"],
+    [
+        ("happy", "curvature", ">", 5, 0.4),               # sorriso
+        ("sad", "curvature", "<", -3, 0.3),                # boca curvada para baixo
+        ("surprised", "aspect_ratio", ">", 0.15, 0.3),     # boca muito aberta
+        ("happy", "average_openness", "<", 0.1, 0.2),      # olhos fechados (sorriso)
+    ]
+)
+
+# FaceAnalyzer (dlib, 68 pontos): curvatura negativa = cantos da boca para cima
+FACE_ANALYZER_EMOTION_MODEL = EmotionClassifier(
+    {"neutral": 0.5, "happy": 0.0, "sad": 0.0, "angry": 0.0, "surprised": 0.0, "fear": 0.0, "disgust": 0.0},
+    ["curvature", "aspect_ratio", "average_openness", "eyebrow_distance"],
+    [
+        ("happy", "curvature", "<", -5, 0.4),              # cantos da boca para cima
+        ("happy", "average_openness", "<", 0.25, 0.2),     # olhos ligeiramente fechados
+        ("sad", "curvature", ">", 5, 0.3),                 # cantos da boca para baixo
+        ("sad", "eyebrow_distance", "<", 20, 0.2),         # sobrancelhas baixas
+        ("angry", "eyebrow_distance", "<", 15, 0.3),       # sobrancelhas muito baixas
+        ("angry", "aspect_ratio", "<", 0.1, 0.2),          # boca fechada/tensa
+        ("surprised", "eyebrow_distance", ">", 30, 0.3),   # sobrancelhas altas
+        ("surprised", "average_openness", ">", 0.3, 0.2),  # olhos bem abertos
+        ("surprised", "aspect_ratio", ">", 0.2, 0.2),      # boca aberta
+    ]
+)
+
+
+def simple_feature_matrix(points: np.ndarray) -> np.ndarray:
+    """Features de SimpleFaceAnalyzer vetorizadas sobre landmarks (T, 478, 2) em pixels
+
+    Colunas na ordem de SIMPLE_EMOTION_MODEL.features: curvature, aspect_ratio, average_openness.
+    """
+    regions = SIMPLE_REGIONS.split(SIMPLE_REGIONS.gather(np.asarray(points, dtype=np.float64)))
+
+    def ratio(region):
+        extent = np.ptp(region, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(extent[:, 0] > 0, extent[:, 1] / extent[:, 0], 0.0)
+
+    mouth = regions["mouth"]
+    frames = np.arange(len(mouth))
+    left_corner_y = mouth[frames, np.argmin(mouth[:, :, 0], axis=1), 1]
+    right_corner_y = mouth[frames, np.argmax(mouth[:, :, 0], axis=1), 1]
+    curvature = (left_corner_y + right_corner_y) / 2 - mouth[:, :, 1].min(axis=1)
+
+    average_openness = (ratio(regions["left_eye"]) + ratio(regions["right_eye"])) / 2
+    return np.stack([curvature, ratio(mouth), average_openness], axis=1)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Engine Config - Configuração única (arquivo + ambiente + CLI) e fábrica de modelos
+Os parâmetros dos modelos do MediaPipe saem de camadas com precedência crescente:
+padrões < ajuste_fino_config.json (legado) < face_engine.json < variáveis
+FACE_ENGINE_<SEÇÃO>_<CHAVE> < --set seção.chave=valor. A fábrica constrói cada
+componente só no primeiro uso e uma única vez, medindo import e construção
+(--startup-report)
+"""
+
+import argparse
+import copy
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+CONFIG_FILE = "face_engine.json"
+ENV_PREFIX = "FACE_ENGINE_"
+
+# Arquivos antigos ainda lidos (arquivo -> seção em que se encaixam)
+LEGACY_FILES = {"ajuste_fino_config.json": "face_mesh"}
+
+DEFAULT_CONFIG = {
+    # FaceMesh do tracker (imagens e webcam do FaceTracker3D)
+    "face_mesh": {
+        "static_image_mode": True,
+        "max_num_faces": 1,
+        "refine_landmarks": True,
+        "min_detection_confidence": 0.3,
+        "min_tracking_confidence": 0.3
+    },
+    # FaceMesh em modo tracking (stream ao vivo do animation_stream)
+    "live_face_mesh": {
+        "static_image_mode": False,
+        "max_num_faces": 1,
+        "refine_landmarks": True,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.5
+    },
+    # Portão de presença antes do mesh (face_gate)
+    "face_detection": {
+        "model_selection": 0,
+        "min_detection_confidence": 0.5,
+        "detect_size": 320
+    },
+    "tracker": {
+        "adjustments_file": "manual_adjustments.json"
+    }
+}
+
+
+def _coerce(value: str, default):
+    """Converte texto (ambiente/CLI) para o tipo do valor padrão"""
+    if isinstance(default, bool):
+        if value.strip().lower() in ("1", "true", "sim", "yes", "on"):
+            return True
+        if value.strip().lower() in ("0", "false", "nao", "não", "no", "off"):
+            return False
+        raise ValueError(f"Valor booleano inválido: {value}")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+class EngineConfig:
+    def __init__(self, values: Optional[Dict] = None):
+        self.values = copy.deepcopy(DEFAULT_CONFIG if values is None else values)
+        self.sources: Dict[str, str] = {f"{s}.{k}": "padrão" for s, keys in self.values.items() for k in keys}
+        self.load_ms = 0.0
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, overrides: Iterable[str] = (),
+             environ: Optional[Dict[str, str]] = None) -> "EngineConfig":
+        """Aplica as camadas na ordem de precedência e registra a origem de cada valor"""
+        start = time.perf_counter()
+        config = cls()
+        for legacy, section in LEGACY_FILES.items():
+            if os.path.exists(legacy):
+                config.merge({section: config._read(legacy)}, legacy)
+        path = path or CONFIG_FILE
+        if os.path.exists(path):
+            config.merge(config._read(path), path)
+        config.apply_environment(os.environ if environ is None else environ)
+        for item in overrides:
+            config.apply_override(item)
+        config.load_ms = (time.perf_counter() - start) * 1000.0
+        return config
+
+    @staticmethod
+    def _read(path: str) -> Dict:
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Configuração malformada ignorada ({path}): {e}")
+            return {}
+
+    def merge(self, values: Dict, source: str):
+        """Mescla {seção: {chave: valor}}; chaves desconhecidas são avisadas e ignoradas"""
+        for section, keys in values.items():
+            if section not in self.values or not isinstance(keys, dict):
+                print(f"⚠️ Seção desconhecida em {source}: {section}")
+                continue
+            for key, value in keys.items():
+                if key not in self.values[section]:
+                    print(f"⚠️ Chave desconhecida em {source}: {section}.{key}")
+                    continue
+                self.values[section][key] = value
+                self.sources[f"{section}.{key}"] = source
+
+    def apply_environment(self, environ: Dict[str, str]):
+        for section, keys in self.values.items():
+            for key, default in keys.items():
+                name = f"{ENV_PREFIX}{section}_{key}".upper()
+                if name in environ:
+                    keys[key] = _coerce(environ[name], default)
+                    self.sources[f"{section}.{key}"] = f"${name}"
+
+    def apply_override(self, item: str):
+        """seção.chave=valor (argumento --set)"""
+        name, _, value = item.partition("=")
+        section, _, key = name.strip().partition(".")
+        if not value or section not in self.values or key not in self.values[section]:
+            raise ValueError(f"Configuração inválida: {item} (use seção.chave=valor)")
+        self.values[section][key] = _coerce(value, self.values[section][key])
+        self.sources[name.strip()] = "--set"
+
+    def section(self, name: str) -> Dict:
+        return dict(self.values[name])
+
+    def get(self, section: str, key: str):
+        return self.values[section][key]
+
+    def save(self, values: Dict, path: str = CONFIG_FILE):
+        """Mescla valores no arquivo de configuração (mantendo o que já existe nele)"""
+        current = self._read(path) if os.path.exists(path) else {}
+        for section, keys in values.items():
+            current.setdefault(section, {}).update(keys)
+        with open(path, "w") as f:
+            json.dump(current, f, indent=2)
+        self.merge(values, path)
+
+
+def _build_face_mesh(factory: "EngineFactory", section: str):
+    mp = factory.module("mediapipe")
+    return mp.solutions.face_mesh.FaceMesh(**factory.config.section(section))
+
+
+def _build_face_gate(factory: "EngineFactory"):
+    try:
+        module = factory.module("face_gate")
+    except ImportError:  # importado como pacote a partir da raiz do projeto
+        module = factory.module("python.face_gate")
+    settings = factory.config.section("face_detection")
+    return module.FacePresenceGate(settings.pop("detect_size"), **settings)
+
+
+BUILDERS: Dict[str, Callable] = {
+    "face_mesh": lambda factory: _build_face_mesh(factory, "face_mesh"),
+    "live_face_mesh": lambda factory: _build_face_mesh(factory, "live_face_mesh"),
+    "face_gate": _build_face_gate
+}
+
+
+class EngineFactory:
+    def __init__(self, config: Optional[EngineConfig] = None):
+        """Componentes construídos sob demanda, uma vez cada (seguro entre threads)"""
+        self.config = config or EngineConfig.load()
+        self._components: Dict[str, object] = {}
+        self._lock = threading.RLock()
+        self.timings: List[Dict] = []
+        self.imports: List[Dict] = []
+
+    def module(self, name: str):
+        """Importa um módulo medindo o tempo (só a primeira importação do processo custa)"""
+        if name in sys.modules:
+            return sys.modules[name]
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports.append({"module": name, "ms": (time.perf_counter() - start) * 1000.0})
+        return module
+
+    def get(self, name: str):
+        with self._lock:
+            if name not in self._components:
+                imported = len(self.imports)
+                start = time.perf_counter()
+                self._components[name] = BUILDERS[name](self)
+                total = (time.perf_counter() - start) * 1000.0
+                import_ms = sum(i["ms"] for i in self.imports[imported:])
+                self.timings.append({"component": name, "import_ms": import_ms, "build_ms": total - import_ms})
+            return self._components[name]
+
+    def built(self, name: str) -> bool:
+        return name in self._components
+
+    def close(self):
+        with self._lock:
+            for component in self._components.values():
+                if hasattr(component, "close"):
+                    component.close()
+            self._components.clear()
+
+    def report(self) -> Dict:
+        return {
+            "config_ms": self.config.load_ms,
+            "imports": self.imports,
+            "components": self.timings,
+            "config": self.config.values,
+            "sources": {k: v for k, v in self.config.sources.items() if v != "padrão"}
+        }
+
+    def print_report(self):
+        report = self.report()
+        print("⏱️ Relatório de inicialização")
+        print(f"   Configuração: {report['config_ms']:.1f} ms")
+        for item in report["imports"]:
+            print(f"   import {item['module']}: {item['ms']:.1f} ms")
+        for item in report["components"]:
+            print(f"   {item['component']}: import {item['import_ms']:.1f} ms + construção {item['build_ms']:.1f} ms")
+        if not report["components"]:
+            print("   Nenhum modelo construído")
+        for key, source in report["sources"].items():
+            print(f"   {key} <- {source}")
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """--config, --set e --startup-report para os CLIs que usam a fábrica"""
+    parser.add_argument("--config", help=f"Arquivo de configuração dos modelos (padrão: {CONFIG_FILE})")
+    parser.add_argument("--set", action="append", default=[], metavar="SEÇÃO.CHAVE=VALOR",
+                        help="Sobrescrever um valor da configuração (pode repetir)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Mostrar tempos de import e construção de cada componente")
+
+
+def factory_from_args(args) -> EngineFactory:
+    return EngineFactory(EngineConfig.load(args.config, args.set))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Configuração efetiva dos modelos e tempos de construção")
+    add_config_arguments(parser)
+    parser.add_argument("--build", nargs="*", choices=sorted(BUILDERS), default=[],
+                        help="Construir estes componentes para medir o tempo")
+    args = parser.parse_args()
+
+    factory = factory_from_args(args)
+    for name in args.build:
+        factory.get(name)
+    print(json.dumps(factory.config.values, indent=2, ensure_ascii=False))
+    factory.print_report()
+    factory.close()
+
+
+if __name__ == "__main__":
+    main()
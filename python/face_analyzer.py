@@ -13,6 +13,15 @@ import os
 from typing import Dict, List, Tuple, Optional
 import argparse
 
+try:
+    from debug_renderer import get_debug_renderer
+    from emotion_classifier import FACE_ANALYZER_EMOTION_MODEL
+    from frame_context import FrameContext
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.debug_renderer import get_debug_renderer
+    from python.emotion_classifier import FACE_ANALYZER_EMOTION_MODEL
+    from python.frame_context import FrameContext
+
 class FaceAnalyzer:
     def __init__(self):
         """Inicializa o analisador facial com os modelos necessários"""
@@ -77,15 +86,15 @@ class FaceAnalyzer:
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         return image_rgb
         
-    def detect_faces(self, image: np.ndarray) -> List[dlib.rectangle]:
-        """Detecta faces na imagem"""
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    def detect_faces(self, image) -> List[dlib.rectangle]:
+        """Detecta faces na imagem (RGB ou FrameContext, que reaproveita o cinza em get_landmarks)"""
+        gray = FrameContext.wrap(image, "rgb").gray
         faces = self.face_detector(gray)
         return faces
         
-    def get_landmarks(self, image: np.ndarray, face_rect: dlib.rectangle) -> np.ndarray:
-        """Extrai landmarks faciais"""
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    def get_landmarks(self, image, face_rect: dlib.rectangle) -> np.ndarray:
+        """Extrai landmarks faciais (RGB ou FrameContext)"""
+        gray = FrameContext.wrap(image, "rgb").gray
         landmarks = self.landmark_predictor(gray, face_rect)
         
         # Converter para array numpy
@@ -193,57 +202,15 @@ class FaceAnalyzer:
         eyebrow_distance = ((left_eye_height - left_eyebrow_height) + 
                            (right_eye_height - right_eyebrow_height)) / 2
         
-        # Análise de emoções
-        emotion_scores = {
-            "neutral": 0.5,
-            "happy": 0.0,
-            "sad": 0.0,
-            "angry": 0.0,
-            "surprised": 0.0,
-            "fear": 0.0,
-            "disgust": 0.0
-        }
-        
-        # Felicidade: boca curvada para cima, olhos ligeiramente fechados
-        if mouth["curvature"] < -5:  # Cantos da boca para cima
-            emotion_scores["happy"] += 0.4
-        if eyes["average_openness"] < 0.25:  # Olhos ligeiramente fechados (sorriso)
-            emotion_scores["happy"] += 0.2
-            
-        # Tristeza: boca curvada para baixo, sobrancelhas baixas
-        if mouth["curvature"] > 5:  # Cantos da boca para baixo
-            emotion_scores["sad"] += 0.3
-        if eyebrow_distance < 20:  # Sobrancelhas baixas
-            emotion_scores["sad"] += 0.2
-            
-        # Raiva: sobrancelhas franzidas, boca tensa
-        if eyebrow_distance < 15:  # Sobrancelhas muito baixas
-            emotion_scores["angry"] += 0.3
-        if mouth["aspect_ratio"] < 0.1:  # Boca fechada/tensa
-            emotion_scores["angry"] += 0.2
-            
-        # Surpresa: sobrancelhas altas, olhos bem abertos, boca aberta
-        if eyebrow_distance > 30:  # Sobrancelhas altas
-            emotion_scores["surprised"] += 0.3
-        if eyes["average_openness"] > 0.3:  # Olhos bem abertos
-            emotion_scores["surprised"] += 0.2
-        if mouth["aspect_ratio"] > 0.2:  # Boca aberta
-            emotion_scores["surprised"] += 0.2
-            
-        # Normalizar scores
-        total_score = sum(emotion_scores.values())
-        if total_score > 0:
-            emotion_scores = {k: v/total_score for k, v in emotion_scores.items()}
-            
-        # Encontrar emoção dominante
-        dominant_emotion = max(emotion_scores.items(), key=lambda x: x[1])
-        
-        return {
-            "scores": emotion_scores,
-            "dominant_emotion": dominant_emotion[0],
-            "confidence": float(dominant_emotion[1]),
-            "eyebrow_distance": float(eyebrow_distance)
-        }
+        # Análise de emoções (regras compiladas em emotion_classifier)
+        result = FACE_ANALYZER_EMOTION_MODEL.classify_one({
+            "curvature": mouth["curvature"],
+            "aspect_ratio": mouth["aspect_ratio"],
+            "average_openness": eyes["average_openness"],
+            "eyebrow_distance": eyebrow_distance
+        })
+        result["eyebrow_distance"] = float(eyebrow_distance)
+        return result
         
     def create_animation_data(self, analysis_result: Dict) -> Dict:
         """Cria dados de animação para o JavaScript"""
@@ -320,8 +287,8 @@ class FaceAnalyzer:
         results = None
 
         with mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5) as face_detection:
-            # Procesar a imagem
-            results = face_detection.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            # Procesar a imagem (load_image já devolve RGB)
+            results = face_detection.process(image)
 
             if not results.detections:
                 print("❌ Nenhuma face detectada na imagem")
@@ -378,37 +345,33 @@ class FaceAnalyzer:
         if image is None:
             return
             
-        landmarks = np.array(analysis_result["landmarks"])
+        landmarks = np.array(analysis_result["landmarks"]).reshape(-1, 2).astype(np.int32)
+        renderer = get_debug_renderer()
         
-        # Desenhar landmarks
-        for i, (x, y) in enumerate(landmarks):
-            cv2.circle(image, (int(x), int(y)), 2, (0, 255, 0), -1)
-            cv2.putText(image, str(i), (int(x), int(y)), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (255, 255, 255), 1)
+        # Desenhar landmarks e índices (na ordem do laço cv2.circle + cv2.putText)
+        renderer.draw_landmarks(image, landmarks, (0, 255, 0), (255, 255, 255), radius=2, font_scale=0.3)
             
         # Destacar regiões importantes
         eyes = analysis_result["eyes"]
         mouth = analysis_result["mouth"]
         
-        # Olhos
-        left_eye = np.array(eyes["left_eye"]["landmarks"], dtype=np.int32)
-        right_eye = np.array(eyes["right_eye"]["landmarks"], dtype=np.int32)
-        cv2.polylines(image, [left_eye], True, (255, 0, 0), 2)
-        cv2.polylines(image, [right_eye], True, (255, 0, 0), 2)
-        
-        # Boca
-        mouth_outer = np.array(mouth["outer_landmarks"], dtype=np.int32)
-        cv2.polylines(image, [mouth_outer], True, (0, 0, 255), 2)
+        # Olhos e boca
+        regions = [
+            eyes.get("left_eye", {}).get("landmarks", []),
+            eyes.get("right_eye", {}).get("landmarks", []),
+            mouth.get("outer_landmarks", [])
+        ]
+        renderer.draw_outlines(image, regions, [(255, 0, 0), (255, 0, 0), (0, 0, 255)], 2)
         
         # Adicionar informações
         emotion = analysis_result["emotion"]["dominant_emotion"]
         confidence = analysis_result["emotion"]["confidence"]
         
-        cv2.putText(image, f"Emotion: {emotion} ({confidence:.2f})", 
-                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        cv2.putText(image, f"Eye Openness: {eyes['average_openness']:.2f}", 
-                   (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        cv2.putText(image, f"Mouth Openness: {mouth['aspect_ratio']:.2f}", 
-                   (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        renderer.draw_text_lines(image, [
+            f"Emotion: {emotion} ({confidence:.2f})",
+            f"Eye Openness: {eyes['average_openness']:.2f}",
+            f"Mouth Openness: {mouth['aspect_ratio']:.2f}"
+        ])
         
         cv2.imwrite(output_path, image)
         print(f"✅ Imagem de debug salva em: {output_path}")
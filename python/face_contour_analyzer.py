@@ -7,16 +7,50 @@ Gera máscaras de contorno e análise de características faciais
 
 import cv2
 import numpy as np
-import json
 import mediapipe as mp
 import os
 from typing import Dict, List, Tuple, Optional
 import argparse
+import sys
 import time
 
+try:
+    from output_writer import OutputWriter
+    from debug_renderer import get_debug_renderer
+    from face_regions import CONTOUR_REGIONS, METRIC_REGIONS, TRACKER_REGIONS, mediapipe_points
+    from still_image import StillImage
+    from frame_context import FrameContext
+    from face_gate import FacePresenceGate, GatedFaceMesh
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.output_writer import OutputWriter
+    from python.debug_renderer import get_debug_renderer
+    from python.face_regions import CONTOUR_REGIONS, METRIC_REGIONS, TRACKER_REGIONS, mediapipe_points
+    from python.still_image import StillImage
+    from python.frame_context import FrameContext
+    from python.face_gate import FacePresenceGate, GatedFaceMesh
+
+def simplify_contours(regions: Dict[str, np.ndarray], tolerance: float) -> Dict[str, np.ndarray]:
+    """Douglas-Peucker em cada polígono fechado: nenhum ponto removido se afasta mais
+    que `tolerance` pixels do contorno simplificado"""
+    return {name: cv2.approxPolyDP(points.reshape(-1, 1, 2), tolerance, True).reshape(-1, 2)
+            if len(points) > 2 else points
+            for name, points in regions.items()}
+
 class FaceContourAnalyzer:
-    def __init__(self):
-        """Inicializa o analisador com MediaPipe e OpenCV"""
+    def __init__(self, detection_size: Optional[int] = None, contour_tolerance: Optional[float] = None,
+                 face_outline: bool = False):
+        """Inicializa o analisador com MediaPipe e OpenCV
+
+        detection_size: lado maior da imagem usada na detecção em process_image
+        (fotos grandes são decodificadas reduzidas; None = resolução total).
+        contour_tolerance: simplifica os contornos das regiões com esta tolerância em
+        pixels; None = todos os landmarks de cada região.
+        face_outline: inclui também a oval do rosto e o hull nos contornos.
+        """
+        self.detection_size = detection_size
+        self.contour_tolerance = contour_tolerance
+        self.face_outline = face_outline
+        
         # Inicializar MediaPipe
         self.mp_face_detection = mp.solutions.face_detection
         self.mp_face_mesh = mp.solutions.face_mesh
@@ -24,9 +58,6 @@ class FaceContourAnalyzer:
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
         # Configurações de detecção
-        self.face_detection = self.mp_face_detection.FaceDetection(
-            model_selection=1, min_detection_confidence=0.5
-        )
         self.face_mesh = self.mp_face_mesh.FaceMesh(
             static_image_mode=True,
             max_num_faces=1,
@@ -34,6 +65,11 @@ class FaceContourAnalyzer:
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
+        # Portão de presença (FaceDetection em versão reduzida): com rosto o mesh recebe só o
+        # recorte em volta da caixa detectada; sem caixa (rosto pequeno ou de perfil na versão
+        # reduzida) o mesh ainda roda na imagem inteira, como antes do portão
+        self.face_detection = FacePresenceGate(model_selection=1, min_detection_confidence=0.5)
+        self.gated_mesh = GatedFaceMesh(self.face_mesh, self.face_detection, crop=True, fallback=True)
         
         print("✅ FaceContourAnalyzer inicializado com sucesso!")
         
@@ -51,14 +87,18 @@ class FaceContourAnalyzer:
         print(f"✅ Imagem carregada: {image_path} - Dimensões: {image.shape}")
         return image
         
-    def detect_face_landmarks(self, image: np.ndarray) -> Optional[Dict]:
-        """Detecta landmarks faciais usando MediaPipe"""
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    def detect_face_landmarks(self, image, full_size: Optional[Tuple[int, int]] = None) -> Optional[Dict]:
+        """Detecta landmarks faciais usando MediaPipe (imagem BGR ou FrameContext)
+
+        full_size: (largura, altura) da imagem original quando `image` é uma versão reduzida;
+        os landmarks normalizados são convertidos direto para os pixels da original.
+        """
+        frame = FrameContext.wrap(image)
         
-        # Detectar face mesh
-        mesh_results = self.face_mesh.process(rgb_image)
+        # Detectar face mesh (None = portão não encontrou rosto)
+        mesh_results = self.gated_mesh.process(frame)
         
-        if not mesh_results.multi_face_landmarks:
+        if mesh_results is None or not mesh_results.multi_face_landmarks:
             print("❌ Nenhuma face detectada na imagem")
             return None
             
@@ -66,13 +106,8 @@ class FaceContourAnalyzer:
         face_landmarks = mesh_results.multi_face_landmarks[0]
         
         # Converter landmarks para coordenadas de pixel
-        h, w = image.shape[:2]
-        landmarks_px = []
-        
-        for landmark in face_landmarks.landmark:
-            x = int(landmark.x * w)
-            y = int(landmark.y * h)
-            landmarks_px.append([x, y])
+        w, h = full_size or (frame.width, frame.height)
+        landmarks_px = mediapipe_points(face_landmarks, w, h).tolist()
             
         print(f"✅ Detectados {len(landmarks_px)} landmarks faciais")
         
@@ -82,7 +117,7 @@ class FaceContourAnalyzer:
             "image_dimensions": (w, h)
         }
         
-    def generate_contour_mask(self, image: np.ndarray, landmarks: List[List[int]], method: str = "all") -> np.ndarray:
+    def generate_contour_mask(self, image, landmarks: List[List[int]], method: str = "all") -> np.ndarray:
         """Gera máscara de contorno baseada nos landmarks"""
         h, w = image.shape[:2]
         mask = np.zeros((h, w), dtype=np.uint8)
@@ -95,17 +130,10 @@ class FaceContourAnalyzer:
             cv2.fillPoly(mask, [hull], 255)
             
         elif method == "face_outline":
-            # Usar landmarks específicos para contorno facial
-            face_outline_indices = [
-                # Contorno da face (jawline)
-                10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
-                397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136,
-                172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109
-            ]
-            
-            if len(landmarks) > max(face_outline_indices):
-                face_points = [landmarks[i] for i in face_outline_indices]
-                face_points = np.array(face_points, dtype=np.int32)
+            # Usar landmarks específicos para contorno facial (jawline)
+            face_oval = TRACKER_REGIONS.region("face_oval")
+            if len(landmarks_array) > face_oval.max():
+                face_points = landmarks_array[face_oval]
                 cv2.fillPoly(mask, [face_points], 255)
             else:
                 # Fallback para convex hull
@@ -120,30 +148,15 @@ class FaceContourAnalyzer:
         return mask
         
     def extract_facial_contours(self, image: np.ndarray, landmarks: List[List[int]]) -> Dict:
-        """Extrai contornos de diferentes partes do rosto"""
-        contours = {}
-        
-        # Definir índices dos landmarks para diferentes partes (MediaPipe Face Mesh)
-        regions = {
-            "left_eye": [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246],
-            "right_eye": [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398],
-            "mouth": [61, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95],
-            "nose": [1, 2, 5, 4, 6, 168, 8, 9, 10, 151, 195, 197, 196, 3, 51, 48, 115, 131, 134, 102, 49, 220],
-            "left_eyebrow": [46, 53, 52, 51, 48, 115, 131, 134, 102, 49, 220, 305, 293, 334, 296, 336],
-            "right_eyebrow": [285, 295, 282, 283, 276, 353, 383, 300, 368, 369, 299, 333, 298, 301]
-        }
-        
-        for region_name, indices in regions.items():
-            try:
-                if len(landmarks) > max(indices):
-                    region_points = np.array([landmarks[i] for i in indices], dtype=np.int32)
-                    contours[region_name] = region_points.tolist()
-                else:
-                    contours[region_name] = []
-            except:
-                contours[region_name] = []
-                
-        return contours
+        """Extrai contornos de diferentes partes do rosto (uma única indexação para todas as regiões)"""
+        regions = CONTOUR_REGIONS.extract(landmarks, dtype=np.int32)
+        if self.face_outline:
+            landmarks_array = np.asarray(landmarks, dtype=np.int32)
+            regions["face_oval"] = landmarks_array[TRACKER_REGIONS.region("face_oval")]
+            regions["hull"] = cv2.convexHull(landmarks_array).reshape(-1, 2)
+        if self.contour_tolerance:
+            regions = simplify_contours(regions, self.contour_tolerance)
+        return {name: points.tolist() for name, points in regions.items()}
         
     def analyze_facial_features(self, landmarks: List[List[int]]) -> Dict:
         """Analisa características faciais baseadas nos landmarks"""
@@ -153,13 +166,13 @@ class FaceContourAnalyzer:
         features = {}
         
         try:
+            regions = METRIC_REGIONS.extract(landmarks)
+            
             # Análise dos olhos
-            left_eye_landmarks = [33, 160, 158, 133, 153, 144]
-            right_eye_landmarks = [362, 385, 387, 263, 373, 380]
+            left_eye_points = regions["left_eye"]
+            right_eye_points = regions["right_eye"]
             
-            if all(i < len(landmarks) for i in left_eye_landmarks + right_eye_landmarks):
-                left_eye_points = np.array([landmarks[i] for i in left_eye_landmarks])
-                right_eye_points = np.array([landmarks[i] for i in right_eye_landmarks])
+            if len(left_eye_points) and len(right_eye_points):
                 
                 # Calcular abertura dos olhos
                 left_eye_height = np.linalg.norm(left_eye_points[1] - left_eye_points[5])
@@ -179,10 +192,9 @@ class FaceContourAnalyzer:
                 }
             
             # Análise da boca
-            mouth_landmarks = [61, 291, 39, 181, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318]
+            mouth_points = regions["mouth"]
             
-            if all(i < len(landmarks) for i in mouth_landmarks):
-                mouth_points = np.array([landmarks[i] for i in mouth_landmarks])
+            if len(mouth_points):
                 
                 # Largura e altura da boca
                 mouth_width = np.linalg.norm(mouth_points[0] - mouth_points[6])
@@ -202,44 +214,51 @@ class FaceContourAnalyzer:
             
         return features
         
-    def create_artistic_mask(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
-        """Cria uma máscara artística com efeitos visuais"""
-        h, w = image.shape[:2]
+    def create_artistic_mask(self, image, mask: np.ndarray) -> np.ndarray:
+        """Cria uma máscara artística com efeitos visuais (imagem BGR ou FrameContext)"""
+        frame = FrameContext.wrap(image)
+        h, w = frame.shape[:2]
         artistic_mask = np.zeros((h, w, 3), dtype=np.uint8)
         
+        # Só a região da máscara (+ raio do brilho) é processada: fora dela o resultado é zero
+        x, y, bw, bh = cv2.boundingRect(mask)
+        if bw == 0 or bh == 0:
+            return artistic_mask
+        pad = 16
+        x0, y0, x1, y1 = max(0, x - pad), max(0, y - pad), min(w, x + bw + pad), min(h, y + bh + pad)
+        mask_roi = mask[y0:y1, x0:x1]
+        out = artistic_mask[y0:y1, x0:x1]
+        
         # Aplicar diferentes efeitos
         # 1. Contorno Canny
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = frame.gray_roi(x0, y0, x1, y1)
         edges = cv2.Canny(gray, 100, 200)
         
         # Aplicar máscara aos contornos
-        masked_edges = cv2.bitwise_and(edges, mask)
+        masked_edges = cv2.bitwise_and(edges, mask_roi)
         
         # 2. Criar máscara colorida
-        artistic_mask[:, :, 0] = masked_edges  # Canal azul
-        artistic_mask[:, :, 1] = mask  # Canal verde
-        artistic_mask[:, :, 2] = masked_edges  # Canal vermelho
+        out[:, :, 0] = masked_edges  # Canal azul
+        out[:, :, 1] = mask_roi  # Canal verde
+        out[:, :, 2] = masked_edges  # Canal vermelho
         
         # 3. Adicionar brilho
-        glow = cv2.GaussianBlur(mask, (21, 21), 0)
-        artistic_mask[:, :, 1] = cv2.add(artistic_mask[:, :, 1], glow // 2)
+        glow = cv2.GaussianBlur(mask_roi, (21, 21), 0)
+        out[:, :, 1] = cv2.add(out[:, :, 1], glow // 2)
         
         return artistic_mask
         
-    def process_image(self, image_path: str, output_dir: str = "output") -> Dict:
-        """Processa a imagem completa: detecção, análise e geração de máscaras"""
-        print(f"🎯 Iniciando processamento de: {image_path}")
-        
-        # Criar diretório de saída
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Carregar imagem
-        image = self.load_image(image_path)
-        if image is None:
-            return {"error": "Falha ao carregar imagem"}
-            
+    def analyze_image(self, image, image_path: str = "",
+                      full_size: Optional[Tuple[int, int]] = None) -> Dict:
+        """Detecta landmarks e analisa a imagem já carregada, sem gravar arquivos
+
+        Retorna o mesmo esquema de process_image (sem output_directory/files_generated);
+        os landmarks em pixels ficam em "landmarks" para quem precisar gerar artefatos.
+        Com full_size, `image` é a versão reduzida e os pixels são os da original.
+        `image` pode ser um FrameContext para reaproveitar as conversões em save_artifacts.
+        """
         # Detectar landmarks
-        face_data = self.detect_face_landmarks(image)
+        face_data = self.detect_face_landmarks(image, full_size)
         if face_data is None:
             return {"error": "Nenhuma face detectada"}
             
@@ -251,6 +270,47 @@ class FaceContourAnalyzer:
         # Extrair contornos por região
         contours = self.extract_facial_contours(image, landmarks)
         
+        analysis = {
+            "image_path": image_path,
+            "timestamp": time.time(),
+            "face_detected": True,
+            "landmarks_count": len(landmarks),
+            "features": features,
+            "contours": contours,
+            "landmarks": landmarks
+        }
+        if self.contour_tolerance:
+            analysis["contour_tolerance"] = self.contour_tolerance
+        return analysis
+        
+    def face_box(self, landmarks: List[List[int]], size: Tuple[int, int],
+                 margin: float = 0.2) -> Tuple[int, int, int, int]:
+        """Caixa (x0, y0, x1, y1) dos landmarks com margem, limitada à imagem"""
+        points = np.asarray(landmarks)
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        pad_x, pad_y = (x1 - x0) * margin, (y1 - y0) * margin
+        return (max(0, int(x0 - pad_x)), max(0, int(y0 - pad_y)),
+                min(size[0], int(x1 + pad_x) + 1), min(size[1], int(y1 + pad_y) + 1))
+        
+    def save_artifacts(self, image, analysis: Dict, base_name: str,
+                       output_dir: str, writer: OutputWriter,
+                       box: Optional[Tuple[int, int, int, int]] = None) -> List[str]:
+        """Gera as máscaras e a imagem de debug e as entrega ao writer; retorna os nomes dos arquivos
+
+        Com box, `image` é só o recorte (x0, y0, x1, y1) da imagem original: máscaras e
+        debug são gerados no recorte e a caixa fica em analysis["artifact_box"].
+        """
+        frame = FrameContext.wrap(image)
+        image = frame.bgr
+        landmarks = analysis["landmarks"]
+        contours = analysis["contours"]
+        if box is not None:
+            origin = np.array(box[:2])
+            landmarks = (np.asarray(landmarks) - origin).tolist()
+            contours = {k: (np.asarray(v) - origin).tolist() if v else [] for k, v in contours.items()}
+            analysis["artifact_box"] = list(box)
+        
         # Gerar diferentes tipos de máscara
         masks = {}
         
@@ -263,70 +323,182 @@ class FaceContourAnalyzer:
         masks["face_outline"] = mask_outline
         
         # Máscara artística
-        artistic_mask = self.create_artistic_mask(image, mask_hull)
+        artistic_mask = self.create_artistic_mask(frame, mask_hull)
         masks["artistic"] = artistic_mask
         
-        # Salvar resultados
-        base_name = os.path.splitext(os.path.basename(image_path))[0]
-        
-        # Salvar máscaras
-        cv2.imwrite(os.path.join(output_dir, f"{base_name}_mask_hull.png"), mask_hull)
-        cv2.imwrite(os.path.join(output_dir, f"{base_name}_mask_outline.png"), mask_outline)
-        cv2.imwrite(os.path.join(output_dir, f"{base_name}_mask_artistic.png"), artistic_mask)
-        
-        # Criar imagem com landmarks
-        debug_image = image.copy()
-        for i, (x, y) in enumerate(landmarks):
-            cv2.circle(debug_image, (x, y), 1, (0, 255, 0), -1)
+        # Salvar máscaras (codificação em segundo plano)
+        files = [
+            writer.submit_image(os.path.join(output_dir, f"{base_name}_mask_hull"), mask_hull, "mask"),
+            writer.submit_image(os.path.join(output_dir, f"{base_name}_mask_outline"), mask_outline, "mask"),
+            writer.submit_image(os.path.join(output_dir, f"{base_name}_mask_artistic"), artistic_mask, "artistic")
+        ]
+        
+        # Criar imagem com landmarks (reduzida quando o writer pede escala menor)
+        scale = writer.scale_for("debug")
+        if scale != 1.0:
+            h, w = image.shape[:2]
+            debug_image = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))),
+                                     interpolation=cv2.INTER_AREA)
+            debug_landmarks = (np.array(landmarks) * scale).astype(np.int32)
+            debug_contours = {k: (np.array(v) * scale).astype(np.int32).tolist() if v else []
+                              for k, v in contours.items()}
+        else:
+            debug_image = image.copy()
+            debug_landmarks = landmarks
+            debug_contours = contours
+        renderer = get_debug_renderer()
+        renderer.stamp_dots(debug_image, debug_landmarks, (0, 255, 0), radius=1)
             
         # Desenhar contornos das regiões
         colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255), (0, 255, 255)]
-        for i, (region, points) in enumerate(contours.items()):
-            if points:
-                points_array = np.array(points, dtype=np.int32)
-                cv2.polylines(debug_image, [points_array], True, colors[i % len(colors)], 2)
+        regions = list(debug_contours.values())
+        renderer.draw_outlines(debug_image, regions, [colors[i % len(colors)] for i in range(len(regions))], 2)
                 
-        cv2.imwrite(os.path.join(output_dir, f"{base_name}_debug.png"), debug_image)
+        files.append(writer.submit_image(os.path.join(output_dir, f"{base_name}_debug"), debug_image, "debug",
+                                        scale=1.0))
+        return [os.path.basename(f) for f in files]
+        
+    def process_image(self, image_path: str, output_dir: str = "output",
+                      writer: Optional[OutputWriter] = None) -> Dict:
+        """Processa a imagem completa: detecção, análise e geração de máscaras
+
+        Os arquivos são gravados pelo OutputWriter. Sem writer, um writer local é criado
+        e aguardado antes do retorno; com writer, a gravação continua em segundo plano
+        e o chamador deve usar writer.flush() antes de ler os arquivos.
+        """
+        print(f"🎯 Iniciando processamento de: {image_path}")
+        
+        # Criar diretório de saída
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Carregar imagem (reduzida para a detecção quando detection_size é definido)
+        if self.detection_size:
+            if not os.path.exists(image_path):
+                print(f"❌ Imagem não encontrada: {image_path}")
+                return {"error": "Falha ao carregar imagem"}
+            try:
+                still = StillImage(image_path, self.detection_size)
+            except FileNotFoundError as e:
+                print(f"❌ {e}")
+                return {"error": "Falha ao carregar imagem"}
+            print(f"✅ Imagem carregada: {image_path} - Dimensões: {still.full_size}, "
+                  f"detecção em {still.detection.shape[1]}x{still.detection.shape[0]}")
+            analysis = self.analyze_image(still.detection, image_path, still.full_size)
+        else:
+            image = self.load_image(image_path)
+            if image is None:
+                return {"error": "Falha ao carregar imagem"}
+            image = FrameContext(bgr=image)
+            analysis = self.analyze_image(image, image_path)
+        if "error" in analysis:
+            return analysis
+        box = None
+        if self.detection_size:
+            # Só o recorte do rosto em resolução total é processado (JPEG: decodificado agora)
+            box = self.face_box(analysis["landmarks"], still.full_size)
+            image = FrameContext(bgr=np.ascontiguousarray(still.crop(*box)))
+        
+        # Salvar resultados
+        base_name = os.path.splitext(os.path.basename(image_path))[0]
+        own_writer = writer is None
+        if own_writer:
+            writer = OutputWriter()
+        
+        files_generated = self.save_artifacts(image, analysis, base_name, output_dir, writer, box)
         
         # Compilar resultado
         result = {
             "image_path": image_path,
             "output_directory": output_dir,
-            "timestamp": time.time(),
+            "timestamp": analysis["timestamp"],
             "face_detected": True,
-            "landmarks_count": len(landmarks),
-            "features": features,
-            "contours": contours,
-            "files_generated": [
-                f"{base_name}_mask_hull.png",
-                f"{base_name}_mask_outline.png",
-                f"{base_name}_mask_artistic.png",
-                f"{base_name}_debug.png"
-            ]
+            "landmarks_count": analysis["landmarks_count"],
+            "features": analysis["features"],
+            "contours": analysis["contours"],
+            "files_generated": files_generated
         }
+        for key in ("contour_tolerance", "artifact_box"):
+            if key in analysis:
+                result[key] = analysis[key]
         
         # Salvar análise em JSON
         json_path = os.path.join(output_dir, f"{base_name}_analysis.json")
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-            
-        print(f"✅ Processamento concluído! Arquivos salvos em: {output_dir}")
+        if own_writer:
+            # files_generated só com o que foi gravado de fato
+            confirm_files(result, writer.flush())
+            writer.submit_json(json_path, result)
+            writer.close()
+            print(f"✅ Processamento concluído! Arquivos salvos em: {output_dir}")
+        else:
+            # Writer externo: o JSON entra na fila com os demais; quem chama confirm_files()
+            # depois do flush() o regrava se algum arquivo falhou
+            writer.submit_json(json_path, result)
+            print(f"✅ Processamento concluído! Gravação em andamento em: {output_dir}")
         return result
 
+def confirm_files(result: Dict, written: List[str]) -> bool:
+    """Deixa em files_generated só os arquivos que o OutputWriter confirmou (retorno de flush())
+
+    Retorna True se algum arquivo planejado não foi gravado.
+    """
+    if "files_generated" not in result:
+        return False
+    written = {os.path.normpath(path) for path in written}
+    planned = result["files_generated"]
+    result["files_generated"] = [name for name in planned
+                                 if os.path.normpath(os.path.join(result["output_directory"], name)) in written]
+    return len(result["files_generated"]) != len(planned)
+
 def main():
     parser = argparse.ArgumentParser(description="Analisador Facial com Geração de Contornos")
-    parser.add_argument("--image", "-i", default="assets/rosto3d.png", help="Caminho para a imagem")
+    parser.add_argument("--image", "-i", nargs="+", default=["assets/rosto3d.png"], help="Caminho(s) para a(s) imagem(ns)")
     parser.add_argument("--output", "-o", default="output", help="Diretório de saída")
     parser.add_argument("--verbose", "-v", action="store_true", help="Modo verboso")
+    parser.add_argument("--mask-format", choices=["png", "webp", "jpg"], default="png", help="Formato das máscaras")
+    parser.add_argument("--debug-format", choices=["png", "webp", "jpg"], default="png", help="Formato da imagem de debug")
+    parser.add_argument("--png-compression", type=int, default=3, help="Nível de compressão PNG (0-9)")
+    parser.add_argument("--quality", type=int, default=90, help="Qualidade WebP/JPEG (0-100)")
+    parser.add_argument("--debug-scale", type=float, default=1.0, help="Escala da imagem de debug (ex: 0.5)")
+    parser.add_argument("--writer-threads", type=int, default=2, help="Threads de gravação em segundo plano")
+    parser.add_argument("--detection-size", type=int,
+                        help="Detectar em uma versão reduzida com este lado maior (ex: 1280 para fotos de 24 MP)")
+    parser.add_argument("--simplify", type=float, metavar="PX",
+                        help="Simplificar os contornos com esta tolerância em pixels (ex: 1.0)")
+    parser.add_argument("--face-outline", action="store_true",
+                        help="Incluir a oval do rosto e o hull nos contornos")
     
     args = parser.parse_args()
     
     # Criar analisador
-    analyzer = FaceContourAnalyzer()
+    analyzer = FaceContourAnalyzer(args.detection_size, args.simplify, args.face_outline)
     
-    # Processar imagem
-    result = analyzer.process_image(args.image, args.output)
+    image_spec = {"png_compression": args.png_compression, "quality": args.quality}
+    formats = {
+        "mask": dict(image_spec, format=args.mask_format),
+        "artistic": dict(image_spec, format=args.mask_format),
+        "debug": dict(image_spec, format=args.debug_format, scale=args.debug_scale)
+    }
     
+    # A gravação de uma imagem se sobrepõe à inferência da próxima
+    with OutputWriter(max_workers=args.writer_threads, formats=formats) as writer:
+        results = [analyzer.process_image(image_path, args.output, writer) for image_path in args.image]
+        written = writer.flush()
+        
+        # Análises que listavam um arquivo que falhou são regravadas com a lista confirmada
+        for result in results:
+            if confirm_files(result, written):
+                base_name = os.path.splitext(os.path.basename(result["image_path"]))[0]
+                writer.submit_json(os.path.join(args.output, f"{base_name}_analysis.json"), result)
+    
+    for result in results:
+        print_summary(result, args.verbose)
+    
+    if writer.errors:
+        print(f"\n❌ {len(writer.errors)} arquivo(s) não foram gravados")
+        sys.exit(1)
+
+def print_summary(result: Dict, verbose: bool = False):
+    """Mostra o resumo de um processamento"""
     if "error" in result:
         print(f"❌ Erro: {result['error']}")
         return
@@ -336,9 +508,12 @@ def main():
     print(f"• Landmarks detectados: {result['landmarks_count']}")
     print(f"• Características analisadas: {len(result['features'])}")
     print(f"• Regiões de contorno: {len(result['contours'])}")
+    if "contour_tolerance" in result:
+        print(f"• Pontos de contorno: {sum(len(p) for p in result['contours'].values())} "
+              f"(tolerância {result['contour_tolerance']} px)")
     print(f"• Arquivos gerados: {len(result['files_generated'])}")
     
-    if args.verbose:
+    if verbose:
         print("\n🔍 DETALHES DAS CARACTERÍSTICAS:")
         features = result.get('features', {})
         
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Face Gate - Verificação barata de presença de rosto antes do FaceMesh
+O FaceDetection de curto alcance roda em uma versão reduzida do frame; sem
+rosto, a inferência do mesh é pulada. Com rosto, a caixa detectada pode
+delimitar o recorte entregue ao mesh (imagens estáticas). No modo tracking
+o portão só roda enquanto o mesh não está rastreando ninguém
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from frame_context import FrameContext
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.frame_context import FrameContext
+
+Box = Tuple[int, int, int, int]  # x, y, largura, altura em pixels do frame original
+
+
+class FacePresenceGate:
+    def __init__(self, detect_size: int = 320, min_detection_confidence: float = 0.5, model_selection: int = 0):
+        """detect_size: lado maior do frame reduzido usado na detecção
+
+        model_selection 0 = curto alcance (rostos a até ~2 m, ex: quiosque/webcam), 1 = longo alcance.
+        """
+        import mediapipe as mp  # só quando o portão é construído (ver engine_config)
+        self.detect_size = detect_size
+        self.face_detection = mp.solutions.face_detection.FaceDetection(
+            model_selection=model_selection, min_detection_confidence=min_detection_confidence
+        )
+
+    def detect(self, frame) -> List[Box]:
+        """Caixas dos rostos presentes (lista vazia = cena sem rosto)"""
+        frame = FrameContext.wrap(frame)
+        small = frame.downscaled(self.detect_size)
+        results = self.face_detection.process(small.rgb)
+        if not results.detections:
+            return []
+
+        boxes = []
+        for detection in results.detections:
+            box = detection.location_data.relative_bounding_box
+            x0 = int(max(0.0, box.xmin) * frame.width)
+            y0 = int(max(0.0, box.ymin) * frame.height)
+            x1 = int(min(1.0, box.xmin + box.width) * frame.width)
+            y1 = int(min(1.0, box.ymin + box.height) * frame.height)
+            if x1 > x0 and y1 > y0:
+                boxes.append((x0, y0, x1 - x0, y1 - y0))
+        return boxes
+
+    def close(self):
+        self.face_detection.close()
+
+
+def expand_box(box: Box, width: int, height: int, margin: float) -> Tuple[int, int, int, int]:
+    """Caixa quadrada ampliada por margin (fração do lado), limitada ao frame: (x0, y0, x1, y1)"""
+    x, y, w, h = box
+    side = max(w, h) * (1.0 + 2.0 * margin)
+    cx, cy = x + w / 2.0, y + h / 2.0
+    x0, y0 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+    x1, y1 = int(min(width, cx + side / 2)), int(min(height, cy + side / 2))
+    return x0, y0, x1, y1
+
+
+def remap_landmarks(multi_face_landmarks, crop: Tuple[int, int, int, int], width: int, height: int):
+    """Converte (no lugar) landmarks normalizados do recorte para o frame inteiro"""
+    x0, y0, x1, y1 = crop
+    sx, sy = (x1 - x0) / width, (y1 - y0) / height
+    ox, oy = x0 / width, y0 / height
+    for face_landmarks in multi_face_landmarks:
+        for lm in face_landmarks.landmark:
+            lm.x = lm.x * sx + ox
+            lm.y = lm.y * sy + oy
+            lm.z = lm.z * sx  # z na escala da largura da imagem
+
+
+class GatedFaceMesh:
+    def __init__(self, face_mesh, gate: Optional[FacePresenceGate] = None, crop: bool = False,
+                 margin: float = 0.35, fallback: bool = False):
+        """Envolve um FaceMesh com o portão de presença
+
+        crop=True entrega ao mesh só o recorte em volta do rosto detectado (imagens
+        estáticas); no modo tracking manter False para não deslocar o referencial
+        entre frames. fallback=True (imagens estáticas) roda o mesh no frame inteiro
+        quando o portão ou o recorte não acham o rosto, em vez de desistir: rostos
+        pequenos ou de perfil escapam do FaceDetection reduzido. O portão rígido
+        fica para o modo ao vivo, onde pular frames vazios é o ganho.
+        """
+        self.face_mesh = face_mesh
+        self.gate = gate or FacePresenceGate()
+        self.crop = crop
+        self.margin = margin
+        self.fallback = fallback
+        self.tracking = False
+        self.stats = {"frames": 0, "gate_runs": 0, "mesh_runs": 0, "skipped": 0, "fallbacks": 0}
+
+    def process(self, frame):
+        """Resultado do FaceMesh (multi_face_landmarks no referencial do frame inteiro),
+        ou None quando o portão não encontrou rosto"""
+        frame = FrameContext.wrap(frame)
+        self.stats["frames"] += 1
+
+        boxes = None
+        if not self.tracking or self.crop:
+            boxes = self.gate.detect(frame)
+            self.stats["gate_runs"] += 1
+            if not boxes and not self.fallback:
+                self.tracking = False
+                self.stats["skipped"] += 1
+                return None
+
+        self.stats["mesh_runs"] += 1
+        if boxes and self.crop:
+            region = expand_box(max(boxes, key=lambda b: b[2] * b[3]), frame.width, frame.height, self.margin)
+            x0, y0, x1, y1 = region
+            results = self.face_mesh.process(np.ascontiguousarray(frame.rgb[y0:y1, x0:x1]))
+            if results.multi_face_landmarks:
+                remap_landmarks(results.multi_face_landmarks, region, frame.width, frame.height)
+            elif self.fallback:
+                self.stats["fallbacks"] += 1
+                results = self.face_mesh.process(frame.rgb)
+        else:
+            if boxes is not None and not boxes:
+                self.stats["fallbacks"] += 1
+            results = self.face_mesh.process(frame.rgb)
+
+        self.tracking = bool(results.multi_face_landmarks)
+        return results
+
+    def summary(self) -> Dict:
+        frames = self.stats["frames"]
+        return dict(self.stats, skipped_ratio=self.stats["skipped"] / frames if frames else 0.0)
@@ -4,8 +4,19 @@ import numpy as np
 import argparse
 import os
 
+try:
+    from frame_ring import open_capture
+    from frame_context import FrameContext
+    from face_regions import mediapipe_points
+    from mask_warp import MaskWarper
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.frame_ring import open_capture
+    from python.frame_context import FrameContext
+    from python.face_regions import mediapipe_points
+    from python.mask_warp import MaskWarper
+
 class InteractiveFaceMask:
-    def __init__(self, mask_image_path='rosto3dmask.jpg'):
+    def __init__(self, mask_image_path='rosto3dmask.jpg', warp=False):
         # Carregar cascatas do OpenCV
         self.face_cascade = cv.CascadeClassifier()
         self.eyes_cascade = cv.CascadeClassifier()
@@ -39,6 +50,31 @@ class InteractiveFaceMask:
         self.apply_mask = True
         self.mask_opacity = 0.7
         
+        # Modo warp: máscara deformada pelos landmarks do FaceMesh (segue rotação e expressão)
+        self.warper = None
+        self.face_mesh = None
+        self.warp_mask = False
+        if warp:
+            self.enable_warp()
+        
+    def enable_warp(self):
+        """Prepara a triangulação da máscara (uma vez) e o FaceMesh em modo tracking"""
+        if self.mask_image is None:
+            print("Aviso: Modo warp requer uma imagem de máscara")
+            return
+        import mediapipe as mp
+        try:
+            self.warper = MaskWarper(self.mask_image)
+        except ValueError as e:
+            print(f"Aviso: Modo warp indisponível: {e}")
+            return
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=False, max_num_faces=4, refine_landmarks=True,
+            min_detection_confidence=0.5, min_tracking_confidence=0.5
+        )
+        self.warp_mask = True
+        print(f"Modo warp: {len(self.warper)} triângulos")
+        
     def resize_mask_to_face(self, mask, face_width, face_height):
         """Redimensiona a máscara para se ajustar ao rosto detectado"""
         if mask is None:
@@ -79,9 +115,10 @@ class InteractiveFaceMask:
         return frame
         
     def detect_and_display(self, frame):
-        """Detecta faces, olhos e sorrisos no frame"""
-        frame_gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        frame_gray = cv.equalizeHist(frame_gray)
+        """Detecta faces, olhos e sorrisos no frame (BGR ou FrameContext)"""
+        context = FrameContext.wrap(frame)
+        frame = context.bgr
+        frame_gray = context.equalized
         
         # Criar cópia do frame original para mostrar lado a lado
         original_frame = frame.copy()
@@ -90,12 +127,19 @@ class InteractiveFaceMask:
         # Detectar faces
         faces = self.face_cascade.detectMultiScale(frame_gray, 1.1, 3, 0, (30, 30))
         
+        # Modo warp: máscara deformada pelos landmarks em vez de esticada no retângulo
+        if self.apply_mask and self.warp_mask:
+            results = self.face_mesh.process(context.rgb)
+            for face_landmarks in results.multi_face_landmarks or []:
+                points = mediapipe_points(face_landmarks, frame.shape[1], frame.shape[0])
+                self.warper.apply(masked_frame, points, self.mask_opacity)
+        
         for (x, y, w, h) in faces:
             # Centro do rosto
             center = (x + w//2, y + h//2)
             
             # Aplicar máscara no frame da direita
-            if self.apply_mask and self.mask_image is not None:
+            if self.apply_mask and self.mask_image is not None and not self.warp_mask:
                 masked_frame = self.apply_mask_to_face(masked_frame, self.mask_image, x, y, w, h)
             
             # Desenhar detecções no frame original (esquerda)
@@ -137,15 +181,16 @@ class InteractiveFaceMask:
         h, w = frame.shape[:2]
         
         # Fundo do painel
-        cv.rectangle(frame, (10, 10), (300, 120), (0, 0, 0), -1)
-        cv.rectangle(frame, (10, 10), (300, 120), (255, 255, 255), 2)
+        cv.rectangle(frame, (10, 10), (300, 140), (0, 0, 0), -1)
+        cv.rectangle(frame, (10, 10), (300, 140), (255, 255, 255), 2)
         
         # Informações
         info_text = [
             f"Faces detectadas: {num_faces}",
             f"Mascara: {'ON' if self.apply_mask else 'OFF'} (M)",
             f"Info: {'ON' if self.show_detection_info else 'OFF'} (I)",
-            f"Opacidade: {int(self.mask_opacity * 100)}% (+/-)"
+            f"Opacidade: {int(self.mask_opacity * 100)}% (+/-)",
+            f"Warp: {'ON' if self.warp_mask else 'OFF'} (W)"
         ]
         
         for i, text in enumerate(info_text):
@@ -175,8 +220,8 @@ class InteractiveFaceMask:
 
         return combined_frame
     def run_camera(self, camera_device=0):
-        """Executa detecção em tempo real com câmera"""
-        cap = cv.VideoCapture(camera_device)
+        """Executa detecção em tempo real com câmera (índice ou "shm:NOME" de um frame_ring)"""
+        cap = open_capture(camera_device)
         if not cap.isOpened():
             print('--(!)Erro ao abrir captura de vídeo')
             return
@@ -187,6 +232,7 @@ class InteractiveFaceMask:
         print("I: Toggle informações de detecção")
         print("+: Aumentar opacidade da máscara")
         print("-: Diminuir opacidade da máscara")
+        print("W: Toggle máscara deformada pelos landmarks")
         print("S: Salvar frame atual")
         print("================")
         
@@ -221,6 +267,12 @@ class InteractiveFaceMask:
             elif key == ord('-'):
                 self.mask_opacity = max(0.1, self.mask_opacity - 0.1)
                 print(f"Opacidade: {int(self.mask_opacity * 100)}%")
+            elif key == ord('w') or key == ord('W'):
+                if self.warper is None:
+                    self.enable_warp()
+                else:
+                    self.warp_mask = not self.warp_mask
+                print(f"Warp: {'ON' if self.warp_mask else 'OFF'}")
             elif key == ord('s') or key == ord('S'):
                 filename = f"face_tracking_frame_{frame_count}.png"
                 cv.imwrite(filename, frame)
@@ -262,18 +314,21 @@ def main():
     parser.add_argument('--mask', help='Caminho para imagem da máscara', default='rosto3dmask.jpg')
     parser.add_argument('--camera', help='Número da câmera', type=int, default=0)
     parser.add_argument('--image', help='Processar imagem estática em vez da câmera')
+    parser.add_argument('--shared', help='Ler frames do frame ring compartilhado com este nome')
+    parser.add_argument('--warp', action='store_true',
+                        help='Deformar a máscara pelos landmarks do FaceMesh (segue rotação e expressão)')
     
     args = parser.parse_args()
     
     # Criar detector
-    detector = InteractiveFaceMask(args.mask)
+    detector = InteractiveFaceMask(args.mask, warp=args.warp)
     
     if args.image:
         # Processar imagem estática
         detector.process_static_image(args.image)
     else:
-        # Executar com câmera
-        detector.run_camera(args.camera)
+        # Executar com câmera (ou com o daemon de captura compartilhado)
+        detector.run_camera(f"shm:{args.shared}" if args.shared else args.camera)
 
 if __name__ == '__main__':
     main()
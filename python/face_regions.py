@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Face Regions - Tabelas de índices das regiões do MediaPipe Face Mesh
+Fonte única da topologia usada pelos analisadores, pelo tracker e pelos scripts
+de extração. Cada RegionTable concatena os índices das suas regiões em um único
+índice de gather com offsets: todos os contornos de um frame (ou de um lote de
+frames) saem de uma só indexação e são separados em views
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+# Contorno externo do rosto (linha da mandíbula + testa)
+FACE_OVAL = (10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
+             397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136,
+             172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109)
+
+# Olhos (esquerdo/direito do ponto de vista da imagem, como nos analisadores)
+LEFT_EYE = (33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246)
+RIGHT_EYE = (362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398)
+
+# Boca: contorno usado nas máscaras, contorno externo dos lábios e contorno interno
+MOUTH = (61, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95)
+LIPS_OUTER = (61, 146, 91, 181, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318)
+LIPS_INNER = (78, 191, 80, 81, 82, 13, 312, 311, 310, 415, 308, 324, 318)
+
+NOSE = (1, 2, 5, 4, 6, 168, 8, 9, 10, 151, 195, 197, 196, 3, 51, 48, 115, 131, 134, 102, 49, 220)
+LEFT_EYEBROW = (46, 53, 52, 51, 48, 115, 131, 134, 102, 49, 220, 305, 293, 334, 296, 336)
+RIGHT_EYEBROW = (285, 295, 282, 283, 276, 353, 383, 300, 368, 369, 299, 333, 298, 301)
+
+# Pontos das métricas de abertura (EAR dos olhos, proporção da boca)
+LEFT_EYE_EAR = (33, 160, 158, 133, 153, 144)
+RIGHT_EYE_EAR = (362, 385, 387, 263, 373, 380)
+MOUTH_MAR = (61, 291, 39, 181, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318)
+
+# Pontos destacados pela animação do FaceTracker3D
+HIGHLIGHT_POINTS = (1, 2, 5, 6, 8, 9, 10, 151, 175, 199, 200, 236, 3, 51, 48, 115,
+                    131, 134, 102, 49, 220, 305, 292, 333, 298, 301)
+
+
+class RegionTable:
+    def __init__(self, regions: Dict[str, Sequence[int]]):
+        """Pré-compila o índice de gather concatenado e os offsets de cada região"""
+        self.names: Tuple[str, ...] = tuple(regions)
+        sizes = [len(indices) for indices in regions.values()]
+        self.index = np.concatenate([np.asarray(indices, dtype=np.intp) for indices in regions.values()])
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.intp)
+        self.region_max = np.array([max(indices) for indices in regions.values()], dtype=np.intp)
+        self.max_index = int(self.region_max.max())
+        self._slices = {name: slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+                        for i, name in enumerate(self.names)}
+        self.index.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def gather(self, landmarks) -> np.ndarray:
+        """Pontos de todas as regiões, concatenados: (..., N, D) -> (..., len(self), D)"""
+        return np.asarray(landmarks)[..., self.index, :]
+
+    def split(self, gathered: np.ndarray) -> Dict[str, np.ndarray]:
+        """Separa o resultado de gather em views por região"""
+        return {name: gathered[..., s, :] for name, s in self._slices.items()}
+
+    def extract(self, landmarks, dtype: Optional[np.dtype] = None) -> Dict[str, np.ndarray]:
+        """Contornos de todas as regiões com uma única indexação
+
+        Regiões com índices além dos landmarks disponíveis (ex: 468 pontos sem
+        refine_landmarks) voltam vazias, como nas versões anteriores dos analisadores.
+        """
+        points = np.asarray(landmarks, dtype=dtype)
+        if points.ndim < 2:
+            points = points.reshape(0, 2)
+        count = points.shape[-2]
+        if count > self.max_index:
+            return self.split(self.gather(points))
+
+        empty = points[..., :0, :]
+        return {name: points[..., self.region(name), :] if count > self.region_max[i] else empty
+                for i, name in enumerate(self.names)}
+
+    def region(self, name: str) -> np.ndarray:
+        """Índices de uma região (view do índice concatenado)"""
+        return self.index[self._slices[name]]
+
+
+def mediapipe_points(face_landmarks, w: int, h: int) -> np.ndarray:
+    """Landmarks de uma face do MediaPipe em pixels (N, 2) int32, convertidos uma vez por frame"""
+    coords = np.array([(lm.x, lm.y) for lm in face_landmarks.landmark], dtype=np.float64)
+    return (coords * (w, h)).astype(np.int32)
+
+
+# Tabelas usadas pelos módulos do projeto
+CONTOUR_REGIONS = RegionTable({
+    "left_eye": LEFT_EYE,
+    "right_eye": RIGHT_EYE,
+    "mouth": MOUTH,
+    "nose": NOSE,
+    "left_eyebrow": LEFT_EYEBROW,
+    "right_eyebrow": RIGHT_EYEBROW
+})
+
+TRACKER_REGIONS = RegionTable({
+    "face_oval": FACE_OVAL,
+    "left_eye": LEFT_EYE,
+    "right_eye": RIGHT_EYE,
+    "lips": LIPS_OUTER
+})
+
+SIMPLE_REGIONS = RegionTable({
+    "left_eye": LEFT_EYE,
+    "right_eye": RIGHT_EYE,
+    "mouth": LIPS_INNER
+})
+
+METRIC_REGIONS = RegionTable({
+    "left_eye": LEFT_EYE_EAR,
+    "right_eye": RIGHT_EYE_EAR,
+    "mouth": MOUTH_MAR
+})
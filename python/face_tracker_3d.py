@@ -1,29 +1,40 @@
 import cv2
 import numpy as np
-import mediapipe as mp
 import math
+import os
 import time
+from typing import Optional
+
+try:
+    from frame_ring import open_capture
+    from landmark_archive import LandmarkArchiveWriter
+    from face_regions import TRACKER_REGIONS, HIGHLIGHT_POINTS, mediapipe_points
+    from face_gate import GatedFaceMesh
+    from engine_config import EngineFactory, add_config_arguments, factory_from_args
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.frame_ring import open_capture
+    from python.landmark_archive import LandmarkArchiveWriter
+    from python.face_regions import TRACKER_REGIONS, HIGHLIGHT_POINTS, mediapipe_points
+    from python.face_gate import GatedFaceMesh
+    from python.engine_config import EngineFactory, add_config_arguments, factory_from_args
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+# Codec do VideoWriter por extensão de saída (contêiner e codec precisam combinar)
+VIDEO_FOURCC = {'.mp4': 'mp4v', '.mov': 'mp4v', '.avi': 'MJPG', '.mkv': 'XVID', '.webm': 'VP80'}
 
 class FaceTracker3D:
-    def __init__(self):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
-        
-        # Configuração do Face Mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            static_image_mode=True,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.3,
-            min_tracking_confidence=0.3
-        )
+    def __init__(self, engines: Optional[EngineFactory] = None):
+        """engines: fábrica de modelos (engine_config); o FaceMesh só é construído no primeiro uso"""
+        self.engines = engines or EngineFactory()
+        self._face_mesh = None
         
         # Pontos importantes do rosto para a máscara
-        self.FACE_OVAL = [10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288, 397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136, 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109]
-        self.LEFT_EYE = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
-        self.RIGHT_EYE = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
-        self.LIPS = [61, 146, 91, 181, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318]
+        # (tabelas compartilhadas em face_regions; extraídas juntas uma vez por frame)
+        self.regions = TRACKER_REGIONS
+        self.FACE_OVAL = TRACKER_REGIONS.region("face_oval")
+        self.LEFT_EYE = TRACKER_REGIONS.region("left_eye")
+        self.RIGHT_EYE = TRACKER_REGIONS.region("right_eye")
+        self.LIPS = TRACKER_REGIONS.region("lips")
         
         # Cores para diferentes partes
         self.colors = {
@@ -46,6 +57,7 @@ class FaceTracker3D:
         }
         
         # Carregar ajustes salvos ao inicializar
+        self.adjustments_file = self.engines.config.get("tracker", "adjustments_file")
         self.load_manual_adjustments()
         
         # Variáveis para controle do mouse
@@ -53,6 +65,29 @@ class FaceTracker3D:
         self.last_mouse_pos = (0, 0)
         self.adjustment_mode = 'mouth'  # 'mouth', 'eyes', 'face'
         
+    @property
+    def face_mesh(self):
+        """FaceMesh da configuração (seção face_mesh), construído no primeiro acesso"""
+        if self._face_mesh is None:
+            self._face_mesh = self.engines.get("face_mesh")
+        return self._face_mesh
+    
+    @face_mesh.setter
+    def face_mesh(self, face_mesh):
+        self._face_mesh = face_mesh
+    
+    @property
+    def mp_face_mesh(self):
+        return self.engines.module("mediapipe").solutions.face_mesh
+    
+    @property
+    def mp_drawing(self):
+        return self.engines.module("mediapipe").solutions.drawing_utils
+    
+    @property
+    def mp_drawing_styles(self):
+        return self.engines.module("mediapipe").solutions.drawing_styles
+        
     def mouse_callback(self, event, x, y, flags, param):
         """Callback para eventos do mouse"""
         if event == cv2.EVENT_LBUTTONDOWN:
@@ -90,7 +125,7 @@ class FaceTracker3D:
         """Salva os ajustes manuais em arquivo JSON"""
         import json
         try:
-            with open('manual_adjustments.json', 'w') as f:
+            with open(self.adjustments_file, 'w') as f:
                 json.dump(self.manual_adjustments, f, indent=2)
             print("Ajustes manuais salvos!")
         except Exception as e:
@@ -100,7 +135,7 @@ class FaceTracker3D:
         """Carrega os ajustes manuais do arquivo JSON"""
         import json
         try:
-            with open('manual_adjustments.json', 'r') as f:
+            with open(self.adjustments_file, 'r') as f:
                 saved_adjustments = json.load(f)
                 self.manual_adjustments.update(saved_adjustments)
             print(f"Ajustes manuais carregados: {self.manual_adjustments}")
@@ -119,16 +154,12 @@ class FaceTracker3D:
         pulse = abs(math.sin(frame_count * 0.1)) * 0.5 + 0.5
         glow_intensity = int(pulse * 100)
         
-        # Desenhar contorno do rosto com efeito 3D
-        face_points = []
-        for idx in self.FACE_OVAL:
-            if idx < len(landmarks.landmark):
-                x = int(landmarks.landmark[idx].x * w)
-                y = int(landmarks.landmark[idx].y * h)
-                face_points.append((x, y))
+        # Todos os contornos do frame com uma única indexação
+        regions = self.regions.extract(mediapipe_points(landmarks, w, h))
         
+        # Desenhar contorno do rosto com efeito 3D
+        face_points = regions["face_oval"]
         if len(face_points) > 3:
-            face_points = np.array(face_points, np.int32)
             
             # Criar efeito de profundidade
             for i in range(5, 0, -1):
@@ -137,10 +168,10 @@ class FaceTracker3D:
                 cv2.polylines(mask, [face_points], True, color, thickness=i*2)
         
         # Desenhar olhos com animação
-        self.draw_animated_eyes(mask, landmarks, w, h, frame_count)
+        self.draw_animated_eyes(mask, regions, frame_count)
         
         # Desenhar lábios com animação
-        self.draw_animated_lips(mask, landmarks, w, h, frame_count)
+        self.draw_animated_lips(mask, regions, frame_count)
         
         # Adicionar pontos faciais animados
         self.draw_animated_landmarks(mask, landmarks, w, h, frame_count)
@@ -151,36 +182,24 @@ class FaceTracker3D:
         
         return result
     
-    def draw_animated_eyes(self, mask, landmarks, w, h, frame_count):
-        """Desenha olhos com animação"""
+    def draw_animated_eyes(self, mask, regions, frame_count):
+        """Desenha olhos com animação (regions: contornos em pixels de face_regions)"""
         blink_effect = abs(math.sin(frame_count * 0.05)) * 0.8 + 0.2
         
-        for eye_indices in [self.LEFT_EYE, self.RIGHT_EYE]:
-            eye_points = []
-            for idx in eye_indices:
-                if idx < len(landmarks.landmark):
-                    x = int(landmarks.landmark[idx].x * w)
-                    y = int(landmarks.landmark[idx].y * h)
-                    eye_points.append((x, y))
-            
+        for eye_points in [regions["left_eye"], regions["right_eye"]]:
             if len(eye_points) > 3:
-                eye_points = np.array(eye_points, np.int32)
                 color_intensity = int(blink_effect * 255)
                 cv2.fillPoly(mask, [eye_points], (color_intensity, 0, color_intensity))
     
-    def draw_animated_lips(self, mask, landmarks, w, h, frame_count):
+    def draw_animated_lips(self, mask, regions, frame_count):
         """Desenha lábios com animação e ajuste manual"""
         lip_pulse = abs(math.sin(frame_count * 0.08)) * 0.6 + 0.4
         
-        lip_points = []
-        for idx in self.LIPS:
-            if idx < len(landmarks.landmark):
-                x = int(landmarks.landmark[idx].x * w) + self.manual_adjustments['mouth_offset_x']
-                y = int(landmarks.landmark[idx].y * h) + self.manual_adjustments['mouth_offset_y']
-                lip_points.append((x, y))
+        offset = np.array([self.manual_adjustments['mouth_offset_x'],
+                           self.manual_adjustments['mouth_offset_y']], dtype=np.int32)
+        lip_points = regions["lips"] + offset
         
         if len(lip_points) > 3:
-            lip_points = np.array(lip_points, np.int32)
             color_intensity = int(lip_pulse * 200)
             cv2.fillPoly(mask, [lip_points], (0, 0, color_intensity))
     
@@ -189,7 +208,7 @@ class FaceTracker3D:
         wave_offset = math.sin(frame_count * 0.1) * 3
         
         # Pontos importantes para destacar
-        important_points = [1, 2, 5, 6, 8, 9, 10, 151, 175, 199, 200, 236, 3, 51, 48, 115, 131, 134, 102, 49, 220, 305, 292, 333, 298, 301]
+        important_points = frozenset(HIGHLIGHT_POINTS)
         
         for i, landmark in enumerate(landmarks.landmark):
             x = int(landmark.x * w)
@@ -204,6 +223,22 @@ class FaceTracker3D:
                 # Pontos normais em verde
                 cv2.circle(image, (x, y), 1, self.colors['green'], -1)
     
+    def render_faces(self, image, multi_face_landmarks, frame_count):
+        """Máscara 3D animada + mesh de contornos de cada rosto detectado"""
+        for face_landmarks in multi_face_landmarks or ():
+            # Criar máscara 3D animada
+            image = self.create_3d_mask_overlay(image, face_landmarks, frame_count)
+            
+            # Desenhar mesh facial
+            self.mp_drawing.draw_landmarks(
+                image,
+                face_landmarks,
+                self.mp_face_mesh.FACEMESH_CONTOURS,
+                landmark_drawing_spec=None,
+                connection_drawing_spec=self.mp_drawing_styles.get_default_face_mesh_contours_style()
+            )
+        return image
+    
     def process_image(self, image_path):
         """Processa uma imagem estática com animação"""
         image = cv2.imread(image_path)
@@ -249,18 +284,7 @@ class FaceTracker3D:
             current_image = image.copy()
             
             # Processar cada rosto detectado
-            for face_landmarks in results.multi_face_landmarks:
-                # Criar máscara 3D animada
-                current_image = self.create_3d_mask_overlay(current_image, face_landmarks, frame_count)
-                
-                # Desenhar mesh facial básico
-                self.mp_drawing.draw_landmarks(
-                    current_image,
-                    face_landmarks,
-                    self.mp_face_mesh.FACEMESH_CONTOURS,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing_styles.get_default_face_mesh_contours_style()
-                )
+            current_image = self.render_faces(current_image, results.multi_face_landmarks, frame_count)
             
             # Adicionar informações na tela
             fps = frame_count / (time.time() - start_time) if frame_count > 0 else 0
@@ -314,9 +338,15 @@ class FaceTracker3D:
         cv2.destroyAllWindows()
         print("Processamento concluído!")
     
-    def process_webcam(self):
-        """Processa feed da webcam em tempo real"""
-        cap = cv2.VideoCapture(0)
+    def process_webcam(self, on_landmarks=None, source=0, archive=None):
+        """Processa feed da webcam em tempo real
+
+        on_landmarks(face_landmarks, w, h), se informado, recebe a primeira face de cada
+        frame (ex: para publicar parâmetros de animação ao vivo via animation_stream).
+        source pode ser o índice da câmera ou "shm:NOME" para ler de um frame_ring.
+        archive (LandmarkArchiveWriter) grava os landmarks de todos os frames.
+        """
+        cap = open_capture(source)
         if not cap.isOpened():
             print("Erro: Não foi possível abrir a webcam")
             return
@@ -328,6 +358,8 @@ class FaceTracker3D:
         
         frame_count = 0
         start_time = time.time()
+        # Cena vazia: só o FaceDetection reduzido roda, o mesh fica parado até aparecer um rosto
+        gated_mesh = GatedFaceMesh(self.face_mesh, self.engines.get("face_gate"))
         
         while True:
             ret, frame = cap.read()
@@ -337,22 +369,20 @@ class FaceTracker3D:
             # Espelhar horizontalmente para melhor experiência
             frame = cv2.flip(frame, 1)
             
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.face_mesh.process(rgb_frame)
+            results = gated_mesh.process(frame)
+            multi_face_landmarks = results.multi_face_landmarks if results else None
+            
+            if archive is not None:
+                if not archive.width:
+                    archive.set_frame_size(frame.shape[1], frame.shape[0])
+                archive.append_mediapipe(multi_face_landmarks)
             
-            if results.multi_face_landmarks:
-                for face_landmarks in results.multi_face_landmarks:
-                    # Criar máscara 3D animada
-                    frame = self.create_3d_mask_overlay(frame, face_landmarks, frame_count)
-                    
-                    # Desenhar mesh facial
-                    self.mp_drawing.draw_landmarks(
-                        frame,
-                        face_landmarks,
-                        self.mp_face_mesh.FACEMESH_CONTOURS,
-                        landmark_drawing_spec=None,
-                        connection_drawing_spec=self.mp_drawing_styles.get_default_face_mesh_contours_style()
-                    )
+            if multi_face_landmarks:
+                if on_landmarks is not None:
+                    h, w = frame.shape[:2]
+                    on_landmarks(multi_face_landmarks[0], w, h)
+                
+                frame = self.render_faces(frame, multi_face_landmarks, frame_count)
             
             # Adicionar informações na tela
             fps = frame_count / (time.time() - start_time) if frame_count > 0 else 0
@@ -370,36 +400,168 @@ class FaceTracker3D:
         
         cap.release()
         cv2.destroyAllWindows()
+        stats = gated_mesh.summary()
+        print(f"🚪 Frames sem rosto (mesh pulado): {stats['skipped']}/{stats['frames']}")
         print("Rastreamento via webcam encerrado!")
 
-def ajustar_fino():
-    import json
+    def render_headless(self, input_path, output=None, frames=90, fps=30.0):
+        """Renderiza a animação sem janela, na velocidade máxima, e mede o desempenho
+
+        input_path: imagem (rosto detectado uma vez, animado por `frames` frames, >= 1) ou vídeo
+        (detecção por frame, até `frames` frames; 0 = vídeo inteiro). Vídeos usam o FaceMesh
+        em modo tracking (seção live_face_mesh), que só redetecta quando perde o rosto.
+        output: arquivo de vídeo (.mp4/.avi/...), diretório para sequência de PNGs, ou None
+        para só medir. Retorna as estatísticas (FPS e latências em ms por frame).
+        """
+        image = None if os.path.splitext(input_path)[1].lower() in VIDEO_EXTENSIONS else cv2.imread(input_path)
+        cap = None
+        if image is None:
+            cap = cv2.VideoCapture(input_path)
+            if not cap.isOpened():
+                print(f"Erro: Não foi possível abrir {input_path}")
+                return None
+            fps = cap.get(cv2.CAP_PROP_FPS) or fps
+            video_mesh = self.engines.get("live_face_mesh")
+        elif frames <= 0:
+            # Uma imagem não termina sozinha: 0 frames renderizaria para sempre
+            print("Erro: para imagens, --frames precisa ser pelo menos 1")
+            return None
+        
+        writer = None
+        sequence_dir = None
+        if output and os.path.splitext(output)[1].lower() in VIDEO_EXTENSIONS:
+            pass  # VideoWriter criado no primeiro frame (tamanho ainda desconhecido)
+        elif output:
+            sequence_dir = output
+            os.makedirs(sequence_dir, exist_ok=True)
+        
+        multi_face_landmarks = None
+        if cap is None:
+            results = self.face_mesh.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            multi_face_landmarks = results.multi_face_landmarks
+            if not multi_face_landmarks:
+                print("Nenhum rosto detectado na imagem!")
+                return None
+        
+        detect_ms, render_ms, total_ms = [], [], []
+        frame_count = 0
+        start_time = time.perf_counter()
+        
+        while not frames or frame_count < frames:
+            frame_start = time.perf_counter()
+            if cap is not None:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                detect_start = time.perf_counter()
+                results = video_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                multi_face_landmarks = results.multi_face_landmarks
+                detect_ms.append((time.perf_counter() - detect_start) * 1000)
+            else:
+                frame = image.copy()
+            
+            render_start = time.perf_counter()
+            frame = self.render_faces(frame, multi_face_landmarks, frame_count)
+            render_ms.append((time.perf_counter() - render_start) * 1000)
+            
+            if output and sequence_dir is None:
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    fourcc = VIDEO_FOURCC[os.path.splitext(output)[1].lower()]
+                    writer = cv2.VideoWriter(output, cv2.VideoWriter_fourcc(*fourcc), fps, (w, h))
+                    if not writer.isOpened():
+                        print(f"Erro: não foi possível gravar {output} com o codec {fourcc}")
+                        if cap is not None:
+                            cap.release()
+                        return None
+                writer.write(frame)
+            elif sequence_dir:
+                cv2.imwrite(os.path.join(sequence_dir, f'frame_{frame_count:05d}.png'), frame)
+            
+            total_ms.append((time.perf_counter() - frame_start) * 1000)
+            frame_count += 1
+        
+        elapsed = time.perf_counter() - start_time
+        if cap is not None:
+            cap.release()
+        if writer is not None:
+            writer.release()
+        
+        def latency(values):
+            if not values:
+                return None
+            values = np.asarray(values)
+            return {"mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+                    "p95": float(np.percentile(values, 95)), "max": float(values.max())}
+        
+        stats = {
+            "input": input_path,
+            "output": output,
+            "frames": frame_count,
+            "seconds": elapsed,
+            "fps": frame_count / elapsed if elapsed > 0 else 0.0,
+            "render_fps": 1000.0 / np.mean(render_ms) if render_ms else 0.0,
+            "render_ms": latency(render_ms),
+            "detect_ms": latency(detect_ms),
+            "frame_ms": latency(total_ms)
+        }
+        
+        print(f"\n🎬 RENDERIZAÇÃO HEADLESS: {frame_count} frames em {elapsed:.2f}s")
+        print(f"• FPS total: {stats['fps']:.1f} | FPS do renderizador: {stats['render_fps']:.1f}")
+        for key in ("render_ms", "detect_ms", "frame_ms"):
+            if stats[key]:
+                print(f"• {key}: média {stats[key]['mean']:.2f} | p50 {stats[key]['p50']:.2f} | "
+                      f"p95 {stats[key]['p95']:.2f} | máx {stats[key]['max']:.2f}")
+        if output:
+            print(f"💾 Frames salvos em {output}")
+        return stats
+
+def ajustar_fino(config_path=None):
+    """Pergunta as confianças do FaceMesh e grava na configuração (face_engine.json)"""
+    try:
+        from engine_config import EngineConfig, CONFIG_FILE
+    except ImportError:  # importado como pacote a partir da raiz do projeto
+        from python.engine_config import EngineConfig, CONFIG_FILE
 
     ajuste_fino = {
         "min_detection_confidence": float(input("Confiança mínima de detecção (0.0 a 1.0): ").strip()),
         "min_tracking_confidence": float(input("Confiança mínima de rastreamento (0.0 a 1.0): ").strip())
     }
 
-    with open('ajuste_fino_config.json', 'w') as f:
-        json.dump(ajuste_fino, f)
-
-    print("Ajustes salvos em 'ajuste_fino_config.json'!")
-
-
-def carregar_ajuste_fino():
-    import json
-
-    try:
-        with open('ajuste_fino_config.json', 'r') as f:
-            ajuste_fino = json.load(f)
-            print("Carregado ajuste fino:", ajuste_fino)
-            return ajuste_fino
-    except (FileNotFoundError, json.JSONDecodeError):
-        print("Nenhum ajuste fino encontrado ou arquivo malformado. Usando ajustes padrão.")
-        return {}
+    path = config_path or CONFIG_FILE
+    EngineConfig().save({"face_mesh": ajuste_fino}, path)
+    print(f"Ajustes salvos em '{path}'!")
 
 
 def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Face Tracker 3D")
+    parser.add_argument("--source", default="0", help="Câmera (índice), frame ring compartilhado (shm:NOME) ou arquivo de vídeo")
+    parser.add_argument("--record", help="Gravar landmarks da webcam neste landmark archive (.lmka)")
+    parser.add_argument("--headless", metavar="ENTRADA",
+                        help="Renderizar imagem/vídeo sem janela nem menu (servidores e CI)")
+    parser.add_argument("--output", help="Saída do modo headless: vídeo (.mp4/.avi) ou diretório de PNGs")
+    parser.add_argument("--frames", type=int, default=90, help="Frames a renderizar no modo headless (vídeo: 0 = inteiro; imagem: >= 1)")
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS do vídeo gerado a partir de imagem")
+    parser.add_argument("--report", help="Salvar as estatísticas do modo headless em JSON")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.headless:
+        engines = factory_from_args(args)
+        tracker = FaceTracker3D(engines)
+        stats = tracker.render_headless(args.headless, args.output, args.frames, args.fps)
+        if args.startup_report:
+            engines.print_report()
+        if stats is None:
+            raise SystemExit(1)
+        if args.report:
+            import json
+            with open(args.report, 'w') as f:
+                json.dump(stats, f, indent=2)
+            print(f"📊 Relatório salvo em {args.report}")
+        return
+    
     print("=== Face Tracker 3D ===")
     print("1. Processar imagem face3d.png")
     print("2. Usar webcam em tempo real")
@@ -408,29 +570,28 @@ def main():
     choice = input("Escolha uma opção (1, 2 ou 3): ").strip()
     
     if choice == "3":
-        ajustar_fino()
+        ajustar_fino(args.config)
         return
 
-    ajuste_fino = carregar_ajuste_fino()
-    
-    tracker = FaceTracker3D()
-    
-    if ajuste_fino:
-        tracker.face_mesh = mp.solutions.face_mesh.FaceMesh(
-            static_image_mode=True,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=ajuste_fino.get('min_detection_confidence', 0.3),
-            min_tracking_confidence=ajuste_fino.get('min_tracking_confidence', 0.3)
-        )
+    # Configuração (arquivo + ambiente + --set) aplicada antes de qualquer modelo existir
+    engines = factory_from_args(args)
+    tracker = FaceTracker3D(engines)
 
     if choice == "1":
         tracker.process_image("face3d.png")
     elif choice == "2":
-        tracker.process_webcam()
+        if args.record:
+            with LandmarkArchiveWriter(args.record, metadata={"source": args.source}) as archive:
+                tracker.process_webcam(source=args.source, archive=archive)
+            print(f"Landmarks gravados em {args.record}")
+        else:
+            tracker.process_webcam(source=args.source)
     else:
         print("Opção inválida! Processando imagem por padrão...")
         tracker.process_image("face3d.png")
+    
+    if args.startup_report:
+        engines.print_report()
 
 if __name__ == "__main__":
     main()
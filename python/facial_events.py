@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Facial Events - Detecção em fluxo de piscadas e fala sobre as séries EAR/MAR
+Em vez dos limiares de um frame só (is_blinking / is_speaking), cada métrica
+passa por buffers circulares de tamanho fixo com estatísticas acumuladas
+(soma e soma dos quadrados), e os estados mudam com histerese: custo e memória
+constantes por frame, sem o pisca-pisca dos booleanos frame a frame
+
+Eventos emitidos: blink_start, blink_end (com duração), speech_start,
+speech_end (com duração); o estado corrente inclui a taxa de piscadas/min
+"""
+
+import argparse
+import math
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class RingStats:
+    def __init__(self, size: int):
+        """Janela deslizante de tamanho fixo com média e desvio padrão em O(1)"""
+        self.values = [0.0] * size
+        self.size = size
+        self.count = 0
+        self.index = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, value: float):
+        if self.count == self.size:
+            old = self.values[self.index]
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.total += value
+        self.total_sq += value * value
+        self.index = (self.index + 1) % self.size
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        mean = self.mean
+        return math.sqrt(max(0.0, self.total_sq / self.count - mean * mean))
+
+
+class BlinkDetector:
+    def __init__(self, fps: float = 30.0, close_ratio: float = 0.6, open_ratio: float = 0.8,
+                 baseline_seconds: float = 2.0, min_blink: float = 0.04, max_blink: float = 0.5,
+                 rate_window: float = 60.0):
+        """Piscada = EAR abaixo de close_ratio × linha de base; termina acima de open_ratio × base
+
+        A linha de base é a média do EAR com olhos abertos nos últimos baseline_seconds,
+        o que dispensa um limiar absoluto (0.2 em FaceAnalyzer, 0.15 em SimpleFaceAnalyzer).
+        Fechamentos mais longos que max_blink não contam como piscada (olhos fechados).
+        """
+        self.fps = fps
+        self.close_ratio = close_ratio
+        self.open_ratio = open_ratio
+        self.min_blink = min_blink
+        self.max_blink = max_blink
+        self.rate_window = rate_window
+        self.baseline = RingStats(max(2, int(baseline_seconds * fps)))
+        self.blink_times = deque(maxlen=max(1, int(rate_window * 4)))  # até 4 piscadas/s
+        self.closed_since: Optional[float] = None
+
+    def update(self, ear: float, timestamp: float) -> List[Dict]:
+        events = []
+        if not self.baseline.count:
+            self.baseline.push(ear)
+            return events
+
+        base = self.baseline.mean
+        if self.closed_since is None:
+            if ear < base * self.close_ratio:
+                self.closed_since = timestamp
+                events.append({"type": "blink_start", "t": timestamp})
+            else:
+                self.baseline.push(ear)
+        elif ear > base * self.open_ratio:
+            duration = timestamp - self.closed_since
+            self.closed_since = None
+            # Fechamentos de um frame só (ruído) e longos demais não contam na taxa
+            counted = self.min_blink <= duration <= self.max_blink
+            if counted:
+                self.blink_times.append(timestamp)
+            events.append({"type": "blink_end", "t": timestamp, "duration": round(duration, 3),
+                           "counted": counted})
+
+        while self.blink_times and timestamp - self.blink_times[0] > self.rate_window:
+            self.blink_times.popleft()
+        return events
+
+    @property
+    def blinking(self) -> bool:
+        return self.closed_since is not None
+
+    def rate(self, timestamp: float, start: float) -> float:
+        """Piscadas por minuto na janela (ou desde o início, se mais curto)"""
+        span = min(self.rate_window, timestamp - start)
+        return len(self.blink_times) * 60.0 / span if span > 0 else 0.0
+
+
+class SpeechDetector:
+    def __init__(self, fps: float = 30.0, window: float = 0.5, enter_std: float = 0.025,
+                 exit_std: float = 0.012, hangover: float = 0.4, min_open: float = 0.05):
+        """Fala = boca em movimento: desvio padrão do MAR na janela acima de enter_std
+
+        O segmento termina quando o desvio fica abaixo de exit_std por hangover segundos
+        (pausas curtas entre sílabas não quebram o segmento). min_open descarta
+        tremores com a boca fechada.
+        """
+        self.window = RingStats(max(2, int(window * fps)))
+        self.enter_std = enter_std
+        self.exit_std = exit_std
+        self.hangover = hangover
+        self.min_open = min_open
+        self.speaking_since: Optional[float] = None
+        self.quiet_since: Optional[float] = None
+
+    def update(self, mar: float, timestamp: float) -> List[Dict]:
+        self.window.push(mar)
+        std = self.window.std
+        events = []
+        if self.speaking_since is None:
+            if std > self.enter_std and self.window.mean > self.min_open:
+                self.speaking_since = timestamp
+                self.quiet_since = None
+                events.append({"type": "speech_start", "t": timestamp})
+        elif std < self.exit_std:
+            if self.quiet_since is None:
+                self.quiet_since = timestamp
+            elif timestamp - self.quiet_since >= self.hangover:
+                events.append({"type": "speech_end", "t": self.quiet_since,
+                               "duration": round(self.quiet_since - self.speaking_since, 3)})
+                self.speaking_since = None
+                self.quiet_since = None
+        else:
+            self.quiet_since = None
+        return events
+
+    @property
+    def speaking(self) -> bool:
+        return self.speaking_since is not None
+
+
+class FacialEventDetector:
+    def __init__(self, fps: float = 30.0, **kwargs):
+        """Piscadas e fala de uma face; kwargs com prefixo blink_/speech_ vão para cada detector"""
+        blink = {k[6:]: v for k, v in kwargs.items() if k.startswith("blink_")}
+        speech = {k[7:]: v for k, v in kwargs.items() if k.startswith("speech_")}
+        self.blinks = BlinkDetector(fps, **blink)
+        self.speech = SpeechDetector(fps, **speech)
+        self.start: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+
+    def update(self, eye_openness: float, mouth_ratio: float, timestamp: float) -> List[Dict]:
+        """Processa um frame (EAR médio, razão de abertura da boca); retorna os eventos novos"""
+        if self.start is None:
+            self.start = timestamp
+        self.last_timestamp = timestamp
+        return self.blinks.update(eye_openness, timestamp) + self.speech.update(mouth_ratio, timestamp)
+
+    def update_analysis(self, result: Dict, timestamp: float) -> List[Dict]:
+        """Atalho para o resultado de SimpleFaceAnalyzer/FaceAnalyzer (eyes/mouth)"""
+        return self.update(result["eyes"]["average_openness"], result["mouth"]["aspect_ratio"], timestamp)
+
+    def state(self) -> Dict:
+        """Estado estável (com histerese) para o renderizador"""
+        rate = self.blinks.rate(self.last_timestamp, self.start) if self.start is not None else 0.0
+        return {
+            "blinking": self.blinks.blinking,
+            "speaking": self.speech.speaking,
+            "blink_rate": round(rate, 1)
+        }
+
+
+def detect_archive(path: str, fps: Optional[float] = None, face: int = 0) -> Dict:
+    """Roda o detector sobre um landmark archive gravado; retorna eventos e totais"""
+    try:
+        from landmark_archive import LandmarkArchive, feature_series
+    except ImportError:  # importado como pacote a partir da raiz do projeto
+        from python.landmark_archive import LandmarkArchive, feature_series
+
+    archive = LandmarkArchive(path)
+    timestamps = archive.timestamps
+    if fps is None:
+        duration = float(timestamps[-1] - timestamps[0]) if len(archive) > 1 else 0.0
+        fps = (len(archive) - 1) / duration if duration > 0 else 30.0
+
+    detector = FacialEventDetector(fps)
+    events = []
+    chunk = 4096
+    for start in range(0, len(archive), chunk):
+        stop = min(len(archive), start + chunk)
+        present = archive.face_counts[start:stop] > face
+        if not present.any():
+            continue
+        series = feature_series(archive.pixel_landmarks(start, stop, face)[present])
+        for t, ear, mar in zip(timestamps[start:stop][present], series["average_openness"],
+                               series["mouth_aspect_ratio"]):
+            events.extend(detector.update(float(ear), float(mar), float(t)))
+
+    speech = [e["duration"] for e in events if e["type"] == "speech_end"]
+    return {
+        "fps": fps,
+        "blinks": sum(1 for e in events if e["type"] == "blink_end" and e["counted"]),
+        "blink_rate": detector.state()["blink_rate"],
+        "speech_segments": len(speech),
+        "speech_seconds": round(sum(speech), 3),
+        "events": events
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eventos de piscada e fala de um landmark archive (.lmka)")
+    parser.add_argument("archive", help="Arquivo gravado por landmark_archive/video_source")
+    parser.add_argument("--fps", type=float, help="Taxa de frames (padrão: estimada pelos timestamps)")
+    parser.add_argument("--events", action="store_true", help="Listar cada evento")
+    args = parser.parse_args()
+
+    result = detect_archive(args.archive, args.fps)
+    print(f"👁️ Piscadas: {result['blinks']} ({result['blink_rate']:.1f}/min)")
+    print(f"🗣️ Segmentos de fala: {result['speech_segments']} ({result['speech_seconds']:.1f} s)")
+    if args.events:
+        for event in result["events"]:
+            extra = f" ({event['duration']:.3f} s)" if "duration" in event else ""
+            print(f"   {event['t']:9.3f}  {event['type']}{extra}")
+
+
+if __name__ == "__main__":
+    main()
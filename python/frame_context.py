@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Frame Context - Variantes de cor de um frame calculadas uma única vez
+Cada etapa do pipeline (detecção, landmarks, máscaras, HUD) pede ao contexto
+a versão de que precisa (BGR, RGB, cinza, cinza equalizado, reduzida); a
+conversão acontece no primeiro acesso e é reutilizada pelas etapas seguintes
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+class FrameContext:
+    def __init__(self, bgr: Optional[np.ndarray] = None, rgb: Optional[np.ndarray] = None,
+                 timestamp: Optional[float] = None):
+        """Cria o contexto a partir do frame BGR (OpenCV) ou RGB (MediaPipe/dlib)
+
+        As variantes devolvidas são compartilhadas entre as etapas: copiar antes de
+        desenhar sobre elas.
+        """
+        if bgr is None and rgb is None:
+            raise ValueError("FrameContext precisa de um frame BGR ou RGB")
+        self._bgr = bgr
+        self._rgb = rgb
+        self._gray: Optional[np.ndarray] = None
+        self._equalized: Optional[np.ndarray] = None
+        self._scaled: Dict[int, "FrameContext"] = {}
+        self.timestamp = timestamp
+        self.scale = 1.0  # em relação ao frame original (contextos reduzidos)
+
+    @classmethod
+    def wrap(cls, image, color: str = "bgr") -> "FrameContext":
+        """Aceita um FrameContext (devolvido como está) ou um array na ordem de cor dada"""
+        if isinstance(image, FrameContext):
+            return image
+        return cls(rgb=image) if color == "rgb" else cls(bgr=image)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (self._bgr if self._bgr is not None else self._rgb).shape
+
+    @property
+    def width(self) -> int:
+        return self.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.shape[0]
+
+    @property
+    def bgr(self) -> np.ndarray:
+        if self._bgr is None:
+            self._bgr = cv2.cvtColor(self._rgb, cv2.COLOR_RGB2BGR)
+        return self._bgr
+
+    @property
+    def rgb(self) -> np.ndarray:
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self._bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            if self._bgr is not None:
+                self._gray = cv2.cvtColor(self._bgr, cv2.COLOR_BGR2GRAY)
+            else:
+                self._gray = cv2.cvtColor(self._rgb, cv2.COLOR_RGB2GRAY)
+        return self._gray
+
+    @property
+    def equalized(self) -> np.ndarray:
+        """Cinza com histograma equalizado (detectores Haar)"""
+        if self._equalized is None:
+            self._equalized = cv2.equalizeHist(self.gray)
+        return self._equalized
+
+    def gray_roi(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Cinza de uma região: view do cinza em cache, ou conversão só da região"""
+        if self._gray is not None:
+            return self._gray[y0:y1, x0:x1]
+        if self._bgr is not None:
+            return cv2.cvtColor(self._bgr[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        return cv2.cvtColor(self._rgb[y0:y1, x0:x1], cv2.COLOR_RGB2GRAY)
+
+    def downscaled(self, max_side: int) -> "FrameContext":
+        """Contexto reduzido (INTER_AREA) com lado maior <= max_side, também em cache"""
+        longest = max(self.width, self.height)
+        if longest <= max_side:
+            return self
+        if max_side not in self._scaled:
+            factor = max_side / longest
+            size = (max(1, round(self.width * factor)), max(1, round(self.height * factor)))
+            if self._bgr is not None:
+                child = FrameContext(bgr=cv2.resize(self._bgr, size, interpolation=cv2.INTER_AREA),
+                                     timestamp=self.timestamp)
+            else:
+                child = FrameContext(rgb=cv2.resize(self._rgb, size, interpolation=cv2.INTER_AREA),
+                                     timestamp=self.timestamp)
+            child.scale = self.scale * size[0] / self.width
+            self._scaled[max_side] = child
+        return self._scaled[max_side]
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Frame Ring - Buffer circular de frames em memória compartilhada
+Um daemon de captura abre a câmera uma única vez e grava os frames em um
+multiprocessing.shared_memory com números de sequência; vários processos
+consumidores (máscara, tracker, registro de features) leem o frame mais
+recente como views NumPy sem cópia
+"""
+
+import cv2
+import numpy as np
+import time
+import argparse
+from multiprocessing import shared_memory, resource_tracker
+from typing import Optional, Tuple, Union
+
+try:
+    from video_source import VideoFrameSource
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.video_source import VideoFrameSource
+
+RING_MAGIC = 0x46524E47  # "FRNG"
+
+# Cabeçalho: magic, slots, altura, largura, canais, sequência escrita (int64 cada)
+HEADER_FIELDS = 6
+HEADER_BYTES = HEADER_FIELDS * 8
+
+
+def _layout(slots: int, shape: Tuple[int, int, int]):
+    """Offsets de cada bloco dentro da memória compartilhada"""
+    frame_bytes = int(np.prod(shape))
+    seq_offset = HEADER_BYTES
+    ts_offset = seq_offset + slots * 8
+    frames_offset = ts_offset + slots * 8
+    # Alinhar os frames em 64 bytes
+    frames_offset = (frames_offset + 63) // 64 * 64
+    total = frames_offset + slots * frame_bytes
+    return seq_offset, ts_offset, frames_offset, total
+
+
+class _FrameRing:
+    def _bind(self, shm: shared_memory.SharedMemory, slots: int, shape: Tuple[int, int, int]):
+        self.shm = shm
+        self.slots = slots
+        self.shape = shape
+        seq_offset, ts_offset, frames_offset, _ = _layout(slots, shape)
+        buf = shm.buf
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buf, offset=0)
+        self.slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=seq_offset)
+        self.slot_ts = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=ts_offset)
+        self.frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=buf, offset=frames_offset)
+
+    @property
+    def sequence(self) -> int:
+        """Sequência do último frame completo (0 = nenhum frame ainda)"""
+        return int(self.header[5])
+
+    def close(self):
+        # Liberar as views antes de fechar o mapeamento
+        self.header = self.slot_seq = self.slot_ts = self.frames = None
+        self.shm.close()
+
+
+class FrameRingWriter(_FrameRing):
+    def __init__(self, name: str, shape: Tuple[int, int, int], slots: int = 4):
+        """Cria o buffer compartilhado para frames com o shape dado (altura, largura, canais)"""
+        _, _, _, total = _layout(slots, shape)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=total)
+        except FileExistsError:
+            # Sobra de um daemon anterior encerrado sem limpeza
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=total)
+        self._bind(shm, slots, shape)
+        self.header[:] = [RING_MAGIC, slots, shape[0], shape[1], shape[2], 0]
+        self.slot_seq[:] = 0
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """Copia o frame para o próximo slot e publica a nova sequência"""
+        seq = self.sequence + 1
+        slot = seq % self.slots
+
+        # Slot marcado como inválido durante a cópia (leitores descartam)
+        self.slot_seq[slot] = 0
+        self.frames[slot][...] = frame
+        self.slot_ts[slot] = timestamp if timestamp is not None else time.time()
+        self.slot_seq[slot] = seq
+        self.header[5] = seq
+        return seq
+
+    def close(self, unlink: bool = True):
+        super().close()
+        if unlink:
+            self.shm.unlink()
+
+
+class FrameRingReader(_FrameRing):
+    def __init__(self, name: str):
+        """Conecta a um buffer criado por FrameRingWriter em outro processo"""
+        shm = _attach(name)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf, offset=0)
+        if int(header[0]) != RING_MAGIC:
+            shm.close()
+            raise ValueError(f"Memória compartilhada '{name}' não é um frame ring")
+        slots = int(header[1])
+        shape = (int(header[2]), int(header[3]), int(header[4]))
+        del header
+        self._bind(shm, slots, shape)
+
+    def latest(self) -> Tuple[int, float, Optional[np.ndarray]]:
+        """Retorna (sequência, timestamp, view somente leitura) do frame mais recente
+
+        A view aponta para o slot compartilhado: use-a antes que o writer dê a volta
+        no anel (slots - 1 frames) ou confira com is_current(seq) depois de usá-la.
+        """
+        seq = self.sequence
+        if seq == 0:
+            return 0, 0.0, None
+        slot = seq % self.slots
+        if int(self.slot_seq[slot]) != seq:
+            # Writer já está sobrescrevendo este slot; usar o anterior
+            seq -= 1
+            slot = seq % self.slots
+            if seq == 0 or int(self.slot_seq[slot]) != seq:
+                return 0, 0.0, None
+        view = self.frames[slot]
+        view.flags.writeable = False
+        return seq, float(self.slot_ts[slot]), view
+
+    def is_current(self, seq: int) -> bool:
+        """True se o slot do frame seq ainda não foi sobrescrito"""
+        return int(self.slot_seq[seq % self.slots]) == seq
+
+    def wait_next(self, last_seq: int, timeout: float = 1.0,
+                  poll_interval: float = 0.001) -> Tuple[int, float, Optional[np.ndarray]]:
+        """Aguarda um frame mais novo que last_seq (ou timeout) e o retorna"""
+        deadline = time.perf_counter() + timeout
+        while self.sequence <= last_seq:
+            if time.perf_counter() > deadline:
+                return 0, 0.0, None
+            time.sleep(poll_interval)
+        return self.latest()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Conecta sem registrar no resource_tracker (senão o consumidor apagaria o buffer ao sair)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+class RingCapture:
+    """Adaptador com a interface de cv2.VideoCapture lendo de um FrameRingReader"""
+
+    def __init__(self, name: str, timeout: float = 2.0, copy: bool = False):
+        self.timeout = timeout
+        self.copy = copy
+        self.last_seq = 0
+        try:
+            self.reader = FrameRingReader(name)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Erro: frame ring '{name}' indisponível ({e})")
+            self.reader = None
+
+    def isOpened(self) -> bool:
+        return self.reader is not None
+
+    def read(self):
+        """Bloqueia até o próximo frame; devolve (ok, frame) como cv2.VideoCapture"""
+        if self.reader is None:
+            return False, None
+        seq, _, frame = self.reader.wait_next(self.last_seq, self.timeout)
+        if frame is None:
+            return False, None
+        self.last_seq = seq
+        return True, frame.copy() if self.copy else frame
+
+    def release(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+
+def open_capture(source: Union[int, str]):
+    """Abre uma câmera (índice), um frame ring ("shm:NOME") ou um arquivo de vídeo"""
+    if isinstance(source, str) and source.startswith("shm:"):
+        return RingCapture(source[4:])
+    if isinstance(source, str) and not source.isdigit():
+        return VideoFrameSource(source)
+    return cv2.VideoCapture(int(source))
+
+
+def run_capture_daemon(camera_device: int = 0, name: str = "face_camera", slots: int = 4):
+    """Abre a câmera uma vez e publica os frames no anel até Ctrl+C"""
+    cap = cv2.VideoCapture(camera_device)
+    if not cap.isOpened():
+        print("Erro: Não foi possível abrir a webcam")
+        return
+
+    ret, frame = cap.read()
+    if not ret:
+        print("Erro: Nenhum frame capturado")
+        cap.release()
+        return
+
+    writer = FrameRingWriter(name, frame.shape, slots)
+    print(f"📷 Frame ring '{name}' ativo: {frame.shape[1]}x{frame.shape[0]}, {slots} slots")
+    print(f"   Consumidores: use a fonte 'shm:{name}'")
+
+    count = 0
+    start_time = time.time()
+    try:
+        while ret:
+            writer.write(frame)
+            count += 1
+            if count % 300 == 0:
+                print(f"   {count} frames ({count / (time.time() - start_time):.1f} FPS)")
+            ret, frame = cap.read()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        writer.close()
+        print("Captura encerrada")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon de captura com buffer de frames compartilhado")
+    parser.add_argument("--camera", type=int, default=0, help="Número da câmera")
+    parser.add_argument("--name", default="face_camera", help="Nome da memória compartilhada")
+    parser.add_argument("--slots", type=int, default=4, help="Número de slots do anel")
+
+    args = parser.parse_args()
+    run_capture_daemon(args.camera, args.name, args.slots)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,13 @@ Gerador de dados faciais para o bot usando MediaPipe
 import cv2
 import json
 import mediapipe as mp
-import numpy as np
+
+try:
+    from face_regions import TRACKER_REGIONS, mediapipe_points
+    from landmark_codec import normalize_to_bbox
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.face_regions import TRACKER_REGIONS, mediapipe_points
+    from python.landmark_codec import normalize_to_bbox
 
 def analyze_face_for_bot(image_path):
     """Analisa a face da imagem e gera dados para o bot"""
@@ -46,38 +52,26 @@ def analyze_face_for_bot(image_path):
         
         # Extrair pontos importantes
         h, w, _ = image.shape
-        landmarks_2d = []
-        
-        for landmark in face_landmarks.landmark:
-            x = int(landmark.x * w)
-            y = int(landmark.y * h)
-            landmarks_2d.append([x, y])
+        points = mediapipe_points(face_landmarks, w, h)
+        landmarks_2d = points.tolist()
         
-        # Normalizar landmarks para 0-1
-        landmarks_array = np.array(landmarks_2d)
-        min_x, min_y = np.min(landmarks_array, axis=0)
-        max_x, max_y = np.max(landmarks_array, axis=0)
+        min_x, min_y = points.min(axis=0)
+        max_x, max_y = points.max(axis=0)
         
-        landmarks_normalized = []
-        for point in landmarks_2d:
-            norm_x = (point[0] - min_x) / (max_x - min_x) if max_x != min_x else 0.5
-            norm_y = (point[1] - min_y) / (max_y - min_y) if max_y != min_y else 0.5
-            landmarks_normalized.append([norm_x, norm_y])
+        # Normalizar landmarks para 0-1 (relativos à bbox da face)
+        landmarks_normalized = normalize_to_bbox(points).tolist()
         
         # Analisar características específicas
-        # Olhos (aproximação baseada em landmarks)
-        left_eye_landmarks = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
-        right_eye_landmarks = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
+        regions = TRACKER_REGIONS.extract(points)
         
-        # Calcular abertura dos olhos
-        left_eye_points = [landmarks_2d[i] for i in left_eye_landmarks if i < len(landmarks_2d)]
-        right_eye_points = [landmarks_2d[i] for i in right_eye_landmarks if i < len(landmarks_2d)]
+        # Olhos (aproximação baseada em landmarks)
+        left_eye_points = regions["left_eye"].tolist()
+        right_eye_points = regions["right_eye"].tolist()
         
         eye_openness = 0.6  # Valor padrão
         
         # Boca
-        mouth_landmarks = [61, 146, 91, 181, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318]
-        mouth_points = [landmarks_2d[i] for i in mouth_landmarks if i < len(landmarks_2d)]
+        mouth_points = regions["lips"].tolist()
         
         mouth_openness = 0.3  # Valor padrão
         
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Landmark Archive - Arquivo append-only de landmarks para gravações longas
+Cabeçalho fixo + registros de passo fixo (timestamp, nº de faces, landmarks float32
+(faces, 478, 3)). Os leitores abrem o arquivo com np.memmap e acessam qualquer
+intervalo de frames sem carregar o arquivo inteiro
+"""
+
+import numpy as np
+import json
+import os
+import struct
+import time
+import argparse
+from typing import Dict, Optional
+
+try:
+    from face_regions import LEFT_EYE_EAR, RIGHT_EYE_EAR, MOUTH_MAR
+    from emotion_classifier import SIMPLE_EMOTION_MODEL, simple_feature_matrix
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.face_regions import LEFT_EYE_EAR, RIGHT_EYE_EAR, MOUTH_MAR
+    from python.emotion_classifier import SIMPLE_EMOTION_MODEL, simple_feature_matrix
+
+ARCHIVE_MAGIC = b"LMKA"
+ARCHIVE_VERSION = 1
+
+# magic, versão, max_faces, pontos, dimensões, largura, altura, criado em, tamanho do cabeçalho, tamanho do JSON
+HEADER_STRUCT = struct.Struct("<4sHHHHIIdII")
+HEADER_ALIGN = 64
+
+
+def record_dtype(max_faces: int, points: int = 478, dims: int = 3) -> np.dtype:
+    """Layout de um registro (um frame)"""
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("faces", "<i4"),
+        ("_pad", "<i4"),
+        ("landmarks", "<f4", (max_faces, points, dims))
+    ])
+
+
+class LandmarkArchiveWriter:
+    def __init__(self, path: str, max_faces: int = 1, points: int = 478, dims: int = 3,
+                 width: int = 0, height: int = 0, metadata: Optional[Dict] = None,
+                 flush_every: int = 30):
+        """Cria o arquivo e grava o cabeçalho
+
+        Landmarks são gravados normalizados (como o MediaPipe os entrega); width/height
+        permitem aos leitores converter para pixels.
+        """
+        self.path = path
+        self.max_faces = max_faces
+        self.points = points
+        self.dims = dims
+        self.width = width
+        self.height = height
+        self.dtype = record_dtype(max_faces, points, dims)
+        self.flush_every = flush_every
+        self.count = 0
+
+        meta = json.dumps(metadata or {}, ensure_ascii=False).encode("utf-8")
+        header_size = HEADER_STRUCT.size + len(meta)
+        header_size = (header_size + HEADER_ALIGN - 1) // HEADER_ALIGN * HEADER_ALIGN
+
+        self._header = [ARCHIVE_MAGIC, ARCHIVE_VERSION, max_faces, points, dims,
+                        width, height, time.time(), header_size, len(meta)]
+        self._file = open(path, "wb")
+        self._file.write(HEADER_STRUCT.pack(*self._header))
+        self._file.write(meta)
+        self._file.write(b"\0" * (header_size - HEADER_STRUCT.size - len(meta)))
+        self._record = np.zeros(1, dtype=self.dtype)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def set_frame_size(self, width: int, height: int):
+        """Registra a resolução no cabeçalho (útil quando só é conhecida no primeiro frame)"""
+        self.width, self.height = width, height
+        self._header[5:7] = [width, height]
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(HEADER_STRUCT.pack(*self._header))
+        self._file.seek(position)
+
+    def append(self, landmarks: Optional[np.ndarray], timestamp: Optional[float] = None) -> int:
+        """Acrescenta um frame; landmarks com shape (faces, pontos, dims) ou None se não houver face"""
+        record = self._record
+        record["timestamp"] = timestamp if timestamp is not None else time.time()
+        record["landmarks"] = np.nan
+
+        faces = 0
+        if landmarks is not None and len(landmarks):
+            landmarks = np.asarray(landmarks, dtype=np.float32)
+            faces = min(len(landmarks), self.max_faces)
+            points = min(landmarks.shape[1], self.points)
+            dims = min(landmarks.shape[2], self.dims)
+            record["landmarks"][0, :faces, :points, :dims] = landmarks[:faces, :points, :dims]
+        record["faces"] = faces
+
+        self._file.write(record.tobytes())
+        self.count += 1
+        if self.flush_every and self.count % self.flush_every == 0:
+            self._file.flush()
+        return self.count - 1
+
+    def extend(self, records: np.ndarray) -> int:
+        """Acrescenta registros já no layout do arquivo (ex: concatenar arquivos de segmentos)"""
+        records = np.ascontiguousarray(records, dtype=self.dtype)
+        self._file.write(records.tobytes())
+        self.count += len(records)
+        return self.count
+
+    def append_mediapipe(self, multi_face_landmarks, timestamp: Optional[float] = None) -> int:
+        """Acrescenta o resultado de FaceMesh.process (multi_face_landmarks, pode ser None)"""
+        if not multi_face_landmarks:
+            return self.append(None, timestamp)
+        faces = np.array([[(lm.x, lm.y, lm.z) for lm in face.landmark]
+                          for face in multi_face_landmarks[:self.max_faces]], dtype=np.float32)
+        return self.append(faces, timestamp)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class LandmarkArchive:
+    def __init__(self, path: str):
+        """Abre um arquivo para leitura via np.memmap (somente o cabeçalho é lido agora)"""
+        self.path = path
+        with open(path, "rb") as f:
+            raw = f.read(HEADER_STRUCT.size)
+            (magic, version, self.max_faces, self.points, self.dims, self.width, self.height,
+             self.created, self.header_size, meta_len) = HEADER_STRUCT.unpack(raw)
+            if magic != ARCHIVE_MAGIC:
+                raise ValueError(f"Arquivo não é um landmark archive: {path}")
+            if version > ARCHIVE_VERSION:
+                raise ValueError(f"Versão de arquivo não suportada: {version}")
+            self.metadata = json.loads(f.read(meta_len).decode("utf-8") or "{}")
+
+        self.dtype = record_dtype(self.max_faces, self.points, self.dims)
+        self._records = None
+        self.refresh()
+
+    def refresh(self):
+        """Remapeia o arquivo para enxergar frames acrescentados depois da abertura"""
+        # Registros incompletos no final (gravação em andamento) são ignorados
+        count = (os.path.getsize(self.path) - self.header_size) // self.dtype.itemsize
+        if count <= 0:
+            self._records = np.zeros(0, dtype=self.dtype)
+        else:
+            self._records = np.memmap(self.path, dtype=self.dtype, mode="r",
+                                      offset=self.header_size, shape=(count,))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Coluna de timestamps (T,) — view sobre o arquivo"""
+        return self._records["timestamp"]
+
+    @property
+    def records(self) -> np.ndarray:
+        """Registros completos (T,) no layout de record_dtype — view sobre o arquivo"""
+        return self._records
+
+    @property
+    def face_counts(self) -> np.ndarray:
+        return self._records["faces"]
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """Landmarks normalizados (T, faces, pontos, dims) — view sobre o arquivo"""
+        return self._records["landmarks"]
+
+    def frames(self, start: int, stop: int) -> np.ndarray:
+        """Landmarks do intervalo [start, stop) sem carregar o resto do arquivo"""
+        return self._records["landmarks"][start:stop]
+
+    def frame_range(self, t_start: float, t_end: float) -> slice:
+        """Intervalo de frames cujo timestamp está em [t_start, t_end)"""
+        timestamps = self.timestamps
+        return slice(int(np.searchsorted(timestamps, t_start, "left")),
+                     int(np.searchsorted(timestamps, t_end, "left")))
+
+    def pixel_landmarks(self, start: int, stop: int, face: int = 0) -> np.ndarray:
+        """Landmarks (T, pontos, 2) em pixels para o intervalo dado"""
+        scale = np.array([self.width or 1, self.height or 1], dtype=np.float32)
+        return self._records["landmarks"][start:stop, face, :, :2] * scale
+
+    def close(self):
+        self._records = None
+
+
+def feature_series(points: np.ndarray) -> Dict[str, np.ndarray]:
+    """Métricas de olhos e boca de analyze_facial_features, vetorizadas sobre (T, 478, 2)"""
+    def dist(a, b):
+        return np.linalg.norm(points[:, a] - points[:, b], axis=-1)
+
+    def ratio(num, den):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(den > 0, num / den, 0.0)
+
+    left_ear = ratio(dist(LEFT_EYE_EAR[1], LEFT_EYE_EAR[5]), dist(LEFT_EYE_EAR[0], LEFT_EYE_EAR[3]))
+    right_ear = ratio(dist(RIGHT_EYE_EAR[1], RIGHT_EYE_EAR[5]), dist(RIGHT_EYE_EAR[0], RIGHT_EYE_EAR[3]))
+    mouth_width = dist(MOUTH_MAR[0], MOUTH_MAR[6])
+    mouth_height = dist(MOUTH_MAR[3], MOUTH_MAR[9])
+    mouth_ratio = ratio(mouth_height, mouth_width)
+    average = (left_ear + right_ear) / 2
+
+    return {
+        "left_openness": left_ear,
+        "right_openness": right_ear,
+        "average_openness": average,
+        "is_blinking": average < 0.2,
+        "mouth_width": mouth_width,
+        "mouth_height": mouth_height,
+        "mouth_aspect_ratio": mouth_ratio,
+        "mouth_is_open": mouth_ratio > 0.1
+    }
+
+
+def summarize_archive(archive: LandmarkArchive, chunk: int = 4096, face: int = 0) -> Dict:
+    """Percorre o arquivo em blocos calculando estatísticas das métricas faciais"""
+    total = len(archive)
+    with_face = 0
+    blinks = 0
+    sums = {"average_openness": 0.0, "mouth_aspect_ratio": 0.0}
+    emotion_counts = np.zeros(len(SIMPLE_EMOTION_MODEL.emotions), dtype=np.int64)
+
+    for start in range(0, total, chunk):
+        stop = min(total, start + chunk)
+        present = archive.face_counts[start:stop] > face
+        if not present.any():
+            continue
+        points = archive.pixel_landmarks(start, stop, face)[present]
+        series = feature_series(points)
+        _, dominant = SIMPLE_EMOTION_MODEL.classify(simple_feature_matrix(points))
+        emotion_counts += np.bincount(dominant, minlength=len(emotion_counts))
+        with_face += int(present.sum())
+        blinks += int(series["is_blinking"].sum())
+        for key in sums:
+            sums[key] += float(series[key].sum())
+
+    duration = float(archive.timestamps[-1] - archive.timestamps[0]) if total > 1 else 0.0
+    return {
+        "frames": total,
+        "frames_with_face": with_face,
+        "duration_seconds": duration,
+        "blinking_frames": blinks,
+        "mean_eye_openness": sums["average_openness"] / with_face if with_face else 0.0,
+        "mean_mouth_aspect_ratio": sums["mouth_aspect_ratio"] / with_face if with_face else 0.0,
+        "emotion_frames": {e: int(n) for e, n in zip(SIMPLE_EMOTION_MODEL.emotions, emotion_counts)}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspeciona um landmark archive")
+    parser.add_argument("archive", help="Caminho do arquivo .lmka")
+    parser.add_argument("--chunk", type=int, default=4096, help="Frames por bloco ao calcular métricas")
+
+    args = parser.parse_args()
+
+    archive = LandmarkArchive(args.archive)
+    print(f"📼 {args.archive}: {len(archive)} frames, até {archive.max_faces} face(s), "
+          f"{archive.points} pontos, {archive.width}x{archive.height}")
+    if archive.metadata:
+        print(f"   Metadados: {archive.metadata}")
+
+    summary = summarize_archive(archive, args.chunk)
+    print("\n📊 RESUMO:")
+    for key, value in summary.items():
+        print(f"• {key}: {value:.3f}" if isinstance(value, float) else f"• {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
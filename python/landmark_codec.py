@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Landmark Codec - Compressão de landmarks para transporte em rede
+Os pontos são quantizados como int16 relativos ao canto da bbox da face, com
+uma escala por keyframe; frames seguintes enviam apenas o resíduo em relação
+ao frame anterior (int8 quando cabe), opcionalmente comprimido com zlib
+
+Layout de um frame (little-endian), para decodificadores em outras linguagens:
+    uint8   versão (1)
+    uint8   flags: 1 = keyframe, 2 = resíduos int8, 4 = payload zlib, 8 = pontos com z
+    uint16  número de pontos N
+    float32 origem x, origem y (canto superior esquerdo da bbox no keyframe)
+    float32 escala (unidades de coordenada por passo de quantização)
+    payload N*D valores intercalados (x0, y0[, z0], x1, ...):
+        keyframe: int16 q, com coordenada = origem + q * escala (z não tem origem)
+        delta:    resíduo int8/int16 somado ao q do frame anterior
+Frames delta reutilizam origem e escala do último keyframe (campos repetidos no cabeçalho)
+"""
+
+import numpy as np
+import struct
+import zlib
+import json
+import time
+import argparse
+from typing import Dict, Optional
+
+CODEC_VERSION = 1
+HEADER = struct.Struct("<BBHfff")
+
+FLAG_KEYFRAME = 1
+FLAG_INT8 = 2
+FLAG_DEFLATE = 4
+FLAG_Z = 8
+
+INT16_MAX = 32767
+
+
+def normalize_to_bbox(points: np.ndarray) -> np.ndarray:
+    """Coordenadas 0-1 relativas à bbox dos pontos (0.5 em eixos sem extensão)"""
+    points = np.asarray(points)
+    low = points.min(axis=0)
+    extent = points.max(axis=0) - low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(extent != 0, (points - low) / extent, 0.5)
+
+
+class LandmarkEncoder:
+    def __init__(self, step: float = 0.25, keyframe_interval: int = 30, compress: bool = True):
+        """step: resolução desejada em unidades das coordenadas (ex: 0.25 px)
+
+        A escala real de um keyframe é aumentada se a bbox não couber em int16.
+        """
+        self.step = step
+        self.keyframe_interval = keyframe_interval
+        self.compress = compress
+        self._origin: Optional[np.ndarray] = None
+        self._scale = 1.0
+        self._previous: Optional[np.ndarray] = None
+        self._since_keyframe = 0
+
+    def reset(self):
+        """Força um keyframe no próximo frame (ex: novo cliente ou perda de pacote)"""
+        self._previous = None
+
+    def _keyframe_grid(self, points: np.ndarray):
+        self._origin = points[:, :2].min(axis=0)
+        extent = max(float(np.abs(points[:, :2] - self._origin).max()),
+                     float(np.abs(points[:, 2:]).max()) if points.shape[1] > 2 else 0.0)
+        self._scale = max(self.step, extent / INT16_MAX)
+
+    def _quantize(self, points: np.ndarray) -> np.ndarray:
+        q = points.copy()
+        q[:, :2] -= self._origin
+        return np.rint(q / self._scale)
+
+    def encode(self, points: np.ndarray) -> bytes:
+        """Codifica um frame (N, 2) ou (N, 3)"""
+        points = np.asarray(points, dtype=np.float64)
+        count, dims = points.shape
+
+        keyframe = (self._previous is None or len(self._previous) != count
+                    or (self.keyframe_interval and self._since_keyframe >= self.keyframe_interval))
+        if not keyframe:
+            q = self._quantize(points)
+            # Face saiu da grade do keyframe: recomeçar com nova bbox
+            keyframe = np.abs(q).max() > INT16_MAX
+        if keyframe:
+            self._keyframe_grid(points)
+            q = self._quantize(points)
+            self._since_keyframe = 0
+
+        q = q.astype(np.int16)
+        flags = FLAG_Z if dims > 2 else 0
+        if keyframe:
+            flags |= FLAG_KEYFRAME
+            payload = q
+        else:
+            residual = q.astype(np.int32) - self._previous
+            if np.abs(residual).max() <= 127:
+                flags |= FLAG_INT8
+                payload = residual.astype(np.int8)
+            else:
+                payload = residual.astype(np.int16)
+        self._previous = q.astype(np.int32)
+        self._since_keyframe += 1
+
+        body = payload.astype(payload.dtype.newbyteorder("<")).tobytes()
+        if self.compress:
+            packed = zlib.compress(body, 6)
+            if len(packed) < len(body):
+                flags |= FLAG_DEFLATE
+                body = packed
+        return HEADER.pack(CODEC_VERSION, flags, count, self._origin[0], self._origin[1], self._scale) + body
+
+
+class LandmarkDecoder:
+    def __init__(self):
+        """Mantém o último frame quantizado para aplicar os resíduos"""
+        self._previous: Optional[np.ndarray] = None
+
+    def decode(self, data: bytes) -> Optional[np.ndarray]:
+        """Retorna os pontos (N, D) float32; None para delta recebido antes de um keyframe"""
+        version, flags, count, origin_x, origin_y, scale = HEADER.unpack_from(data, 0)
+        if version != CODEC_VERSION:
+            raise ValueError(f"Versão de codec não suportada: {version}")
+        dims = 3 if flags & FLAG_Z else 2
+
+        body = data[HEADER.size:]
+        if flags & FLAG_DEFLATE:
+            body = zlib.decompress(body)
+
+        if flags & FLAG_KEYFRAME:
+            q = np.frombuffer(body, dtype="<i2").astype(np.int32)
+        else:
+            if self._previous is None or self._previous.size != count * dims:
+                return None
+            residual = np.frombuffer(body, dtype="<i1" if flags & FLAG_INT8 else "<i2")
+            q = self._previous + residual
+        self._previous = q
+
+        points = q.reshape(count, dims).astype(np.float32) * np.float32(scale)
+        points[:, 0] += origin_x
+        points[:, 1] += origin_y
+        return points
+
+
+def encode_landmarks(points: np.ndarray, step: float = 0.25) -> bytes:
+    """Codifica um único frame (keyframe) — ex: landmarks de uma imagem estática"""
+    return LandmarkEncoder(step, keyframe_interval=0).encode(points)
+
+
+def decode_landmarks(data: bytes) -> np.ndarray:
+    return LandmarkDecoder().decode(data)
+
+
+def benchmark_archive(path: str, step: float = 0.25, keyframe_interval: int = 30, face: int = 0) -> Dict:
+    """Compara o tamanho dos landmarks de um landmark archive em JSON e no codec"""
+    try:
+        from landmark_archive import LandmarkArchive
+    except ImportError:  # importado como pacote a partir da raiz do projeto
+        from python.landmark_archive import LandmarkArchive
+
+    archive = LandmarkArchive(path)
+    encoder = LandmarkEncoder(step, keyframe_interval)
+    decoder = LandmarkDecoder()
+    json_bytes = codec_bytes = frames = 0
+    max_error = 0.0
+    start_time = time.perf_counter()
+
+    for t in np.flatnonzero(archive.face_counts[:] > face):
+        points = archive.pixel_landmarks(t, t + 1, face)[0]
+        json_bytes += len(json.dumps(np.rint(points).astype(int).tolist(), separators=(",", ":")))
+        message = encoder.encode(points)
+        codec_bytes += len(message)
+        max_error = max(max_error, float(np.abs(decoder.decode(message) - points).max()))
+        frames += 1
+
+    return {
+        "frames": frames,
+        "json_bytes_per_frame": json_bytes / frames if frames else 0.0,
+        "codec_bytes_per_frame": codec_bytes / frames if frames else 0.0,
+        "reduction": json_bytes / codec_bytes if codec_bytes else 0.0,
+        "max_error": max_error,
+        "seconds": time.perf_counter() - start_time
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a compressão do codec de landmarks sobre um landmark archive")
+    parser.add_argument("archive", help="Arquivo .lmka gravado com --record")
+    parser.add_argument("--step", type=float, default=0.25, help="Resolução de quantização (pixels)")
+    parser.add_argument("--keyframe", type=int, default=30, help="Intervalo entre keyframes (frames)")
+
+    args = parser.parse_args()
+
+    stats = benchmark_archive(args.archive, args.step, args.keyframe)
+    print("\n📦 CODEC DE LANDMARKS:")
+    for key, value in stats.items():
+        print(f"• {key}: {value:.3f}" if isinstance(value, float) else f"• {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
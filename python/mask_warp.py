@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Mask Warp - Máscara deformada por triângulos seguindo os landmarks do FaceMesh
+A imagem da máscara é triangulada uma única vez (Delaunay sobre os seus próprios
+landmarks); para cada triângulo ficam em cache o retângulo de origem, o recorte
+da máscara e a inversa da matriz dos vértices. Por frame resta só calcular as
+afins de destino (um produto de matrizes em lote) e aplicar warpAffine em cada
+retângulo de destino, acumulando em um canvas limitado à caixa do rosto
+"""
+
+import argparse
+import time
+import cv2
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+try:
+    from face_regions import (FACE_OVAL, LEFT_EYE, RIGHT_EYE, LIPS_OUTER, LIPS_INNER, NOSE,
+                              LEFT_EYEBROW, RIGHT_EYEBROW, HIGHLIGHT_POINTS, mediapipe_points)
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.face_regions import (FACE_OVAL, LEFT_EYE, RIGHT_EYE, LIPS_OUTER, LIPS_INNER, NOSE,
+                                     LEFT_EYEBROW, RIGHT_EYEBROW, HIGHLIGHT_POINTS, mediapipe_points)
+
+# Pontos da malha usados nos vértices: contornos das regiões (141 pontos, ~244 triângulos)
+WARP_POINTS = tuple(sorted(set(FACE_OVAL + LEFT_EYE + RIGHT_EYE + LIPS_OUTER + LIPS_INNER + NOSE
+                               + LEFT_EYEBROW + RIGHT_EYEBROW + HIGHLIGHT_POINTS)))
+
+FRAME_BUDGET_MS = 1000.0 / 30.0
+
+
+def delaunay(points: np.ndarray) -> np.ndarray:
+    """Triângulos (T, 3) de índices em `points` pela triangulação de Delaunay"""
+    x0, y0 = np.floor(points.min(axis=0)) - 1
+    x1, y1 = np.ceil(points.max(axis=0)) + 1
+    subdiv = cv2.Subdiv2D((int(x0), int(y0), int(x1 - x0) + 1, int(y1 - y0) + 1))
+    lookup = {}
+    for i, (x, y) in enumerate(points):
+        lookup[(float(x), float(y))] = i
+        subdiv.insert((float(x), float(y)))
+
+    triangles = []
+    for t in subdiv.getTriangleList():
+        vertices = [lookup.get((float(t[k]), float(t[k + 1]))) for k in (0, 2, 4)]
+        if None not in vertices:  # triângulos ligados aos vértices externos do Subdiv2D
+            triangles.append(vertices)
+    return np.array(triangles, dtype=np.intp)
+
+
+def mask_landmarks(mask: np.ndarray, face_mesh=None) -> np.ndarray:
+    """Landmarks em pixels da própria imagem da máscara (uma execução do FaceMesh)"""
+    import mediapipe as mp
+    owned = face_mesh is None
+    if owned:
+        face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1,
+                                                    refine_landmarks=True, min_detection_confidence=0.5)
+    try:
+        results = face_mesh.process(cv2.cvtColor(mask[:, :, :3], cv2.COLOR_BGR2RGB))
+    finally:
+        if owned:
+            face_mesh.close()
+    if not results.multi_face_landmarks:
+        raise ValueError("Nenhuma face encontrada na imagem da máscara")
+    return mediapipe_points(results.multi_face_landmarks[0], mask.shape[1], mask.shape[0]).astype(np.float32)
+
+
+class MaskWarper:
+    def __init__(self, mask: np.ndarray, landmarks: Optional[np.ndarray] = None,
+                 points: Sequence[int] = WARP_POINTS, face_mesh=None):
+        """Prepara a triangulação e o cache por triângulo a partir da imagem da máscara
+
+        mask: BGR ou BGRA (o alfa define a transparência). landmarks: (478, 2) em pixels
+        da máscara; se omitidos, são detectados com o FaceMesh.
+        """
+        if mask.ndim == 2:
+            mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGRA)
+        elif mask.shape[2] == 3:
+            mask = cv2.cvtColor(mask, cv2.COLOR_BGR2BGRA)
+        if landmarks is None:
+            landmarks = mask_landmarks(mask, face_mesh)
+
+        self.points = np.asarray(points, dtype=np.intp)
+        source = np.asarray(landmarks, dtype=np.float32)[self.points]
+        self.triangles = delaunay(source)
+        self.vertex_index = self.points[self.triangles]  # (T, 3) índices na malha completa
+
+        # Cache por triângulo: retângulo de origem, recorte pré-multiplicado e inversa dos vértices
+        src = source[self.triangles]  # (T, 3, 2)
+        lo = np.floor(src.min(axis=1)).astype(np.int32)
+        hi = np.ceil(src.max(axis=1)).astype(np.int32) + 1
+        lo = np.maximum(lo, 0)
+        hi = np.minimum(hi, [mask.shape[1], mask.shape[0]])
+        local = src - lo[:, None, :]
+        homogeneous = np.concatenate([local.transpose(0, 2, 1), np.ones((len(src), 1, 3), np.float32)], axis=1)
+        self.source_inverse = np.linalg.inv(homogeneous.astype(np.float64))  # (T, 3, 3)
+
+        alpha = mask[:, :, 3:4].astype(np.float32) / 255.0
+        premultiplied = np.concatenate([mask[:, :, :3] * alpha, alpha * 255.0], axis=2)
+        premultiplied = np.rint(premultiplied).astype(np.uint8)
+        self.patches = [np.ascontiguousarray(premultiplied[y0:y1, x0:x1])
+                        for (x0, y0), (x1, y1) in zip(lo, hi)]
+
+    def __len__(self) -> int:
+        return len(self.triangles)
+
+    def warp(self, landmarks: np.ndarray, frame_size) -> Optional[Dict]:
+        """Máscara deformada para os landmarks (478, 2) em pixels do frame
+
+        Retorna {"box": (x0, y0, x1, y1), "color": BGR pré-multiplicado, "alpha": 0-255},
+        tudo limitado à caixa do rosto, ou None se o rosto está fora do frame.
+        """
+        width, height = frame_size
+        dst = np.asarray(landmarks, dtype=np.float32)[self.vertex_index]  # (T, 3, 2)
+        box_lo = np.maximum(np.floor(dst.reshape(-1, 2).min(axis=0)).astype(np.int32), 0)
+        box_hi = np.minimum(np.ceil(dst.reshape(-1, 2).max(axis=0)).astype(np.int32) + 1, [width, height])
+        if np.any(box_hi <= box_lo):
+            return None
+
+        canvas = np.zeros((box_hi[1] - box_lo[1], box_hi[0] - box_lo[0], 4), dtype=np.uint8)
+        dst = dst - box_lo
+        lo = np.maximum(np.floor(dst.min(axis=1)).astype(np.int32), 0)
+        hi = np.minimum(np.ceil(dst.max(axis=1)).astype(np.int32) + 1, [canvas.shape[1], canvas.shape[0]])
+        local = dst - lo[:, None, :]
+
+        # Afins de destino de todos os triângulos de uma vez: A = D · S⁻¹ (T, 2, 3)
+        affines = local.transpose(0, 2, 1).astype(np.float64) @ self.source_inverse
+        corners = np.rint(local).astype(np.int32)
+        sizes = (hi - lo).tolist()
+
+        for t, (x0, y0), (w, h) in zip(range(len(sizes)), lo.tolist(), sizes):
+            if w <= 0 or h <= 0:
+                continue
+            warped = cv2.warpAffine(self.patches[t], affines[t], (w, h), flags=cv2.INTER_LINEAR,
+                                    borderMode=cv2.BORDER_REFLECT_101)
+            coverage = np.zeros((h, w), dtype=np.uint8)
+            cv2.fillConvexPoly(coverage, corners[t], 1)
+            cv2.copyTo(warped, coverage, canvas[y0:y0 + h, x0:x0 + w])
+
+        return {
+            "box": (int(box_lo[0]), int(box_lo[1]), int(box_hi[0]), int(box_hi[1])),
+            "color": canvas[:, :, :3],
+            "alpha": canvas[:, :, 3]
+        }
+
+    def apply(self, frame: np.ndarray, landmarks: np.ndarray, opacity: float = 0.7) -> np.ndarray:
+        """Compõe a máscara deformada sobre o frame BGR (no lugar)"""
+        result = self.warp(landmarks, (frame.shape[1], frame.shape[0]))
+        if result is None:
+            return frame
+        x0, y0, x1, y1 = result["box"]
+        roi = frame[y0:y1, x0:x1]
+        alpha = result["alpha"].astype(np.float32)[:, :, None] * np.float32(opacity / 255.0)
+        blended = roi * (1.0 - alpha) + result["color"] * np.float32(opacity)
+        np.clip(blended, 0, 255, out=blended)
+        roi[:] = blended
+        return frame
+
+
+def benchmark_frames(face: np.ndarray, frames: int, frame_size=(1280, 720), face_scale: float = 0.5,
+                     seed: int = 0):
+    """Frames sintéticos com o rosto de `face` girando/escalando no centro de um fundo liso"""
+    base = mask_landmarks(face)
+    width, height = frame_size
+    center = base[list(FACE_OVAL)].mean(axis=0)
+    span = np.ptp(base[list(FACE_OVAL)], axis=0).max()
+    # Rosto centralizado ocupando face_scale da altura do frame
+    fit = face_scale * height / span
+    rng = np.random.default_rng(seed)
+    for i in range(frames):
+        angle = np.radians(20.0 * np.sin(i / 15.0))
+        scale = fit * (1.0 + 0.2 * np.sin(i / 23.0))
+        linear = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]) * scale
+        shift = (width / 2, height / 2) - linear @ center + rng.normal(0, 1.0, 2)
+        yield cv2.warpAffine(face, np.hstack([linear, shift[:, None]]), (width, height),
+                             flags=cv2.INTER_LINEAR, borderValue=(90, 90, 90))
+
+
+def video_frames(path: str, frames: int):
+    """Até `frames` frames BGR de um vídeo"""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise FileNotFoundError(path)
+    try:
+        for _ in range(frames):
+            ok, frame = capture.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        capture.release()
+
+
+def benchmark(mask_path: str, face_path: Optional[str] = None, frames: int = 120,
+              frame_size=(1280, 720), face_scale: float = 0.5, seed: int = 0,
+              video_path: Optional[str] = None) -> Dict:
+    """Tempo por frame do modo warp do InteractiveFaceMask: FaceMesh em tracking + warp + composição
+
+    Os frames vêm de um vídeo ou são gerados com o rosto de `face_path` (padrão: a máscara)
+    girando e escalando; o orçamento de 30 FPS é comparado com o tempo total por frame.
+    """
+    import mediapipe as mp
+
+    mask = cv2.imread(mask_path, cv2.IMREAD_UNCHANGED)
+    if mask is None:
+        raise FileNotFoundError(mask_path)
+
+    start = time.perf_counter()
+    warper = MaskWarper(mask)
+    setup_ms = (time.perf_counter() - start) * 1000.0
+
+    if video_path:
+        source = video_frames(video_path, frames)
+    else:
+        face = cv2.imread(face_path or mask_path)
+        if face is None:
+            raise FileNotFoundError(face_path)
+        source = benchmark_frames(face, frames, frame_size, face_scale, seed)
+
+    # Mesma configuração do InteractiveFaceMask.enable_warp
+    face_mesh = mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=False, max_num_faces=4, refine_landmarks=True,
+        min_detection_confidence=0.5, min_tracking_confidence=0.5
+    )
+    mesh_times, warp_times = [], []
+    missed = 0
+    frame = None
+    try:
+        for frame in source:
+            t0 = time.perf_counter()
+            results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            t1 = time.perf_counter()
+            for face_landmarks in results.multi_face_landmarks or []:
+                points = mediapipe_points(face_landmarks, frame.shape[1], frame.shape[0])
+                warper.apply(frame, points)
+            t2 = time.perf_counter()
+            mesh_times.append((t1 - t0) * 1000.0)
+            warp_times.append((t2 - t1) * 1000.0)
+            missed += not results.multi_face_landmarks
+    finally:
+        face_mesh.close()
+    if frame is None:
+        raise ValueError(f"Nenhum frame lido de {video_path}")
+
+    mesh_times, warp_times = np.array(mesh_times), np.array(warp_times)
+    times = mesh_times + warp_times
+    return {
+        "triangles": len(warper),
+        "setup_ms": setup_ms,
+        "frames": len(times),
+        "frame_size": (frame.shape[1], frame.shape[0]),
+        "frames_without_face": missed,
+        "mesh_ms": float(mesh_times.mean()),
+        "warp_ms": float(warp_times.mean()),
+        "mean_ms": float(times.mean()),
+        "p95_ms": float(np.percentile(times, 95)),
+        "max_ms": float(times.max()),
+        "budget_ms": FRAME_BUDGET_MS,
+        "within_budget": bool(np.percentile(times, 95) <= FRAME_BUDGET_MS),
+        "preview": frame
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Máscara deformada por triângulos (benchmark do modo warp)")
+    parser.add_argument("mask", help="Imagem da máscara (BGR/BGRA com um rosto)")
+    parser.add_argument("--face", help="Imagem do rosto animado nos frames sintéticos (padrão: a máscara)")
+    parser.add_argument("--video", help="Medir sobre os frames de um vídeo em vez dos frames sintéticos")
+    parser.add_argument("--frames", type=int, default=120, help="Frames do benchmark")
+    parser.add_argument("--size", default="1280x720", help="Tamanho do frame sintético (LxA)")
+    parser.add_argument("--face-scale", type=float, default=0.5, help="Altura do rosto em fração do frame")
+    parser.add_argument("--preview", help="Salvar o último frame do benchmark")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    result = benchmark(args.mask, args.face, args.frames, size, args.face_scale, video_path=args.video)
+    width, height = result["frame_size"]
+    print(f"🔺 {result['triangles']} triângulos (preparação única: {result['setup_ms']:.1f} ms)")
+    print(f"⏱️ Por frame {width}x{height} (FaceMesh + warp): média {result['mean_ms']:.2f} ms "
+          f"(FaceMesh {result['mesh_ms']:.2f} + warp {result['warp_ms']:.2f}), p95 {result['p95_ms']:.2f} ms, "
+          f"máx {result['max_ms']:.2f} ms")
+    if result["frames_without_face"]:
+        print(f"⚠️ {result['frames_without_face']}/{result['frames']} frame(s) sem rosto (sem warp)")
+    status = "✅ dentro" if result["within_budget"] else "❌ fora"
+    print(f"{status} do orçamento de {result['budget_ms']:.1f} ms/frame (30 FPS)")
+    if args.preview:
+        cv2.imwrite(args.preview, result["preview"])
+        print(f"🖼️ Prévia salva em: {args.preview}")
+
+
+if __name__ == "__main__":
+    main()
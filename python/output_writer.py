@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Output Writer - Gravação assíncrona dos artefatos de análise
+Codifica imagens (PNG/WebP/JPEG) e JSON em um pool de threads com fila limitada,
+permitindo que a inferência da próxima imagem se sobreponha à codificação da anterior
+"""
+
+import cv2
+import numpy as np
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Dict, List, Optional
+
+# Formatos suportados: extensão do arquivo e parâmetros do cv2.imencode
+IMAGE_FORMATS = {
+    "png": ".png",
+    "webp": ".webp",
+    "jpg": ".jpg",
+    "jpeg": ".jpg"
+}
+
+# Configuração padrão por tipo de artefato (mantém a saída original em PNG)
+DEFAULT_ARTIFACT_FORMATS = {
+    "mask": {"format": "png", "png_compression": 3},
+    "artistic": {"format": "png", "png_compression": 3},
+    "debug": {"format": "png", "png_compression": 3, "scale": 1.0},
+    "image": {"format": "png", "png_compression": 3}
+}
+
+
+class OutputWriter:
+    def __init__(self, max_workers: int = 2, max_pending: int = 8,
+                 formats: Optional[Dict[str, Dict]] = None):
+        """Inicializa o pool de gravação
+
+        max_pending limita quantos artefatos podem aguardar codificação; quando a fila
+        está cheia, submit_* bloqueia o chamador até um worker liberar espaço.
+        """
+        self.formats = {k: dict(v) for k, v in DEFAULT_ARTIFACT_FORMATS.items()}
+        for artifact, spec in (formats or {}).items():
+            self.formats.setdefault(artifact, {}).update(spec)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="output-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending: List[Future] = []
+        self._written: List[str] = []
+        self._errors: List[str] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def extension_for(self, artifact: str) -> str:
+        """Retorna a extensão de arquivo configurada para o tipo de artefato"""
+        fmt = self.formats.get(artifact, self.formats["image"]).get("format", "png").lower()
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Formato de imagem não suportado: {fmt}")
+        return IMAGE_FORMATS[fmt]
+
+    def scale_for(self, artifact: str) -> float:
+        """Retorna o fator de escala configurado para o tipo de artefato"""
+        return float(self.formats.get(artifact, {}).get("scale", 1.0))
+
+    def _encode_params(self, artifact: str) -> List[int]:
+        spec = self.formats.get(artifact, self.formats["image"])
+        fmt = spec.get("format", "png").lower()
+
+        if fmt == "png":
+            return [cv2.IMWRITE_PNG_COMPRESSION, int(spec.get("png_compression", 3))]
+        if fmt == "webp":
+            return [cv2.IMWRITE_WEBP_QUALITY, int(spec.get("quality", 90))]
+        return [cv2.IMWRITE_JPEG_QUALITY, int(spec.get("quality", 90))]
+
+    def _submit(self, fn, *args) -> Future:
+        # Bloqueia quando a fila está cheia (backpressure para o produtor)
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._pending.append(future)
+        return future
+
+    def _write_image(self, path: str, image: np.ndarray, artifact: str, scale: float) -> str:
+        if scale != 1.0:
+            h, w = image.shape[:2]
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+        ok, encoded = cv2.imencode(os.path.splitext(path)[1], image, self._encode_params(artifact))
+        if not ok:
+            raise IOError(f"Falha ao codificar {path}")
+        with open(path, "wb") as f:
+            f.write(encoded.tobytes())
+        return path
+
+    def _write_json(self, path: str, data: Dict, indent: Optional[int]) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+        return path
+
+    def submit_image(self, base_path: str, image: np.ndarray, artifact: str = "image",
+                     scale: Optional[float] = None) -> str:
+        """Agenda a gravação de uma imagem
+
+        base_path não deve conter extensão; ela é escolhida pelo formato do artefato.
+        scale sobrepõe a escala configurada (use 1.0 para imagens já reduzidas).
+        A imagem passa a pertencer ao writer e não deve ser modificada depois.
+        Retorna o caminho final do arquivo.
+        """
+        path = base_path + self.extension_for(artifact)
+        if scale is None:
+            scale = self.scale_for(artifact)
+        self._submit(self._write_image, path, image, artifact, scale)
+        return path
+
+    def submit_json(self, path: str, data: Dict, indent: Optional[int] = 2) -> str:
+        """Agenda a gravação de um dicionário como JSON
+
+        O dicionário é serializado no worker; não o modifique antes do flush().
+        """
+        self._submit(self._write_json, path, data, indent)
+        return path
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda as gravações pendentes por até timeout segundos; retorna True se todas terminaram"""
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def flush(self) -> List[str]:
+        """Aguarda todas as gravações pendentes e retorna os arquivos gravados desde o último flush"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for future in pending:
+            try:
+                path = future.result()
+                self._written.append(path)
+            except Exception as e:
+                self._errors.append(str(e))
+                print(f"❌ Erro ao gravar artefato: {e}")
+
+        written, self._written = self._written, []
+        return written
+
+    @property
+    def pending_count(self) -> int:
+        """Número de gravações ainda não concluídas"""
+        with self._lock:
+            return sum(1 for f in self._pending if not f.done())
+
+    @property
+    def errors(self) -> List[str]:
+        """Erros acumulados durante as gravações"""
+        return list(self._errors)
+
+    def close(self):
+        """Aguarda as gravações pendentes e encerra o pool"""
+        self.flush()
+        self._executor.shutdown(wait=True)
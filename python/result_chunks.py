@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Result Chunks - Resultados por frame em blocos indexados para leitura por HTTP Range
+Um landmark archive (.lmka) é convertido em um contêiner .lmkc: um índice pequeno
+no início (intervalo de frames e de tempo -> offset/tamanho em bytes) seguido de
+blocos de tamanho fixo com `chunk_frames` frames cada. O visualizador lê só o
+índice e, depois, só os blocos dos frames que vai mostrar
+
+Layout (little-endian), para decodificadores em JavaScript:
+    prefixo  4s magic "LMKC", uint16 versão, uint16 reservado, uint32 tamanho do índice
+    índice   JSON UTF-8 (ver ChunkedResultWriter), completado com zeros até data_offset
+    blocos   chunk_bytes cada, em data_offset + i * chunk_bytes:
+        uint32  primeiro frame, uint32 frames válidos no bloco
+        float32 origem x, y, z; float32 escala x, y, z
+        float64 timestamp            x chunk_frames
+        uint8   faces por frame      x chunk_frames (completado até múltiplo de 8)
+        uint16  landmarks quantizados x chunk_frames x max_faces x pontos x dims,
+                com coordenada normalizada = origem + q * escala (por eixo)
+Frames sem face (ou faces ausentes) têm q = 0 e devem ser ignorados pelo contador de faces
+"""
+
+import argparse
+import json
+import struct
+import time
+import numpy as np
+from typing import Dict, List, Optional
+
+try:
+    from landmark_archive import LandmarkArchive
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.landmark_archive import LandmarkArchive
+
+CHUNK_MAGIC = b"LMKC"
+CHUNK_VERSION = 1
+
+PREFIX = struct.Struct("<4sHHI")
+CHUNK_HEADER = struct.Struct("<II3f3f")
+DATA_ALIGN = 64
+UINT16_MAX = 65535
+
+DEFAULT_CHUNK_FRAMES = 128
+
+
+def chunk_layout(chunk_frames: int, max_faces: int, points: int, dims: int) -> Dict[str, int]:
+    """Offsets das seções dentro de um bloco e o tamanho fixo do bloco"""
+    timestamps = CHUNK_HEADER.size
+    faces = timestamps + 8 * chunk_frames
+    landmarks = faces + (chunk_frames + 7) // 8 * 8
+    size = landmarks + 2 * chunk_frames * max_faces * points * dims
+    return {"timestamps": timestamps, "faces": faces, "landmarks": landmarks,
+            "chunk_bytes": (size + 7) // 8 * 8}
+
+
+def encode_chunk(first_frame: int, timestamps: np.ndarray, faces: np.ndarray,
+                 landmarks: np.ndarray, layout: Dict[str, int], chunk_frames: int) -> bytes:
+    """Um bloco de tamanho fixo; landmarks (n, max_faces, pontos, dims) normalizados, NaN = ausente"""
+    count = len(timestamps)
+    valid = np.isfinite(landmarks).all(axis=-1)
+    valid &= np.arange(landmarks.shape[1])[None, :, None] < faces[:, None, None]
+    present = landmarks[valid]  # (M, dims)
+
+    dims = landmarks.shape[-1]
+    origin = np.zeros(3, dtype=np.float32)
+    scale = np.ones(3, dtype=np.float32)
+    if len(present):
+        low = present.min(axis=0)
+        origin[:dims] = low
+        scale[:dims] = np.maximum((present.max(axis=0) - low) / UINT16_MAX, np.finfo(np.float32).tiny)
+
+    q = np.zeros((chunk_frames,) + landmarks.shape[1:], dtype="<u2")
+    quantized = np.rint((landmarks - origin[:dims]) / scale[:dims])
+    q[:count][valid] = np.clip(quantized[valid], 0, UINT16_MAX)
+
+    data = bytearray(layout["chunk_bytes"])
+    CHUNK_HEADER.pack_into(data, 0, first_frame, count, *origin, *scale)
+    stamps = np.zeros(chunk_frames, dtype="<f8")
+    stamps[:count] = timestamps
+    data[layout["timestamps"]:layout["faces"]] = stamps.tobytes()
+    data[layout["faces"]:layout["faces"] + count] = faces.astype(np.uint8).tobytes()
+    data[layout["landmarks"]:layout["landmarks"] + q.nbytes] = q.tobytes()
+    return bytes(data)
+
+
+def decode_chunk(data: bytes, layout: Dict[str, int], chunk_frames: int, max_faces: int,
+                 points: int, dims: int) -> Dict:
+    """Inverso de encode_chunk: timestamps, faces e landmarks float32 (NaN nas faces ausentes)"""
+    first_frame, count, *values = CHUNK_HEADER.unpack_from(data, 0)
+    origin = np.array(values[:3], dtype=np.float32)[:dims]
+    scale = np.array(values[3:], dtype=np.float32)[:dims]
+    timestamps = np.frombuffer(data, "<f8", count, layout["timestamps"])
+    faces = np.frombuffer(data, np.uint8, count, layout["faces"])
+    q = np.frombuffer(data, "<u2", count * max_faces * points * dims, layout["landmarks"])
+    landmarks = q.reshape(count, max_faces, points, dims) * scale + origin
+    landmarks[np.arange(max_faces)[None, :] >= faces[:, None]] = np.nan
+    return {"first_frame": first_frame, "timestamps": timestamps, "faces": faces,
+            "landmarks": landmarks.astype(np.float32)}
+
+
+class ChunkedResultWriter:
+    def __init__(self, path: str, frames: int, chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+                 max_faces: int = 1, points: int = 478, dims: int = 3, width: int = 0,
+                 height: int = 0, chunk_times: Optional[List] = None, metadata: Optional[Dict] = None):
+        """Grava prefixo e índice; os blocos vêm depois, em ordem, com write_chunk
+
+        Como os blocos têm tamanho fixo, todos os offsets são conhecidos antes do primeiro
+        bloco: o índice é gravado uma vez só e o arquivo é escrito em fluxo. O índice traz
+        frames, chunk_frames, chunk_bytes, data_offset, max_faces, points, dims, width,
+        height, layout (offsets das seções) e chunks: [primeiro frame, frames, offset,
+        bytes, t inicial, t final] por bloco (chunk_times dá os tempos de cada bloco).
+        """
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.max_faces, self.points, self.dims = max_faces, points, dims
+        self.layout = chunk_layout(chunk_frames, max_faces, points, dims)
+        count = (frames + chunk_frames - 1) // chunk_frames
+        chunk_times = chunk_times or [(0.0, 0.0)] * count
+
+        # data_offset depende do tamanho do índice, que contém os offsets: repete até caber
+        data_offset = 0
+        while True:
+            chunks = [[i * chunk_frames, min(chunk_frames, frames - i * chunk_frames),
+                       data_offset + i * self.layout["chunk_bytes"], self.layout["chunk_bytes"],
+                       round(float(t0), 4), round(float(t1), 4)]
+                      for i, (t0, t1) in enumerate(chunk_times)]
+            self.index = {
+                "version": CHUNK_VERSION, "frames": frames, "chunk_frames": chunk_frames,
+                "chunk_bytes": self.layout["chunk_bytes"], "data_offset": data_offset,
+                "max_faces": max_faces, "points": points, "dims": dims, "width": width, "height": height,
+                "layout": {k: v for k, v in self.layout.items() if k != "chunk_bytes"},
+                "metadata": metadata or {}, "chunks": chunks
+            }
+            encoded = json.dumps(self.index, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            needed = (PREFIX.size + len(encoded) + DATA_ALIGN - 1) // DATA_ALIGN * DATA_ALIGN
+            if needed <= data_offset:
+                break
+            data_offset = needed + DATA_ALIGN  # folga para os dígitos extras dos offsets
+
+        self._file = open(path, "wb")
+        self._file.write(PREFIX.pack(CHUNK_MAGIC, CHUNK_VERSION, 0, len(encoded)))
+        self._file.write(encoded)
+        self._file.write(b"\0" * (data_offset - PREFIX.size - len(encoded)))
+        self.chunks_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_chunk(self, timestamps: np.ndarray, faces: np.ndarray, landmarks: np.ndarray):
+        first_frame = self.chunks_written * self.chunk_frames
+        self._file.write(encode_chunk(first_frame, timestamps, faces, landmarks, self.layout, self.chunk_frames))
+        self.chunks_written += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class ChunkedResults:
+    def __init__(self, path: str):
+        """Abre um .lmkc lendo só o prefixo e o índice (o mesmo que o navegador faz por Range)"""
+        self.path = path
+        self._file = open(path, "rb")
+        magic, version, _, index_length = PREFIX.unpack(self._file.read(PREFIX.size))
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"Arquivo não é um contêiner de resultados em blocos: {path}")
+        if version > CHUNK_VERSION:
+            raise ValueError(f"Versão de arquivo não suportada: {version}")
+        self.index = json.loads(self._file.read(index_length).decode("utf-8"))
+        self.layout = dict(self.index["layout"], chunk_bytes=self.index["chunk_bytes"])
+        self.bytes_read = PREFIX.size + index_length
+
+    def __len__(self) -> int:
+        return self.index["frames"]
+
+    def chunk_for(self, frame: int) -> int:
+        return frame // self.index["chunk_frames"]
+
+    def read_chunk(self, chunk: int) -> Dict:
+        _, _, offset, length, _, _ = self.index["chunks"][chunk]
+        self._file.seek(offset)
+        data = self._file.read(length)
+        self.bytes_read += length
+        index = self.index
+        return decode_chunk(data, self.layout, index["chunk_frames"], index["max_faces"],
+                            index["points"], index["dims"])
+
+    def frames(self, start: int, stop: int) -> np.ndarray:
+        """Landmarks normalizados (T, faces, pontos, dims) de [start, stop), lendo só os blocos necessários"""
+        stop = min(stop, len(self))
+        if stop <= start:
+            return np.zeros((0, self.index["max_faces"], self.index["points"], self.index["dims"]), np.float32)
+        parts = [self.read_chunk(c)["landmarks"] for c in range(self.chunk_for(start), self.chunk_for(stop - 1) + 1)]
+        offset = self.chunk_for(start) * self.index["chunk_frames"]
+        return np.concatenate(parts)[start - offset:stop - offset]
+
+    def close(self):
+        self._file.close()
+
+
+def convert_archive(archive_path: str, output: str, chunk_frames: int = DEFAULT_CHUNK_FRAMES) -> Dict:
+    """Converte um .lmka em .lmkc bloco a bloco (memória constante, via memmap)"""
+    start = time.perf_counter()
+    archive = LandmarkArchive(archive_path)
+    frames = len(archive)
+    timestamps = archive.timestamps
+    chunk_times = [(timestamps[i], timestamps[min(i + chunk_frames, frames) - 1])
+                   for i in range(0, frames, chunk_frames)]
+
+    with ChunkedResultWriter(output, frames, chunk_frames, archive.max_faces, archive.points, archive.dims,
+                             archive.width, archive.height, chunk_times, archive.metadata) as writer:
+        for i in range(0, frames, chunk_frames):
+            records = archive.records[i:i + chunk_frames]
+            writer.write_chunk(records["timestamp"], records["faces"], records["landmarks"])
+        index_bytes = writer.index["data_offset"]
+        chunk_bytes = writer.layout["chunk_bytes"]
+    archive_bytes = archive.header_size + frames * archive.dtype.itemsize
+    archive.close()
+
+    return {
+        "frames": frames,
+        "chunks": len(chunk_times),
+        "index_bytes": index_bytes,
+        "chunk_bytes": chunk_bytes,
+        "archive_bytes": archive_bytes,
+        "output_bytes": index_bytes + len(chunk_times) * chunk_bytes,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def verify(archive_path: str, output: str, samples: int = 8, seed: int = 0) -> Dict:
+    """Lê trechos aleatórios dos dois arquivos e mede o erro em pixels e os bytes lidos"""
+    archive = LandmarkArchive(archive_path)
+    results = ChunkedResults(output)
+    rng = np.random.default_rng(seed)
+    scale = np.array([archive.width or 1, archive.height or 1], dtype=np.float32)
+    max_error = 0.0
+    for start in rng.integers(0, max(1, len(archive) - 30), samples):
+        original = archive.frames(start, start + 30)[..., :2] * scale
+        decoded = results.frames(start, start + 30)[..., :2] * scale
+        if not np.array_equal(np.isnan(original), np.isnan(decoded)):
+            raise ValueError(f"Faces ausentes divergem a partir do frame {start}")
+        if np.isfinite(original).any():
+            max_error = max(max_error, float(np.nanmax(np.abs(original - decoded))))
+    stats = {"samples": samples, "max_error_px": max_error, "bytes_read": results.bytes_read}
+    results.close()
+    archive.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte um landmark archive em blocos indexados (HTTP Range)")
+    parser.add_argument("archive", help="Arquivo .lmka")
+    parser.add_argument("--output", "-o", help="Arquivo .lmkc (padrão: mesmo nome com .lmkc)")
+    parser.add_argument("--chunk-frames", type=int, default=DEFAULT_CHUNK_FRAMES, help="Frames por bloco")
+    parser.add_argument("--verify", action="store_true", help="Comparar trechos aleatórios com o original")
+    args = parser.parse_args()
+
+    output = args.output or args.archive.rsplit(".", 1)[0] + ".lmkc"
+    stats = convert_archive(args.archive, output, args.chunk_frames)
+    print(f"🧱 {output}: {stats['frames']} frames em {stats['chunks']} blocos de {stats['chunk_bytes']:,} bytes")
+    print(f"   Índice: {stats['index_bytes']:,} bytes; total {stats['output_bytes']:,} bytes "
+          f"(original {stats['archive_bytes']:,}) em {stats['seconds']:.2f}s")
+    if args.verify:
+        check = verify(args.archive, output)
+        print(f"✅ Erro máximo {check['max_error_px']:.4f} px; {check['bytes_read']:,} bytes lidos "
+              f"para {check['samples']} trechos de 30 frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,15 @@ import os
 import argparse
 from typing import Dict, Optional
 
+try:
+    from debug_renderer import get_debug_renderer
+    from face_regions import SIMPLE_REGIONS, mediapipe_points
+    from emotion_classifier import SIMPLE_EMOTION_MODEL
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.debug_renderer import get_debug_renderer
+    from python.face_regions import SIMPLE_REGIONS, mediapipe_points
+    from python.emotion_classifier import SIMPLE_EMOTION_MODEL
+
 class SimpleFaceAnalyzer:
     def __init__(self):
         """Inicializa o analisador facial"""
@@ -21,10 +30,11 @@ class SimpleFaceAnalyzer:
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
-        # Face landmark indices
-        self.LEFT_EYE_INDICES = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
-        self.RIGHT_EYE_INDICES = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
-        self.MOUTH_INDICES = [78, 191, 80, 81, 82, 13, 312, 311, 310, 415, 308, 324, 318]
+        # Face landmark indices (tabelas compartilhadas em face_regions)
+        self.regions = SIMPLE_REGIONS
+        self.LEFT_EYE_INDICES = SIMPLE_REGIONS.region("left_eye")
+        self.RIGHT_EYE_INDICES = SIMPLE_REGIONS.region("right_eye")
+        self.MOUTH_INDICES = SIMPLE_REGIONS.region("mouth")
         
     def load_image(self, image_path: str) -> Optional[np.ndarray]:
         """Carrega a imagem"""
@@ -69,46 +79,55 @@ class SimpleFaceAnalyzer:
             
             # Extrair landmarks da primeira face
             face_landmarks = results.multi_face_landmarks[0]
-            landmarks = []
-            
-            for landmark in face_landmarks.landmark:
-                x = int(landmark.x * width)
-                y = int(landmark.y * height)
-                landmarks.append([x, y])
+            landmarks = mediapipe_points(face_landmarks, width, height).tolist()
                 
-            # Analisar características
-            eye_analysis = self.analyze_eyes(landmarks)
-            mouth_analysis = self.analyze_mouth(landmarks)
-            emotion_analysis = self.analyze_emotion(eye_analysis, mouth_analysis)
-            
-            # Resultado completo
-            result = {
-                "image_path": image_path,
-                "face_bounds": {
-                    "x": 0,
-                    "y": 0,
-                    "width": width,
-                    "height": height
-                },
-                "landmarks": landmarks,
-                "eyes": eye_analysis,
-                "mouth": mouth_analysis,
-                "emotion": emotion_analysis,
-                "timestamp": __import__('time').time()
-            }
+            return self.analyze_landmarks(landmarks, width, height, image_path)
             
-            # Criar dados de animação
-            animation_data = self.create_animation_data(result)
-            result["animation"] = animation_data
+    def analyze_landmarks(self, landmarks, width: int, height: int, image_path: str = "") -> Dict:
+        """Analisa landmarks já detectados (imagem estática ou frame de vídeo)"""
+        # Analisar características (olhos e boca extraídos juntos)
+        regions = self._region_points(landmarks)
+        eye_analysis = self.analyze_eyes(landmarks, regions)
+        mouth_analysis = self.analyze_mouth(landmarks, regions)
+        emotion_analysis = self.analyze_emotion(eye_analysis, mouth_analysis)
+        
+        # Resultado completo
+        result = {
+            "image_path": image_path,
+            "face_bounds": {
+                "x": 0,
+                "y": 0,
+                "width": width,
+                "height": height
+            },
+            "landmarks": landmarks,
+            "eyes": eye_analysis,
+            "mouth": mouth_analysis,
+            "emotion": emotion_analysis,
+            "timestamp": __import__('time').time()
+        }
+        
+        # Criar dados de animação
+        animation_data = self.create_animation_data(result)
+        result["animation"] = animation_data
+        
+        return result
             
-            return result
+    def _region_points(self, landmarks) -> Dict[str, np.ndarray]:
+        """Pontos de olhos e boca com uma única indexação (índices inexistentes são ignorados)"""
+        points = np.asarray(landmarks)
+        if len(points) > self.regions.max_index:
+            return self.regions.split(self.regions.gather(points))
+        return {name: points[[i for i in self.regions.region(name) if i < len(points)]].reshape(-1, 2)
+                for name in self.regions.names}
             
-    def analyze_eyes(self, landmarks) -> Dict:
+    def analyze_eyes(self, landmarks, regions: Optional[Dict[str, np.ndarray]] = None) -> Dict:
         """Analisa características dos olhos"""
-        left_eye_points = [landmarks[i] for i in self.LEFT_EYE_INDICES if i < len(landmarks)]
-        right_eye_points = [landmarks[i] for i in self.RIGHT_EYE_INDICES if i < len(landmarks)]
+        regions = regions if regions is not None else self._region_points(landmarks)
+        left_eye_points = regions["left_eye"]
+        right_eye_points = regions["right_eye"]
         
-        if not left_eye_points or not right_eye_points:
+        if not len(left_eye_points) or not len(right_eye_points):
             return {
                 "average_openness": 0.5,
                 "is_blinking": False,
@@ -121,10 +140,8 @@ class SimpleFaceAnalyzer:
         right_eye_center = np.mean(right_eye_points, axis=0)
         
         # Calcular abertura dos olhos (estimativa simples)
-        left_eye_height = max([p[1] for p in left_eye_points]) - min([p[1] for p in left_eye_points])
-        right_eye_height = max([p[1] for p in right_eye_points]) - min([p[1] for p in right_eye_points])
-        left_eye_width = max([p[0] for p in left_eye_points]) - min([p[0] for p in left_eye_points])
-        right_eye_width = max([p[0] for p in right_eye_points]) - min([p[0] for p in right_eye_points])
+        left_eye_width, left_eye_height = np.ptp(left_eye_points, axis=0)
+        right_eye_width, right_eye_height = np.ptp(right_eye_points, axis=0)
         
         # Razão de abertura dos olhos
         left_ratio = left_eye_height / left_eye_width if left_eye_width > 0 else 0
@@ -140,11 +157,12 @@ class SimpleFaceAnalyzer:
             "right_eye_ratio": float(right_ratio)
         }
         
-    def analyze_mouth(self, landmarks) -> Dict:
+    def analyze_mouth(self, landmarks, regions: Optional[Dict[str, np.ndarray]] = None) -> Dict:
         """Analisa características da boca"""
-        mouth_points = [landmarks[i] for i in self.MOUTH_INDICES if i < len(landmarks)]
+        regions = regions if regions is not None else self._region_points(landmarks)
+        mouth_points = regions["mouth"]
         
-        if not mouth_points:
+        if not len(mouth_points):
             return {
                 "aspect_ratio": 0.0,
                 "is_speaking": False,
@@ -156,8 +174,7 @@ class SimpleFaceAnalyzer:
         mouth_center = np.mean(mouth_points, axis=0)
         
         # Calcular dimensões da boca
-        mouth_height = max([p[1] for p in mouth_points]) - min([p[1] for p in mouth_points])
-        mouth_width = max([p[0] for p in mouth_points]) - min([p[0] for p in mouth_points])
+        mouth_width, mouth_height = np.ptp(mouth_points, axis=0)
         
         # Razão de abertura da boca
         aspect_ratio = mouth_height / mouth_width if mouth_width > 0 else 0
@@ -167,9 +184,9 @@ class SimpleFaceAnalyzer:
         
         # Curvatura da boca (sorriso/tristeza) - estimativa simples
         if len(mouth_points) >= 3:
-            top_y = min([p[1] for p in mouth_points])
-            left_corner = min(mouth_points, key=lambda p: p[0])
-            right_corner = max(mouth_points, key=lambda p: p[0])
+            top_y = mouth_points[:, 1].min()
+            left_corner = mouth_points[np.argmin(mouth_points[:, 0])]
+            right_corner = mouth_points[np.argmax(mouth_points[:, 0])]
             corners_avg_y = (left_corner[1] + right_corner[1]) / 2
             curvature = corners_avg_y - top_y  # Positivo = sorriso, negativo = tristeza
         else:
@@ -187,44 +204,12 @@ class SimpleFaceAnalyzer:
     def analyze_emotion(self, eyes: Dict, mouth: Dict) -> Dict:
         """Analisa emoção baseada nas características faciais"""
         
-        # Scores de emoções baseados em características simples
-        emotion_scores = {
-            "neutral": 0.4,
-            "happy": 0.0,
-            "sad": 0.0,
-            "surprised": 0.0,
-            "angry": 0.0
-        }
-        
-        # Felicidade: sorriso (curvatura positiva da boca)
-        if mouth["curvature"] > 5:
-            emotion_scores["happy"] += 0.4
-            
-        # Tristeza: boca curvada para baixo
-        if mouth["curvature"] < -3:
-            emotion_scores["sad"] += 0.3
-            
-        # Surpresa: boca muito aberta
-        if mouth["aspect_ratio"] > 0.15:
-            emotion_scores["surprised"] += 0.3
-            
-        # Olhos fechados podem indicar felicidade (sorriso)
-        if eyes["average_openness"] < 0.1:
-            emotion_scores["happy"] += 0.2
-            
-        # Normalizar scores
-        total = sum(emotion_scores.values())
-        if total > 0:
-            emotion_scores = {k: v/total for k, v in emotion_scores.items()}
-            
-        # Encontrar emoção dominante
-        dominant = max(emotion_scores.items(), key=lambda x: x[1])
-        
-        return {
-            "scores": emotion_scores,
-            "dominant_emotion": dominant[0],
-            "confidence": float(dominant[1])
-        }
+        # Scores de emoções por tabela de regras (ver emotion_classifier.SIMPLE_EMOTION_MODEL)
+        return SIMPLE_EMOTION_MODEL.classify_one({
+            "curvature": mouth["curvature"],
+            "aspect_ratio": mouth["aspect_ratio"],
+            "average_openness": eyes["average_openness"]
+        })
         
     def create_animation_data(self, analysis_result: Dict) -> Dict:
         """Cria dados de animação para o JavaScript"""
@@ -283,28 +268,18 @@ class SimpleFaceAnalyzer:
         if image is None:
             return
             
-        landmarks = analysis_result["landmarks"]
+        landmarks = np.asarray(analysis_result["landmarks"], dtype=np.int32).reshape(-1, 2)
+        renderer = get_debug_renderer()
         
         # Desenhar landmarks
-        for i, (x, y) in enumerate(landmarks):
-            cv2.circle(image, (int(x), int(y)), 1, (0, 255, 0), -1)
+        renderer.stamp_dots(image, landmarks, (0, 255, 0), radius=1)
             
         # Destacar olhos
-        for idx in self.LEFT_EYE_INDICES:
-            if idx < len(landmarks):
-                x, y = landmarks[idx]
-                cv2.circle(image, (int(x), int(y)), 2, (255, 0, 0), -1)
-                
-        for idx in self.RIGHT_EYE_INDICES:
-            if idx < len(landmarks):
-                x, y = landmarks[idx]
-                cv2.circle(image, (int(x), int(y)), 2, (255, 0, 0), -1)
+        regions = self._region_points(landmarks)
+        renderer.stamp_dots(image, np.concatenate([regions["left_eye"], regions["right_eye"]]), (255, 0, 0), radius=2)
                 
         # Destacar boca
-        for idx in self.MOUTH_INDICES:
-            if idx < len(landmarks):
-                x, y = landmarks[idx]
-                cv2.circle(image, (int(x), int(y)), 2, (0, 0, 255), -1)
+        renderer.stamp_dots(image, regions["mouth"], (0, 0, 255), radius=2)
         
         # Adicionar informações
         eyes = analysis_result["eyes"]
@@ -312,14 +287,12 @@ class SimpleFaceAnalyzer:
         emotion = analysis_result["emotion"]["dominant_emotion"]
         confidence = analysis_result["emotion"]["confidence"]
         
-        cv2.putText(image, f"Emotion: {emotion} ({confidence:.2f})", 
-                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        cv2.putText(image, f"Eye Openness: {eyes['average_openness']:.2f}", 
-                   (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        cv2.putText(image, f"Mouth Openness: {mouth['aspect_ratio']:.2f}", 
-                   (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        cv2.putText(image, f"Speaking: {'Yes' if mouth['is_speaking'] else 'No'}", 
-                   (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        renderer.draw_text_lines(image, [
+            f"Emotion: {emotion} ({confidence:.2f})",
+            f"Eye Openness: {eyes['average_openness']:.2f}",
+            f"Mouth Openness: {mouth['aspect_ratio']:.2f}",
+            f"Speaking: {'Yes' if mouth['is_speaking'] else 'No'}"
+        ])
         
         cv2.imwrite(output_path, image)
         print(f"✅ Imagem de debug salva em: {output_path}")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Still Image - Imagens estáticas em dois níveis de resolução
+A detecção (FaceMesh roda em resolução interna fixa) usa uma versão reduzida.
+JPEGs são decodificados direto em 1/2, 1/4 ou 1/8 com IMREAD_REDUCED_COLOR_*
+(o decodificador pula os coeficientes) e a resolução total só é decodificada
+quando algum recorte/máscara precisa dela; nos demais formatos a redução do
+OpenCV decodificaria tudo de qualquer forma, então a imagem é decodificada uma
+vez só e reduzida por área. Só os pixels do recorte do rosto são processados
+"""
+
+import cv2
+import numpy as np
+import os
+import struct
+from typing import Optional, Tuple
+
+try:
+    from face_regions import mediapipe_points
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.face_regions import mediapipe_points
+
+DEFAULT_DETECTION_SIZE = 1280
+
+REDUCED_FLAGS = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+def is_jpeg(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(2) == b"\xff\xd8"
+
+
+def exif_orientation(segment: bytes) -> int:
+    """Tag Orientation (1-8) do IFD0 de um segmento APP1 Exif; 1 se ausente"""
+    if not segment.startswith(b"Exif\0\0") or len(segment) < 14:
+        return 1
+    tiff = segment[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return 1
+    try:
+        offset = struct.unpack(order + "I", tiff[4:8])[0]
+        count = struct.unpack(order + "H", tiff[offset:offset + 2])[0]
+        for i in range(count):
+            entry = tiff[offset + 2 + 12 * i:offset + 14 + 12 * i]
+            tag, kind, _ = struct.unpack(order + "HHI", entry[:8])
+            if tag == 0x0112 and kind == 3:
+                return struct.unpack(order + "H", entry[8:10])[0]
+    except struct.error:
+        pass
+    return 1
+
+
+def image_size(path: str) -> Optional[Tuple[int, int]]:
+    """(largura, altura) como o cv2.imread entrega a imagem, lidas do cabeçalho PNG/JPEG sem decodificar
+
+    O cv2.imread (inclusive IMREAD_REDUCED_*) aplica a orientação EXIF: nas orientações
+    5-8 (rotação de 90°) largura e altura do SOF são trocadas.
+    """
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if not head.startswith(b"\xff\xd8"):
+            return None
+        # JPEG: percorrer os segmentos até o SOF (baseline, progressivo, ...); o Exif vem antes
+        f.seek(2)
+        orientation = 1
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                continue
+            length_bytes = f.read(2)
+            if len(length_bytes) < 2:
+                return None
+            length = struct.unpack(">H", length_bytes)[0]
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">xHH", f.read(5))
+                return (height, width) if orientation >= 5 else (width, height)
+            if marker[1] == 0xE1 and orientation == 1:
+                orientation = exif_orientation(f.read(length - 2))
+                continue
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def reduction_factor(size: Tuple[int, int], detection_size: int) -> int:
+    """Maior fator 2/4/8 que mantém o lado maior >= detection_size (1 = sem redução)"""
+    longest = max(size)
+    for factor in (8, 4, 2):
+        if longest / factor >= detection_size:
+            return factor
+    return 1
+
+
+class StillImage:
+    def __init__(self, path: str, detection_size: int = DEFAULT_DETECTION_SIZE):
+        """Carrega a versão de detecção; em JPEGs a resolução total é decodificada sob demanda"""
+        self.path = path
+        self.detection_size = detection_size
+        self._full: Optional[np.ndarray] = None
+
+        header_size = image_size(path)
+        factor = reduction_factor(header_size, detection_size) if header_size else 1
+        if factor > 1 and is_jpeg(path):
+            size = header_size
+            detection = cv2.imread(path, REDUCED_FLAGS[factor])
+            if detection is None:
+                raise FileNotFoundError(f"Erro ao carregar imagem: {path}")
+        else:
+            # Uma única decodificação total, reaproveitada por self.full
+            self._full = cv2.imread(path)
+            if self._full is None:
+                raise FileNotFoundError(f"Erro ao carregar imagem: {path}")
+            detection = self._full
+            size = (detection.shape[1], detection.shape[0])
+            # Mesma resolução da decodificação reduzida; sem cabeçalho conhecido, até detection_size
+            scale = 1.0 / factor if header_size else detection_size / max(size)
+            if scale < 1.0:
+                detection = cv2.resize(detection, (max(1, round(size[0] * scale)), max(1, round(size[1] * scale))),
+                                       interpolation=cv2.INTER_AREA)
+
+        self.detection = detection
+        self.full_size = size
+        self.scale = (size[0] / detection.shape[1], size[1] / detection.shape[0])
+
+    @property
+    def full(self) -> np.ndarray:
+        """Imagem em resolução total (decodificada na primeira vez)"""
+        if self._full is None:
+            self._full = cv2.imread(self.path)
+            if self._full is None:
+                raise FileNotFoundError(f"Erro ao carregar imagem: {self.path}")
+        return self._full
+
+    def clamp_box(self, x0: int, y0: int, x1: int, y1: int) -> Tuple[int, int, int, int]:
+        w, h = self.full_size
+        return max(0, int(x0)), max(0, int(y0)), min(w, int(x1)), min(h, int(y1))
+
+    def crop(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Recorte em resolução total (view; copiar antes de modificar)"""
+        x0, y0, x1, y1 = self.clamp_box(x0, y0, x1, y1)
+        return self.full[y0:y1, x0:x1]
+
+    def to_full(self, points: np.ndarray) -> np.ndarray:
+        """Converte pontos em pixels da imagem de detecção para a resolução total"""
+        return np.asarray(points, dtype=np.float64) * self.scale
+
+
+def detect_face(face_mesh, still: StillImage):
+    """Roda o FaceMesh na imagem reduzida; retorna (face_landmarks, pontos em pixels da
+    resolução total) ou (None, None). Landmarks normalizados não dependem da escala."""
+    results = face_mesh.process(cv2.cvtColor(still.detection, cv2.COLOR_BGR2RGB))
+    if not results.multi_face_landmarks:
+        return None, None
+    face_landmarks = results.multi_face_landmarks[0]
+    return face_landmarks, mediapipe_points(face_landmarks, *still.full_size)
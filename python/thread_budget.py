@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Thread Budget - Orçamento de threads de CPU por worker
+OpenCV, BLAS (NumPy) e o TFLite do MediaPipe criam cada um o seu pool de
+threads dimensionado para a máquina inteira; com vários workers no mesmo host
+isso multiplica as threads e derruba o throughput. O orçamento divide os núcleos
+entre os workers e limita OpenCV e BLAS a essa fatia. Os grafos TFLite/XNNPACK
+do MediaPipe não leem variáveis de ambiente nem expõem o número de threads:
+só a afinidade de CPU (--pin) os restringe à fatia do worker
+"""
+
+import os
+import argparse
+from typing import Dict, List, Optional
+
+# Variáveis lidas pelas bibliotecas BLAS/OpenMP ao inicializar seus pools.
+# Só têm efeito em processos que importam as bibliotecas depois de definidas
+# (ex: workers criados com spawn herdam o ambiente do processo pai).
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def available_cpus() -> List[int]:
+    """CPUs que este processo pode usar (respeita taskset/cgroups quando suportado)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class ThreadBudget:
+    def __init__(self, workers: int = 1, cores: Optional[int] = None, pin: bool = False):
+        """Divide `cores` núcleos (padrão: os disponíveis) entre `workers` workers
+
+        pin=True fixa o worker i nas CPUs da sua fatia, ou o processo todo nos núcleos
+        reservados quando não há índice de worker (somente Linux).
+        """
+        self.cpus = available_cpus()
+        self.cores = min(cores or len(self.cpus), len(self.cpus))
+        self.workers = max(1, workers)
+        self.threads_per_worker = max(1, self.cores // self.workers)
+        self.pin = pin and hasattr(os, "sched_setaffinity")
+
+    def environment(self) -> Dict[str, str]:
+        return {name: str(self.threads_per_worker) for name in THREAD_ENV_VARS}
+
+    def cpu_set(self, worker_index: int) -> List[int]:
+        """CPUs da fatia do worker (circular quando há mais workers que núcleos)"""
+        n = self.threads_per_worker
+        start = (worker_index * n) % self.cores
+        return [self.cpus[(start + i) % self.cores] for i in range(n)]
+
+    def apply_environment(self):
+        """Define as variáveis de ambiente (chamar antes de criar os workers)"""
+        os.environ.update(self.environment())
+
+    def apply(self, worker_index: Optional[int] = None):
+        """Aplica o orçamento no processo atual: ambiente, OpenCV e afinidade de CPU"""
+        self.apply_environment()
+
+        import cv2
+        cv2.setNumThreads(self.threads_per_worker)
+
+        # BLAS já carregado: limitar em tempo de execução se threadpoolctl estiver instalado
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(self.threads_per_worker)
+        except ImportError:
+            pass
+
+        if self.pin:
+            # Sem índice (workers são threads deste processo): o processo inteiro nos núcleos reservados
+            cpus = self.cpu_set(worker_index) if worker_index is not None else self.cpus[:self.cores]
+            os.sched_setaffinity(0, cpus)
+
+    def report(self) -> Dict:
+        """Limites efetivamente aplicados no processo atual (OpenCV, BLAS carregado, afinidade)"""
+        import cv2
+        report = {
+            "cores": self.cores,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "opencv_threads": cv2.getNumThreads(),
+            "pinned": self.pin
+        }
+        if hasattr(os, "sched_getaffinity"):
+            report["affinity"] = sorted(os.sched_getaffinity(0))
+        try:
+            from threadpoolctl import threadpool_info
+            report["blas"] = [{"library": info.get("internal_api"), "threads": info.get("num_threads")}
+                              for info in threadpool_info()]
+        except ImportError:
+            pass
+        return report
+
+    def print_report(self):
+        report = self.report()
+        print(f"🧵 Orçamento de threads: {report['cores']} núcleos / {report['workers']} worker(s) "
+              f"= {report['threads_per_worker']} thread(s) por worker")
+        blas = report.get("blas")
+        print(f"   OpenCV: {report['opencv_threads']} | BLAS: "
+              + (", ".join(f"{b['library']} {b['threads']}" for b in blas) if blas
+                 else "não verificado (threadpoolctl ausente ou BLAS não carregado)"))
+        if "affinity" in report:
+            print(f"   Afinidade: CPUs {report['affinity']}" + ("" if report["pinned"] else " (sem --pin)"))
+        print("   MediaPipe/TFLite: sem limite de threads próprio; só a afinidade (--pin) o restringe")
+
+
+def init_worker(budget: ThreadBudget, counter=None):
+    """Initializer de pools de processos: cada worker pega um índice e aplica o orçamento
+
+    counter: multiprocessing.Value("i", 0) compartilhado, para numerar os workers.
+    """
+    index = None
+    if counter is not None:
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+    budget.apply(index)
+
+
+def add_budget_arguments(parser: argparse.ArgumentParser):
+    """Opções comuns de orçamento de threads para os CLIs"""
+    parser.add_argument("--cores", type=int, help="Núcleos reservados para este processo (padrão: todos)")
+    parser.add_argument("--pin", action="store_true", help="Fixar cada worker em suas CPUs (Linux)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mostra o orçamento de threads para um número de workers")
+    parser.add_argument("--workers", type=int, default=1, help="Workers que dividirão os núcleos")
+    add_budget_arguments(parser)
+
+    args = parser.parse_args()
+
+    budget = ThreadBudget(args.workers, args.cores, args.pin)
+    budget.apply()
+    budget.print_report()
+    for i in range(min(budget.workers, 8)):
+        print(f"   worker {i}: CPUs {budget.cpu_set(i)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Tiled Detection - Detecção de vários rostos em imagens grandes e fotos de grupo
+A imagem é dividida em blocos sobrepostos; o FaceDetection roda em cada bloco
+(em workers paralelos) na resolução do próprio bloco e em uma passada grossa na
+imagem inteira reduzida ao lado de um bloco (rostos maiores que um bloco). As
+caixas são unidas com NMS (IoU e contenção, para descartar rostos cortados na
+borda de um bloco) e o
+FaceMesh roda em um recorte de cada rosto. O custo cresce com a área da imagem
+e o número de rostos, sem ampliar a imagem inteira. A imagem é decodificada uma
+vez; os workers leem os pixels de um bloco de memória compartilhada
+"""
+
+import argparse
+import json
+import multiprocessing
+import time
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    from thread_budget import ThreadBudget, available_cpus, init_worker, add_budget_arguments
+    from face_gate import expand_box, remap_landmarks
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.thread_budget import ThreadBudget, available_cpus, init_worker, add_budget_arguments
+    from python.face_gate import expand_box, remap_landmarks
+
+DEFAULT_TILE = 768
+DEFAULT_OVERLAP = 0.25
+
+# Estado de cada worker (imagem compartilhada e modelos criados uma vez por processo)
+_worker: Dict = {}
+
+
+def plan_tiles(width: int, height: int, tile: int = DEFAULT_TILE, overlap: float = DEFAULT_OVERLAP) -> List[Tuple[int, int, int, int]]:
+    """Blocos (x0, y0, x1, y1) cobrindo a imagem, com sobreposição mínima `overlap` do lado"""
+    def starts(size):
+        if size <= tile:
+            return [0]
+        count = int(np.ceil((size - tile) / (tile * (1.0 - overlap)))) + 1
+        return np.linspace(0, size - tile, count).round().astype(int).tolist()
+
+    return [(x, y, min(width, x + tile), min(height, y + tile)) for y in starts(height) for x in starts(width)]
+
+
+def drop_fragments(boxes: np.ndarray, coarse: np.ndarray, containment: float = 0.7) -> np.ndarray:
+    """Máscara das caixas dos blocos que não são pedaços (> containment da área) de uma caixa da passada grossa"""
+    if not len(boxes) or not len(coarse):
+        return np.ones(len(boxes), dtype=bool)
+    w = np.clip(np.minimum(boxes[:, None, 0] + boxes[:, None, 2], coarse[None, :, 0] + coarse[None, :, 2])
+                - np.maximum(boxes[:, None, 0], coarse[None, :, 0]), 0, None)
+    h = np.clip(np.minimum(boxes[:, None, 1] + boxes[:, None, 3], coarse[None, :, 1] + coarse[None, :, 3])
+                - np.maximum(boxes[:, None, 1], coarse[None, :, 1]), 0, None)
+    contained = (w * h) / (boxes[:, 2] * boxes[:, 3])[:, None]
+    return ~(contained > containment).any(axis=1)
+
+
+def merge_detections(boxes: np.ndarray, scores: np.ndarray, iou: float = 0.4,
+                     containment: float = 0.7) -> np.ndarray:
+    """NMS: índices mantidos, por score decrescente
+
+    Além do IoU, descarta a caixa cuja área está contida (> containment) em uma caixa
+    mantida: pedaços de um rosto cortado pela borda de um bloco.
+    """
+    if not len(boxes):
+        return np.zeros(0, dtype=np.intp)
+    x0, y0 = boxes[:, 0], boxes[:, 1]
+    x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+    area = boxes[:, 2] * boxes[:, 3]
+    order = np.argsort(-scores)
+    keep = []
+    while len(order):
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        w = np.clip(np.minimum(x1[i], x1[rest]) - np.maximum(x0[i], x0[rest]), 0, None)
+        h = np.clip(np.minimum(y1[i], y1[rest]) - np.maximum(y0[i], y0[rest]), 0, None)
+        inter = w * h
+        overlap_iou = inter / (area[i] + area[rest] - inter)
+        contained = inter / np.minimum(area[i], area[rest])
+        order = rest[(overlap_iou <= iou) & (contained <= containment)]
+    return np.array(keep, dtype=np.intp)
+
+
+def init_tile_worker(image: Union[np.ndarray, Tuple[str, Tuple[int, ...]]], settings: Dict,
+                     budget: Optional[ThreadBudget] = None, counter=None):
+    """Initializer: orçamento de threads e acesso à imagem já decodificada
+
+    image é o array (mesmo processo) ou (nome, shape) do bloco de memória compartilhada
+    criado por detect_faces_tiled; os workers só leem, sem copiar nem decodificar. Workers
+    spawn compartilham o resource_tracker do processo principal, que apaga o bloco no fim.
+    """
+    if budget is not None:
+        init_worker(budget, counter)
+    _worker.clear()
+    _worker["settings"] = settings
+    if isinstance(image, np.ndarray):
+        _worker["image"] = image
+    else:
+        name, shape = image
+        _worker["shm"] = shared_memory.SharedMemory(name=name)
+        _worker["image"] = np.ndarray(shape, dtype=np.uint8, buffer=_worker["shm"].buf)
+
+
+def _detector():
+    if "detector" not in _worker:
+        import mediapipe as mp
+        _worker["detector"] = mp.solutions.face_detection.FaceDetection(
+            model_selection=1, min_detection_confidence=_worker["settings"]["min_confidence"])
+    return _worker["detector"]
+
+
+def _face_mesh():
+    if "mesh" not in _worker:
+        import mediapipe as mp
+        _worker["mesh"] = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=True, max_num_faces=2, refine_landmarks=True, min_detection_confidence=0.3)
+    return _worker["mesh"]
+
+
+def detect_tile(tile: Optional[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int, float]]:
+    """Caixas (x, y, largura, altura, score) em pixels da imagem inteira para um bloco
+
+    tile None é a passada grossa: a imagem inteira reduzida ao lado de um bloco, que
+    encontra rostos grandes demais para caber em um bloco (retratos em alta resolução).
+    """
+    image = _worker["image"]
+    if tile is None:
+        height, width = image.shape[:2]
+        scale = min(1.0, _worker["settings"]["tile"] / max(width, height))
+        x0, y0, x1, y1 = 0, 0, width, height
+        crop = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                          interpolation=cv2.INTER_AREA)[:, :, ::-1]
+    else:
+        x0, y0, x1, y1 = tile
+        crop = image[y0:y1, x0:x1, ::-1]
+    results = _detector().process(np.ascontiguousarray(crop))
+    boxes = []
+    for detection in results.detections or []:
+        box = detection.location_data.relative_bounding_box
+        bx0 = max(0.0, box.xmin) * (x1 - x0)
+        by0 = max(0.0, box.ymin) * (y1 - y0)
+        bx1 = min(1.0, box.xmin + box.width) * (x1 - x0)
+        by1 = min(1.0, box.ymin + box.height) * (y1 - y0)
+        if bx1 > bx0 and by1 > by0:
+            boxes.append((int(x0 + bx0), int(y0 + by0), int(bx1 - bx0), int(by1 - by0), float(detection.score[0])))
+    return boxes
+
+
+def mesh_face(box: Tuple[int, int, int, int]) -> Optional[np.ndarray]:
+    """Landmarks (478, 3) em pixels da imagem inteira para o recorte em volta da caixa
+
+    Em fotos de grupo o recorte com margem pega rostos vizinhos; só vale o mesh cujo
+    centróide cai dentro da caixa detectada (o mais próximo do centro dela), senão None.
+    """
+    image = _worker["image"]
+    height, width = image.shape[:2]
+    region = expand_box(box, width, height, _worker["settings"]["margin"])
+    x0, y0, x1, y1 = region
+    results = _face_mesh().process(np.ascontiguousarray(image[y0:y1, x0:x1, ::-1]))
+    if not results.multi_face_landmarks:
+        return None
+    remap_landmarks(results.multi_face_landmarks, region, width, height)
+
+    x, y, w, h = box
+    best, best_distance = None, None
+    for face in results.multi_face_landmarks:
+        points = np.array([(lm.x * width, lm.y * height, lm.z * width) for lm in face.landmark], dtype=np.float32)
+        cx, cy = points[:, 0].mean(), points[:, 1].mean()
+        if not (x <= cx <= x + w and y <= cy <= y + h):
+            continue
+        distance = (cx - x - w / 2.0) ** 2 + (cy - y - h / 2.0) ** 2
+        if best_distance is None or distance < best_distance:
+            best, best_distance = points, distance
+    return best
+
+
+def detect_faces_tiled(image: Union[str, np.ndarray], tile: int = DEFAULT_TILE, overlap: float = DEFAULT_OVERLAP,
+                       workers: int = 1, min_confidence: float = 0.5, margin: float = 0.35,
+                       mesh: bool = True, budget: Optional[ThreadBudget] = None) -> Dict:
+    """Detecta todos os rostos da imagem (caminho ou array BGR); retorna caixas, scores, landmarks e tempos"""
+    settings = {"min_confidence": min_confidence, "margin": margin, "tile": tile}
+    start = time.perf_counter()
+
+    def run(pool_map):
+        detect_start = time.perf_counter()
+        # Passada grossa junto com os blocos quando a imagem não cabe em um bloco só
+        jobs = tiles + [None] if len(tiles) > 1 else tiles
+        per_job = list(pool_map(detect_tile, jobs))
+        coarse = per_job[len(tiles):]
+        detect_seconds = time.perf_counter() - detect_start
+
+        def as_arrays(found):
+            return (np.array([b[:4] for b in found], dtype=np.float64).reshape(-1, 4),
+                    np.array([b[4] for b in found], dtype=np.float64))
+
+        # Pedaços de um rosto grande (cortado por vários blocos) dão lugar à caixa da passada grossa
+        coarse_boxes, coarse_scores = as_arrays([box for boxes in coarse for box in boxes])
+        tile_boxes, tile_scores = as_arrays([box for boxes in per_job[:len(tiles)] for box in boxes])
+        whole = drop_fragments(tile_boxes, coarse_boxes)
+        boxes = np.concatenate([coarse_boxes, tile_boxes[whole]])
+        scores = np.concatenate([coarse_scores, tile_scores[whole]])
+        found = per_job
+        keep = merge_detections(boxes, scores)
+        faces = [tuple(int(v) for v in boxes[i]) for i in keep]
+
+        mesh_start = time.perf_counter()
+        landmarks = list(pool_map(mesh_face, faces)) if mesh else [None] * len(faces)
+        return found, faces, scores[keep], landmarks, detect_seconds, time.perf_counter() - mesh_start
+
+    if isinstance(image, str):
+        path, image = image, cv2.imread(image)
+        if image is None:
+            raise FileNotFoundError(f"Erro ao carregar imagem: {path}")
+    height, width = image.shape[:2]
+    tiles = plan_tiles(width, height, tile, overlap)
+
+    if workers > 1:
+        # spawn, como em video_segments: cada worker cria seus próprios grafos do MediaPipe.
+        # Os pixels vão uma vez para memória compartilhada em vez de cada worker decodificar o arquivo
+        budget = budget or ThreadBudget(workers)
+        context = multiprocessing.get_context("spawn")
+        budget.apply_environment()
+        shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+        try:
+            np.ndarray(image.shape, dtype=np.uint8, buffer=shm.buf)[:] = image
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_tile_worker,
+                                     initargs=((shm.name, image.shape), settings, budget,
+                                               context.Value("i", 0))) as pool:
+                found, faces, scores, landmarks, detect_seconds, mesh_seconds = run(pool.map)
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        init_tile_worker(image, settings)
+        try:
+            found, faces, scores, landmarks, detect_seconds, mesh_seconds = run(map)
+        finally:
+            for key in ("detector", "mesh"):
+                if key in _worker:
+                    _worker[key].close()
+            _worker.clear()
+
+    return {
+        "image_size": (width, height),
+        "tiles": tiles,
+        "raw_detections": sum(len(boxes) for boxes in found),
+        "boxes": faces,
+        "scores": [round(float(s), 3) for s in scores],
+        "landmarks": landmarks,
+        "detect_seconds": detect_seconds,
+        "mesh_seconds": mesh_seconds,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def draw_faces(image: np.ndarray, result: Dict, tiles: bool = False) -> np.ndarray:
+    """Caixas (e pontos do mesh) sobre a imagem, para conferência"""
+    output = image.copy()
+    thickness = max(1, max(image.shape[:2]) // 800)
+    if tiles:
+        for x0, y0, x1, y1 in result["tiles"]:
+            cv2.rectangle(output, (x0, y0), (x1 - 1, y1 - 1), (128, 128, 128), thickness)
+    for (x, y, w, h), landmarks in zip(result["boxes"], result["landmarks"]):
+        cv2.rectangle(output, (x, y), (x + w, y + h), (0, 255, 0), thickness)
+        if landmarks is not None:
+            for px, py in landmarks[:, :2].astype(np.int32):
+                cv2.circle(output, (int(px), int(py)), thickness, (0, 255, 255), -1)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detecção de vários rostos em blocos (fotos de grupo/alta resolução)")
+    parser.add_argument("image", help="Imagem de entrada")
+    parser.add_argument("--tile", type=int, default=DEFAULT_TILE, help="Lado de cada bloco (pixels)")
+    parser.add_argument("--overlap", type=float, default=DEFAULT_OVERLAP, help="Sobreposição entre blocos (fração)")
+    parser.add_argument("--workers", type=int, default=1, help="Processos paralelos")
+    parser.add_argument("--min-confidence", type=float, default=0.5, help="Confiança mínima da detecção")
+    parser.add_argument("--no-mesh", action="store_true", help="Só detectar (sem FaceMesh por rosto)")
+    parser.add_argument("--output", "-o", help="Salvar imagem anotada")
+    parser.add_argument("--json", help="Salvar caixas e landmarks em JSON")
+    parser.add_argument("--show-tiles", action="store_true", help="Desenhar os blocos na imagem anotada")
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    workers = min(args.workers, len(available_cpus()) if args.cores is None else args.cores) or 1
+    budget = ThreadBudget(workers, args.cores, args.pin) if workers > 1 else None
+    image = cv2.imread(args.image)
+    if image is None:
+        print(f"❌ Erro ao carregar imagem: {args.image}")
+        return
+    result = detect_faces_tiled(image, args.tile, args.overlap, workers, args.min_confidence,
+                                mesh=not args.no_mesh, budget=budget)
+
+    width, height = result["image_size"]
+    meshed = sum(1 for lm in result["landmarks"] if lm is not None)
+    print(f"🧩 {width}x{height}: {len(result['tiles'])} blocos de {args.tile}px, {workers} worker(s)")
+    print(f"👥 {len(result['boxes'])} rostos ({result['raw_detections']} detecções antes do NMS), "
+          f"{meshed} com FaceMesh")
+    print(f"⏱️ Detecção {result['detect_seconds']:.2f}s + FaceMesh {result['mesh_seconds']:.2f}s "
+          f"= {result['seconds']:.2f}s")
+
+    if args.output:
+        cv2.imwrite(args.output, draw_faces(image, result, args.show_tiles))
+        print(f"🖼️ Imagem anotada salva em: {args.output}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "image_size": result["image_size"],
+                "faces": [{"box": list(box), "score": score,
+                           "landmarks": None if lm is None else np.round(lm, 1).tolist()}
+                          for box, score, lm in zip(result["boxes"], result["scores"], result["landmarks"])]
+            }, f)
+        print(f"💾 Resultado salvo em: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Video Segments - Processamento paralelo de vídeos longos por segmentos
+O plano de frames do vídeo inteiro é dividido em trechos contíguos; cada trecho
+roda em um processo próprio com seu FaceMesh em modo tracking, precedido de
+alguns frames de aquecimento (overlap) para readquirir o rastreamento, e grava
+um landmark archive temporário. Os arquivos são concatenados em ordem no final;
+frames do plano que não puderam ser decodificados viram registros vazios (faces=0,
+landmarks NaN), de modo que o registro i do archive é sempre o i-ésimo frame do plano
+"""
+
+import cv2
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+try:
+    from video_source import VideoFrameSource
+    from landmark_archive import LandmarkArchiveWriter, LandmarkArchive, summarize_archive
+    from thread_budget import ThreadBudget, available_cpus, init_worker, add_budget_arguments
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.video_source import VideoFrameSource
+    from python.landmark_archive import LandmarkArchiveWriter, LandmarkArchive, summarize_archive
+    from python.thread_budget import ThreadBudget, available_cpus, init_worker, add_budget_arguments
+
+
+def plan_segments(indices: np.ndarray, fps: float, segments: int, overlap: float = 1.0) -> List[Dict]:
+    """Divide o plano de frames em trechos contíguos com frames de aquecimento
+
+    Cada trecho recebe os índices que grava ("indices") e os índices anteriores dentro
+    de `overlap` segundos ("warmup"), processados só para o tracking convergir.
+    """
+    plan = []
+    for part in np.array_split(np.asarray(indices, dtype=np.int64), max(1, segments)):
+        if not len(part):
+            continue
+        first = int(part[0])
+        warmup = indices[(indices < first) & (indices >= first - overlap * fps)]
+        plan.append({"indices": part, "warmup": warmup})
+    return plan
+
+
+def process_segment(path: str, indices: np.ndarray, warmup: np.ndarray, output: str,
+                    scale: float = 1.0, max_faces: int = 1) -> Dict:
+    """Worker: FaceMesh em modo tracking sobre aquecimento + trecho, gravando só o trecho
+
+    Grava exatamente um registro por índice do trecho: os que o decodificador não entregou
+    (fim antecipado, contagem de frames do contêiner errada) entram vazios ("missing").
+    """
+    import mediapipe as mp
+
+    face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=max_faces,
+                                                refine_landmarks=True)
+    keep_from = int(indices[0])
+    pending = iter(indices)
+    missing = 0
+    start_time = time.time()
+
+    source = VideoFrameSource(path, scale=scale, indices=np.concatenate([warmup, indices]))
+    with source, LandmarkArchiveWriter(output, max_faces=max_faces, width=source.width,
+                                       height=source.height, flush_every=0) as writer:
+        for index, timestamp, frame in source:
+            results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if index < keep_from:
+                continue
+            for planned in pending:
+                if planned >= index:
+                    break
+                writer.append(None, planned / source.fps)
+                missing += 1
+            writer.append_mediapipe(results.multi_face_landmarks, timestamp)
+        for planned in pending:
+            writer.append(None, planned / source.fps)
+            missing += 1
+        frames = writer.count
+    face_mesh.close()
+
+    return {"output": output, "frames": frames, "expected": len(indices), "missing": missing,
+            "warmup": len(warmup), "seconds": time.time() - start_time, **source.stats()}
+
+
+def merge_archives(paths: List[str], output: str, metadata: Optional[Dict] = None,
+                   chunk: int = 4096, max_faces: int = 1) -> int:
+    """Concatena landmark archives de mesmo layout, em ordem, em um único arquivo
+
+    Sem arquivos (vídeo sem frames no plano), grava um archive vazio com max_faces rostos.
+    """
+    if not paths:
+        with LandmarkArchiveWriter(output, max_faces, metadata=metadata, flush_every=0):
+            return 0
+
+    first = LandmarkArchive(paths[0])
+    layout = (first.max_faces, first.points, first.dims, first.width, first.height)
+    first.close()
+    with LandmarkArchiveWriter(output, *layout, metadata, flush_every=0) as writer:
+        for path in paths:
+            archive = LandmarkArchive(path)
+            for start in range(0, len(archive), chunk):
+                writer.extend(archive.records[start:start + chunk])
+            archive.close()
+        return writer.count
+
+
+def process_video_parallel(path: str, output: str, workers: Optional[int] = None,
+                           segments: Optional[int] = None, target_fps: Optional[float] = None,
+                           scale: float = 1.0, overlap: float = 1.0, max_faces: int = 1,
+                           budget: Optional[ThreadBudget] = None, strict: bool = False) -> Dict:
+    """Processa o vídeo em segmentos paralelos e grava um único landmark archive em ordem
+
+    budget: orçamento de threads aplicado a cada worker (padrão: núcleos divididos por workers).
+    Frames do plano que não foram decodificados (decodificação terminou antes, contagem de
+    frames do contêiner errada) são gravados vazios, mantendo os índices alinhados ao plano;
+    strict=True interrompe com RuntimeError em vez de só avisar. Os trechos incompletos ficam
+    em "short_segments" e o total de registros vazios em "missing_frames".
+    """
+    budget = budget or ThreadBudget(workers or len(available_cpus()))
+    workers = budget.workers
+    source = VideoFrameSource(path, target_fps)
+    if not source.isOpened():
+        raise FileNotFoundError(f"Não foi possível abrir o vídeo: {path}")
+    indices = source.frame_indices()
+    fps = source.fps
+    source.release()
+
+    plan = plan_segments(indices, fps, segments or workers, overlap)
+    temp_dir = tempfile.mkdtemp(prefix=".segments_", dir=os.path.dirname(os.path.abspath(output)))
+    start_time = time.time()
+    try:
+        # spawn: cada worker inicializa o MediaPipe do zero (fork com grafos ativos não é seguro)
+        # e herda do ambiente os limites de threads de BLAS/TFLite definidos antes do import
+        context = multiprocessing.get_context("spawn")
+        budget.apply_environment()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                                 initargs=(budget, context.Value("i", 0))) as pool:
+            futures = [pool.submit(process_segment, path, segment["indices"], segment["warmup"],
+                                   os.path.join(temp_dir, f"segment_{i:04d}.lmka"), scale, max_faces)
+                       for i, segment in enumerate(plan)]
+            results = [future.result() for future in futures]
+
+        short = [(i, r["expected"] - r["missing"], r["expected"]) for i, r in enumerate(results) if r["missing"]]
+        if short:
+            details = ", ".join(f"segmento {i}: {got}/{expected}" for i, got, expected in short)
+            if strict:
+                raise RuntimeError(f"Segmentos com frames faltando ({details}): {path}")
+            print(f"⚠️ Segmentos com frames faltando ({details}); gravados como frames sem rosto")
+
+        frames = merge_archives([r["output"] for r in results], output,
+                                {"source": path, "fps": target_fps, "segments": len(plan)}, max_faces=max_faces)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    elapsed = time.time() - start_time
+    return {
+        "frames": frames,
+        "segments": len(plan),
+        "workers": workers,
+        "warmup_frames": sum(r["warmup"] for r in results),
+        "short_segments": [i for i, _, _ in short],
+        "missing_frames": sum(r["missing"] for r in results),
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed else 0.0,
+        "segment_seconds": [round(r["seconds"], 2) for r in results]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Processa um vídeo longo em segmentos paralelos")
+    parser.add_argument("video", help="Arquivo de vídeo")
+    parser.add_argument("--output", default="video_landmarks.lmka", help="Landmark archive de saída")
+    parser.add_argument("--workers", type=int, help="Processos (padrão: número de núcleos)")
+    parser.add_argument("--segments", type=int, help="Número de segmentos (padrão: um por worker)")
+    parser.add_argument("--fps", type=float, default=0.0, help="Taxa de análise (0 = todos os frames)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Redução dos frames decodificados")
+    parser.add_argument("--overlap", type=float, default=1.0, help="Segundos de aquecimento do tracking por segmento")
+    parser.add_argument("--strict", action="store_true", help="Falhar se algum frame do plano não for decodificado (padrão: gravá-lo vazio)")
+    add_budget_arguments(parser)
+
+    args = parser.parse_args()
+
+    workers = args.workers or min(args.cores or len(available_cpus()), len(available_cpus()))
+    budget = ThreadBudget(workers, args.cores, args.pin)
+    # O processo principal só decodifica o plano e junta os arquivos: mesmo limite dos workers
+    budget.apply()
+    budget.print_report()
+
+    stats = process_video_parallel(args.video, args.output, workers, args.segments,
+                                   args.fps or None, args.scale, args.overlap, budget=budget, strict=args.strict)
+    print(f"\n✅ {stats['frames']} frames em {stats['seconds']:.1f}s ({stats['fps']:.1f} FPS), "
+          f"{stats['segments']} segmentos / {stats['workers']} workers")
+    print(f"   Tempo por segmento: {stats['segment_seconds']}")
+
+    summary = summarize_archive(LandmarkArchive(args.output))
+    print("\n📊 RESUMO:")
+    for key, value in summary.items():
+        print(f"• {key}: {value:.3f}" if isinstance(value, float) else f"• {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
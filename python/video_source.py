@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Video Source - Leitura de vídeos com taxa de análise reduzida
+Frames descartados são pulados com cap.grab() (sem decodificar a imagem) e
+só os frames amostrados passam por retrieve(); intervalos longos usam seek
+por posição e a imagem pode ser reduzida logo após a decodificação
+"""
+
+import cv2
+import numpy as np
+import time
+import argparse
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    from landmark_archive import LandmarkArchiveWriter, LandmarkArchive, summarize_archive
+except ImportError:  # importado como pacote a partir da raiz do projeto
+    from python.landmark_archive import LandmarkArchiveWriter, LandmarkArchive, summarize_archive
+
+
+class VideoFrameSource:
+    def __init__(self, path: str, target_fps: Optional[float] = None, scale: float = 1.0,
+                 start: float = 0.0, end: Optional[float] = None, seek_gap: Optional[int] = None,
+                 indices: Optional[np.ndarray] = None):
+        """Fonte de frames amostrados de um arquivo de vídeo
+
+        target_fps: taxa de análise desejada (None = todos os frames).
+        scale: fator de redução aplicado aos frames decodificados (ex: 0.5).
+        start/end: intervalo em segundos.
+        seek_gap: a partir de quantos frames pulados vale mais um seek do que grab()
+        (None = só grab; seek em codecs com keyframes esparsos pode custar mais que decodificar).
+        indices: frames explícitos em ordem crescente (ex: um trecho de um plano já calculado),
+        no lugar de target_fps/start/end.
+        """
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.target_fps = target_fps
+        self.scale = scale
+        self.start = start
+        self.end = end
+        self.seek_gap = seek_gap
+        self.indices = indices
+
+        # Estatísticas: frames pulados sem decodificar, decodificados e seeks
+        self.grabbed = 0
+        self.decoded = 0
+        self.seeks = 0
+
+        self._position = 0
+        self._plan = None
+        self._cursor = 0
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.fps if self.fps else 0.0
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def frame_indices(self) -> np.ndarray:
+        """Índices dos frames que serão entregues, espaçados por tempo (1/target_fps)"""
+        if self.indices is not None:
+            return np.asarray(self.indices, dtype=np.int64)
+        first = int(round(self.start * self.fps))
+        last = self.frame_count if self.end is None else min(self.frame_count, int(round(self.end * self.fps)))
+        if last <= first:
+            return np.zeros(0, dtype=np.int64)
+        if not self.target_fps or self.target_fps >= self.fps:
+            return np.arange(first, last, dtype=np.int64)
+        times = np.arange(first / self.fps, last / self.fps, 1.0 / self.target_fps)
+        indices = np.unique(np.rint(times * self.fps).astype(np.int64))
+        return indices[(indices >= first) & (indices < last)]
+
+    def seek(self, t: float):
+        """Posiciona o decodificador no tempo t (segundos)"""
+        self.cap.set(cv2.CAP_PROP_POS_MSEC, t * 1000.0)
+        self._position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        self.seeks += 1
+
+    def _advance_to(self, index: int) -> bool:
+        """Leva o decodificador até o frame index sem decodificar os intermediários"""
+        gap = index - self._position
+        if gap < 0 or (self.seek_gap is not None and gap > self.seek_gap):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self._position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+            self.seeks += 1
+            gap = index - self._position
+        for _ in range(max(gap, 0)):
+            if not self.cap.grab():
+                return False
+            self.grabbed += 1
+            self._position += 1
+        return True
+
+    def _decode(self) -> Optional[np.ndarray]:
+        if not self.cap.grab():
+            return None
+        ok, frame = self.cap.retrieve()
+        self._position += 1
+        if not ok:
+            return None
+        self.decoded += 1
+        if self.scale != 1.0:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return frame
+
+    def next_frame(self) -> Tuple[Optional[int], float, Optional[np.ndarray]]:
+        """Próximo frame amostrado: (índice, timestamp em segundos, imagem) ou (None, 0, None) no fim"""
+        if self._plan is None:
+            self._plan = self.frame_indices()
+            if len(self._plan) and self._plan[0] > 0:
+                # Início do intervalo por tempo, sem percorrer o vídeo desde o começo
+                self.seek(self._plan[0] / self.fps)
+
+        while self._cursor < len(self._plan):
+            index = int(self._plan[self._cursor])
+            self._cursor += 1
+            if not self._advance_to(index):
+                break
+            frame = self._decode()
+            if frame is None:
+                break
+            return index, index / self.fps, frame
+        self._cursor = len(self._plan)
+        return None, 0.0, None
+
+    def __iter__(self) -> Iterator[Tuple[int, float, np.ndarray]]:
+        while True:
+            index, timestamp, frame = self.next_frame()
+            if frame is None:
+                return
+            yield index, timestamp, frame
+
+    def read(self):
+        """Interface de cv2.VideoCapture (ex: open_capture / process_webcam)"""
+        _, _, frame = self.next_frame()
+        return frame is not None, frame
+
+    def release(self):
+        self.cap.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def stats(self) -> Dict:
+        return {"decoded": self.decoded, "skipped_without_decode": self.grabbed, "seeks": self.seeks}
+
+
+def record_landmarks(source: VideoFrameSource, writer: LandmarkArchiveWriter, face_mesh=None) -> int:
+    """Roda o FaceMesh nos frames amostrados e grava os landmarks com o timestamp do vídeo"""
+    if face_mesh is None:
+        import mediapipe as mp
+        face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=writer.max_faces, refine_landmarks=True)
+    if not writer.width:
+        # Landmarks normalizados: métricas em pixels na resolução original do vídeo
+        writer.set_frame_size(source.width, source.height)
+
+    frames = 0
+    for _, timestamp, frame in source:
+        results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        writer.append_mediapipe(results.multi_face_landmarks, timestamp)
+        frames += 1
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Amostra um vídeo, grava landmarks e resume olhos/boca/emoções")
+    parser.add_argument("video", help="Arquivo de vídeo")
+    parser.add_argument("--fps", type=float, default=5.0, help="Taxa de análise (0 = todos os frames)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Redução dos frames decodificados (ex: 0.5)")
+    parser.add_argument("--start", type=float, default=0.0, help="Início em segundos")
+    parser.add_argument("--end", type=float, help="Fim em segundos")
+    parser.add_argument("--seek-gap", type=int, help="Usar seek para pular mais que N frames")
+    parser.add_argument("--archive", default="video_landmarks.lmka", help="Landmark archive de saída")
+
+    args = parser.parse_args()
+
+    source = VideoFrameSource(args.video, args.fps or None, args.scale, args.start, args.end, args.seek_gap)
+    if not source.isOpened():
+        print(f"❌ Não foi possível abrir {args.video}")
+        return
+
+    print(f"🎞️ {args.video}: {source.frame_count} frames a {source.fps:.1f} FPS, {source.width}x{source.height}")
+    start_time = time.time()
+    with source, LandmarkArchiveWriter(args.archive, metadata={"source": args.video, "fps": args.fps}) as writer:
+        frames = record_landmarks(source, writer)
+    elapsed = time.time() - start_time
+
+    print(f"✅ {frames} frames analisados em {elapsed:.1f}s ({frames / elapsed if elapsed else 0:.1f} FPS)")
+    print(f"   {source.stats()}")
+
+    summary = summarize_archive(LandmarkArchive(args.archive))
+    print("\n📊 RESUMO:")
+    for key, value in summary.items():
+        print(f"• {key}: {value:.3f}" if isinstance(value, float) else f"• {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
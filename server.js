@@ -27,6 +27,35 @@ const server = http.createServer((req, res) => {
 
     const contentType = mimeTypes[extname] || 'application/octet-stream';
 
+    // Range: bytes=início-fim -> 206 com só o trecho pedido (sessões .lmkc lidas por blocos)
+    const range = /^bytes=(\d*)-(\d*)$/.exec(req.headers.range || '');
+    if (range) {
+        fs.stat(filePath, (error, stats) => {
+            if (error || !stats.isFile()) {
+                res.writeHead(404, { 'Content-Type': 'text/html' });
+                res.end('<h1>404 - Arquivo não encontrado</h1>', 'utf-8');
+                return;
+            }
+            let start = range[1] === '' ? stats.size - Number(range[2]) : Number(range[1]);
+            let end = range[1] === '' || range[2] === '' ? stats.size - 1 : Number(range[2]);
+            start = Math.max(0, start);
+            end = Math.min(end, stats.size - 1);
+            if (start > end) {
+                res.writeHead(416, { 'Content-Range': `bytes */${stats.size}` });
+                res.end();
+                return;
+            }
+            res.writeHead(206, {
+                'Content-Type': contentType,
+                'Content-Range': `bytes ${start}-${end}/${stats.size}`,
+                'Content-Length': end - start + 1,
+                'Accept-Ranges': 'bytes'
+            });
+            fs.createReadStream(filePath, { start, end }).pipe(res);
+        });
+        return;
+    }
+
     fs.readFile(filePath, (error, content) => {
         if (error) {
             if(error.code == 'ENOENT') {
@@ -37,7 +66,7 @@ const server = http.createServer((req, res) => {
                 res.end('Erro interno do servidor: ' + error.code + ' ..\n');
             }
         } else {
-            res.writeHead(200, { 'Content-Type': contentType });
+            res.writeHead(200, { 'Content-Type': contentType, 'Accept-Ranges': 'bytes' });
             res.end(content, 'utf-8');
         }
     });